@@ -10,9 +10,15 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.database import Base
 from app.models.user import User
+from app.models.lookup import Category, Merchant
 from app.models.transaction import Transaction
 from app.models.financial_goal import FinancialGoal
 from app.models.chat_history import ChatHistory
+from app.models.ingestion_job import IngestionJob
+from app.models.ingested_file import IngestedFile, IngestedRange
+from app.models.daily_rollup import DailyUserCategoryRollup
+from app.models.anomaly import AnomalyBaseline, TransactionAnomaly
+from app.models.recurring import RecurringSeries
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
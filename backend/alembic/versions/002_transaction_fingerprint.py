@@ -0,0 +1,56 @@
+"""Add transaction content fingerprint for set-based dedup
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+# Must stay in sync with app.utils.fingerprint.transaction_fingerprints. Whitespace runs
+# (tabs and newlines too) are collapsed before trimming, since btrim only strips spaces
+FINGERPRINT_SQL = """
+    encode(sha256(convert_to(
+        user_id || '|' ||
+        to_char(date, 'YYYY-MM-DD') || '|' ||
+        round(amount::numeric, 2)::text || '|' ||
+        lower(btrim(regexp_replace(description, '\\s+', ' ', 'g'))),
+    'UTF8')), 'hex')
+"""
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+    # Backfill existing rows
+    op.execute(f"UPDATE transactions SET fingerprint = {FINGERPRINT_SQL}")
+
+    # Drop rows that would violate the new constraint, keeping the earliest copy
+    op.execute("""
+        DELETE FROM transactions t
+        USING transactions d
+        WHERE t.user_id = d.user_id
+          AND t.date = d.date
+          AND t.fingerprint = d.fingerprint
+          AND (t.created_at, t.id) > (d.created_at, d.id)
+    """)
+
+    op.alter_column('transactions', 'fingerprint', nullable=False)
+    op.create_unique_constraint(
+        'uq_transactions_user_fingerprint',
+        'transactions',
+        ['user_id', 'date', 'fingerprint']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_transactions_user_fingerprint', 'transactions', type_='unique')
+    op.drop_column('transactions', 'fingerprint')
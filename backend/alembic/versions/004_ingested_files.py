@@ -0,0 +1,56 @@
+"""Track ingested file hashes and the per-account date windows they covered
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ingested_files',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('created_rows', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'content_hash', name='uq_ingested_files_user_hash')
+    )
+    op.create_index(op.f('ix_ingested_files_id'), 'ingested_files', ['id'], unique=False)
+
+    op.create_table('ingested_ranges',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('file_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('account_type', sa.String(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['file_id'], ['ingested_files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_ingested_ranges_user_account', 'ingested_ranges', ['user_id', 'account_type'], unique=False)
+
+    op.add_column('ingestion_jobs', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('already_ingested_rows', sa.Integer(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('duplicate_of', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ingestion_jobs', 'duplicate_of')
+    op.drop_column('ingestion_jobs', 'already_ingested_rows')
+    op.drop_column('ingestion_jobs', 'content_hash')
+    op.drop_index('idx_ingested_ranges_user_account', table_name='ingested_ranges')
+    op.drop_table('ingested_ranges')
+    op.drop_index(op.f('ix_ingested_files_id'), table_name='ingested_files')
+    op.drop_table('ingested_files')
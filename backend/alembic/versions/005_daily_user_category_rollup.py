@@ -0,0 +1,47 @@
+"""Add daily_user_category_rollup and backfill it from transactions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_user_category_rollup',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('income_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('expense_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'date', 'category')
+    )
+    op.create_index('idx_rollup_date', 'daily_user_category_rollup', ['date'], unique=False)
+
+    op.execute("""
+        INSERT INTO daily_user_category_rollup
+            (user_id, date, category, income_sum, expense_sum, transaction_count)
+        SELECT
+            user_id,
+            date,
+            COALESCE(NULLIF(category, ''), 'Other'),
+            COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+            COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0),
+            COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_rollup_date', table_name='daily_user_category_rollup')
+    op.drop_table('daily_user_category_rollup')
@@ -0,0 +1,146 @@
+"""Partition transactions by month on date, optionally hash sub-partitioned by user_id
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 21:00:00.000000
+
+Postgres only; other engines keep the plain table. The existing rows are copied
+into the partitioned table, so expect this to take a while on large tables.
+Set TRANSACTION_HASH_PARTITIONS before upgrading to split each month by user.
+"""
+from alembic import op
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = """
+    id, user_id, amount, description, category, merchant, account_type,
+    date, created_at, updated_at, fingerprint
+"""
+
+SECONDARY_INDEXES = [
+    ('idx_date_amount', 'date, amount'),
+    ('idx_user_category', 'user_id, category'),
+    ('idx_user_date', 'user_id, date'),
+    ('ix_transactions_id', 'id'),
+]
+
+
+def ensure_partitions_function(hash_partitions: int) -> str:
+    """Function called by app.services.partitioning to create missing monthly partitions"""
+    return f"""
+        CREATE OR REPLACE FUNCTION ensure_transaction_partitions(from_date date, to_date date)
+        RETURNS integer
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            hash_partitions constant integer := {int(hash_partitions)};
+            month_start date := date_trunc('month', from_date)::date;
+            partition_name text;
+            remainder integer;
+            created integer := 0;
+        BEGIN
+            WHILE month_start <= to_date LOOP
+                partition_name := 'transactions_' || to_char(month_start, 'YYYY_MM');
+                IF to_regclass(partition_name) IS NULL THEN
+                    -- serialize concurrent ingests creating the same month
+                    PERFORM pg_advisory_xact_lock(hashtext('ensure_transaction_partitions'));
+                    IF to_regclass(partition_name) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)%s',
+                            partition_name,
+                            month_start,
+                            (month_start + interval '1 month')::date,
+                            CASE WHEN hash_partitions > 0 THEN ' PARTITION BY HASH (user_id)' ELSE '' END
+                        );
+                        FOR remainder IN 0 .. hash_partitions - 1 LOOP
+                            EXECUTE format(
+                                'CREATE TABLE %I PARTITION OF %I FOR VALUES WITH (MODULUS %s, REMAINDER %s)',
+                                partition_name || '_h' || remainder,
+                                partition_name,
+                                hash_partitions,
+                                remainder
+                            );
+                        END LOOP;
+                        created := created + 1;
+                    END IF;
+                END IF;
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+            RETURN created;
+        END
+        $$
+    """
+
+
+def _free_names(table: str, suffix: str) -> None:
+    """Drop the secondary indexes of ``table`` and rename its constraints out of the way"""
+    for name, _ in SECONDARY_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT uq_transactions_user_fingerprint")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT transactions_pkey TO transactions_{suffix}_pkey")
+
+
+def _add_constraints(primary_key: str) -> None:
+    op.execute(f"ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT uq_transactions_user_fingerprint "
+        "UNIQUE (user_id, date, fingerprint)"
+    )
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    )
+    for name, columns in SECONDARY_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON transactions ({columns})")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    hash_partitions = settings.TRANSACTION_HASH_PARTITIONS
+
+    op.execute("ALTER TABLE transactions RENAME TO transactions_unpartitioned")
+    _free_names('transactions_unpartitioned', 'unpartitioned')
+
+    # Unique constraints on a partitioned table must include every partition key
+    op.execute(
+        "CREATE TABLE transactions (LIKE transactions_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (date)"
+    )
+    _add_constraints('id, date, user_id' if hash_partitions else 'id, date')
+
+    op.execute(ensure_partitions_function(hash_partitions))
+    op.execute(f"""
+        SELECT ensure_transaction_partitions(
+            COALESCE(MIN(date), CURRENT_DATE),
+            GREATEST(COALESCE(MAX(date), CURRENT_DATE),
+                     (CURRENT_DATE + interval '{settings.TRANSACTION_PARTITION_MONTHS_AHEAD} months')::date)
+        )
+        FROM transactions_unpartitioned
+    """)
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_unpartitioned")
+    op.execute("DROP TABLE transactions_unpartitioned")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    _free_names('transactions_partitioned', 'partitioned')
+
+    op.execute("CREATE TABLE transactions (LIKE transactions_partitioned INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    _add_constraints('id')
+
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE transactions_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS ensure_transaction_partitions(date, date)")
@@ -0,0 +1,58 @@
+"""Add per-user anomaly baselines and scored transaction anomalies
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 23:00:00.000000
+
+Both tables start empty; run ``python -m scripts.rescore_anomalies`` to score
+existing history.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('anomaly_baselines',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('flow', sa.String(), nullable=False),
+        sa.Column('median', sa.Float(), nullable=False),
+        sa.Column('mad', sa.Float(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('window_start', sa.Date(), nullable=False),
+        sa.Column('window_end', sa.Date(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'scope', 'key', 'flow')
+    )
+
+    op.create_table('transaction_anomalies',
+        sa.Column('transaction_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('merchant', sa.String(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('baseline_scope', sa.String(), nullable=False),
+        sa.Column('baseline_key', sa.String(), nullable=False),
+        sa.Column('baseline_median', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index('idx_anomalies_user_date', 'transaction_anomalies', ['user_id', 'date'], unique=False)
+    op.create_index('idx_anomalies_date', 'transaction_anomalies', ['date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_anomalies_date', table_name='transaction_anomalies')
+    op.drop_index('idx_anomalies_user_date', table_name='transaction_anomalies')
+    op.drop_table('transaction_anomalies')
+    op.drop_table('anomaly_baselines')
@@ -0,0 +1,49 @@
+"""Add per-user recurring transaction series
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 01:00:00.000000
+
+The table starts empty; run ``python -m scripts.rebuild_recurring`` to detect
+series in existing history.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('recurring_series',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('merchant_key', sa.String(), nullable=False),
+        sa.Column('flow', sa.String(), nullable=False),
+        sa.Column('amount_bucket', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('occurrences', sa.Integer(), nullable=False),
+        sa.Column('amount_total', sa.Float(), nullable=False),
+        sa.Column('last_amount', sa.Float(), nullable=False),
+        sa.Column('first_date', sa.Date(), nullable=False),
+        sa.Column('last_date', sa.Date(), nullable=False),
+        sa.Column('recent_dates', sa.Text(), nullable=False),
+        sa.Column('cadence', sa.String(), nullable=True),
+        sa.Column('interval_days', sa.Float(), nullable=True),
+        sa.Column('regularity', sa.Float(), nullable=False),
+        sa.Column('is_recurring', sa.Boolean(), nullable=False),
+        sa.Column('next_expected_date', sa.Date(), nullable=True),
+        sa.Column('lapses_on', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'merchant_key', 'flow', 'amount_bucket')
+    )
+    op.create_index('idx_recurring_user_lapses', 'recurring_series', ['user_id', 'is_recurring', 'lapses_on'], unique=False)
+    op.create_index('idx_recurring_user_last_date', 'recurring_series', ['user_id', 'last_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_recurring_user_last_date', table_name='recurring_series')
+    op.drop_index('idx_recurring_user_lapses', table_name='recurring_series')
+    op.drop_table('recurring_series')
@@ -0,0 +1,79 @@
+"""Dictionary-encode transactions.category and transactions.merchant into lookup tables
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 03:00:00.000000
+
+Every distinct name is copied into ``categories`` / ``merchants``, the id columns
+are backfilled from them, and the string columns are dropped. On Postgres the
+space of the dropped columns is only reclaimed once the table is rewritten
+(``VACUUM FULL transactions`` or ``pg_repack``).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+# (lookup table, its id type, string column on transactions, id column on transactions);
+# SQLite only autoincrements an INTEGER PRIMARY KEY, so SMALLINT ids are INTEGER there
+LOOKUPS = [
+    ('categories', sa.SmallInteger().with_variant(sa.Integer(), 'sqlite'), 'category', 'category_id'),
+    ('merchants', sa.Integer(), 'merchant', 'merchant_id'),
+]
+
+
+def upgrade() -> None:
+    for table, id_type, column, id_column in LOOKUPS:
+        op.create_table(table,
+            sa.Column('id', id_type, nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+        op.execute(f"INSERT INTO {table} (name) SELECT DISTINCT {column} FROM transactions WHERE {column} IS NOT NULL")
+
+    with op.batch_alter_table('transactions') as batch:
+        for table, id_type, column, id_column in LOOKUPS:
+            batch.add_column(sa.Column(id_column, id_type, nullable=True))
+
+    for table, id_type, column, id_column in LOOKUPS:
+        op.execute(
+            f"UPDATE transactions SET {id_column} = "
+            f"(SELECT {table}.id FROM {table} WHERE {table}.name = transactions.{column}) "
+            f"WHERE {column} IS NOT NULL"
+        )
+
+    op.drop_index('idx_user_category', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch:
+        for table, id_type, column, id_column in LOOKUPS:
+            batch.create_foreign_key(f'transactions_{id_column}_fkey', table, [id_column], ['id'])
+            batch.drop_column(column)
+    op.create_index('idx_user_category', 'transactions', ['user_id', 'category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_category', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch:
+        for table, id_type, column, id_column in LOOKUPS:
+            batch.add_column(sa.Column(column, sa.String(), nullable=True))
+
+    for table, id_type, column, id_column in LOOKUPS:
+        op.execute(
+            f"UPDATE transactions SET {column} = "
+            f"(SELECT {table}.name FROM {table} WHERE {table}.id = transactions.{id_column}) "
+            f"WHERE {id_column} IS NOT NULL"
+        )
+
+    with op.batch_alter_table('transactions') as batch:
+        for table, id_type, column, id_column in LOOKUPS:
+            batch.drop_constraint(f'transactions_{id_column}_fkey', type_='foreignkey')
+            batch.drop_column(id_column)
+    op.create_index('idx_user_category', 'transactions', ['user_id', 'category'], unique=False)
+
+    for table, id_type, column, id_column in reversed(LOOKUPS):
+        op.drop_table(table)
@@ -0,0 +1,105 @@
+"""Store money as integer cents with a currency column
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 05:00:00.000000
+
+Float amounts are rounded half away from zero to cents, the same rounding the
+content fingerprints use (migration 002) and app.utils.money.amount_to_cents.
+The daily rollup is recomputed from the converted transactions rather than from
+its float sums, so SUM over transactions and the rollup agree exactly from here
+on. Existing rows get the default currency.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+DEFAULT_CURRENCY = 'USD'
+
+# Float to cents, half away from zero. Postgres rounds the exact numeric value;
+# SQLite has no numeric type, so it rounds to 6 places first like amount_to_cents
+# (1.005 * 100 is 100.49999999999999 in binary floating point)
+TO_CENTS_SQL = {
+    'postgresql': "ROUND(CAST({column} AS NUMERIC) * 100)",
+    'sqlite': "ROUND(ROUND({column} * 100, 6))",
+}
+
+# (table, float column, cents column, nullable)
+MONEY_COLUMNS = [
+    ('transactions', 'amount', 'amount_cents', False),
+    ('financial_goals', 'target_amount', 'target_amount_cents', False),
+    ('financial_goals', 'current_amount', 'current_amount_cents', True),
+]
+
+ROLLUP_REBUILD = """
+    INSERT INTO daily_user_category_rollup
+        (user_id, date, category, {income}, {expense}, transaction_count)
+    SELECT
+        transactions.user_id,
+        transactions.date,
+        COALESCE(NULLIF(categories.name, ''), 'Other'),
+        COALESCE(SUM({amount}) FILTER (WHERE {amount} > 0), 0),
+        COALESCE(-SUM({amount}) FILTER (WHERE {amount} < 0), 0),
+        COUNT(*)
+    FROM transactions
+    LEFT JOIN categories ON categories.id = transactions.category_id
+    GROUP BY 1, 2, 3
+"""
+
+
+def _convert(to_cents: bool) -> None:
+    """Add the target columns, fill them from the source columns, then drop the source columns"""
+    for table, float_column, cents_column, nullable in MONEY_COLUMNS:
+        source, target = (float_column, cents_column) if to_cents else (cents_column, float_column)
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column(target, sa.BigInteger() if to_cents else sa.Float(), nullable=True))
+        if to_cents:
+            dialect = op.get_bind().dialect.name
+            expression = TO_CENTS_SQL.get(dialect, TO_CENTS_SQL['postgresql']).format(column=source)
+        else:
+            expression = f"{source} / 100.0"
+        op.execute(f"UPDATE {table} SET {target} = {expression} WHERE {source} IS NOT NULL")
+        with op.batch_alter_table(table) as batch:
+            if not nullable:
+                batch.alter_column(target, nullable=False)
+            batch.drop_column(source)
+
+
+def upgrade() -> None:
+    op.drop_index('idx_date_amount', table_name='transactions')
+    _convert(to_cents=True)
+    for table in ('transactions', 'financial_goals'):
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column('currency', sa.String(3), nullable=False, server_default=DEFAULT_CURRENCY))
+    op.create_index('idx_date_amount', 'transactions', ['date', 'amount_cents'], unique=False)
+
+    op.execute("DELETE FROM daily_user_category_rollup")
+    with op.batch_alter_table('daily_user_category_rollup') as batch:
+        batch.drop_column('income_sum')
+        batch.drop_column('expense_sum')
+        batch.add_column(sa.Column('income_cents', sa.BigInteger(), nullable=False, server_default='0'))
+        batch.add_column(sa.Column('expense_cents', sa.BigInteger(), nullable=False, server_default='0'))
+    op.execute(ROLLUP_REBUILD.format(income='income_cents', expense='expense_cents', amount='amount_cents'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_date_amount', table_name='transactions')
+    for table in ('transactions', 'financial_goals'):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('currency')
+    _convert(to_cents=False)
+    op.create_index('idx_date_amount', 'transactions', ['date', 'amount'], unique=False)
+
+    op.execute("DELETE FROM daily_user_category_rollup")
+    with op.batch_alter_table('daily_user_category_rollup') as batch:
+        batch.drop_column('income_cents')
+        batch.drop_column('expense_cents')
+        batch.add_column(sa.Column('income_sum', sa.Float(), nullable=False, server_default='0'))
+        batch.add_column(sa.Column('expense_sum', sa.Float(), nullable=False, server_default='0'))
+    op.execute(ROLLUP_REBUILD.format(income='income_sum', expense='expense_sum', amount='amount'))
@@ -1,8 +1,8 @@
 from fastapi import APIRouter,HTTPException,Depends
-from sqlalchemy.orm import Session
 from typing import Dict,Any
-from ..core.database import get_db
-from ..services.analytics_service import AnalyticsService
+from ..core.cache import analytics_cache
+from ..services.async_services import get_analytics_service
+from ..services.columnar_cache import columnar_cache
 
 
 router = APIRouter()
@@ -10,12 +10,16 @@ router = APIRouter()
 @router.get("/dashboard")
 async def get_dashboard_data(
     period:str="30d",
-    db:Session=Depends(get_db)
+    user_id:str=None,
+    start:str=None,
+    end:str=None,
+    service=Depends(get_analytics_service)
 ):
     """Get dashboard analytics data"""
     try:
-        service = AnalyticsService(db)
-        return service.get_dashboard_data(period)
+        return await service.get_dashboard_data(period,user_id,start,end)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500,detail=str(e))
     
@@ -24,20 +28,94 @@ async def get_dashboard_data(
 async def get_spending_trends(
     period:str="90d",
     category:str=None,
-    db:Session=Depends(get_db)
+    user_id:str=None,
+    service=Depends(get_analytics_service)
 ):
-    service = AnalyticsService(db)
-    return service.get_spending_trends(period,category)
+    return await service.get_spending_trends(period,category,user_id)
 
 @router.get("/predictions")
 async def get_financial_predictions(
     horizon:int=30,
-    db:Session=Depends(get_db)
+    user_id:str=None,
+    service=Depends(get_analytics_service)
 ):
-    service = AnalyticsService(db)
-    return service.get_predictions(horizon)
+    return await service.get_predictions(horizon,user_id)
     
 @router.get("/insights")
-async def get_financial_insights(db:Session=Depends(get_db)):
-    service = AnalyticsService(db)
-    return service.get_insights()
\ No newline at end of file
+async def get_financial_insights(user_id:str=None,service=Depends(get_analytics_service)):
+    return await service.get_insights(user_id)
+
+
+@router.get("/bundle")
+async def get_analytics_bundle(
+    period:str="30d",
+    trends_period:str="90d",
+    summary_period:str="30d",
+    user_id:str=None,
+    service=Depends(get_analytics_service)
+):
+    """Dashboard, spending trends, insights and transaction summary in one response"""
+    return await service.get_bundle(period,trends_period,summary_period,user_id)
+
+@router.get("/range")
+async def get_range_summary(
+    period:str="30d",
+    start:str=None,
+    end:str=None,
+    user_id:str=None,
+    category:str=None,
+    service=Depends(get_analytics_service)
+):
+    """Totals for any date range (start/end as YYYY-MM-DD, or a period such as 45d, 6w, mtd, ytd)"""
+    try:
+        return await service.get_range_summary(period,start,end,user_id,category)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+
+@router.get("/compare")
+async def compare_periods(
+    period:str="mtd",
+    start:str=None,
+    end:str=None,
+    user_id:str=None,
+    category:str=None,
+    service=Depends(get_analytics_service)
+):
+    """Compare a range with the previous one, e.g. this month vs last month"""
+    try:
+        return await service.compare_periods(period,start,end,user_id,category)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+
+@router.get("/anomalies")
+async def get_anomalies(
+    period:str="30d",
+    start:str=None,
+    end:str=None,
+    limit:int=10,
+    user_id:str=None,
+    service=Depends(get_analytics_service)
+):
+    """Top-N unusual transactions in a range, scored against per-merchant/category baselines at ingest"""
+    try:
+        return await service.get_anomalies(period,start,end,limit,user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+
+@router.get("/recurring")
+async def get_recurring(
+    status:str="active",
+    limit:int=50,
+    user_id:str=None,
+    service=Depends(get_analytics_service)
+):
+    """Subscriptions and recurring bills (status active, lapsed or all) with their next expected dates"""
+    try:
+        return await service.get_recurring(status,limit,user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400,detail=str(e))
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Analytics cache hit/miss counters and columnar cache usage for this process"""
+    return {**analytics_cache.stats(),'columnar':columnar_cache.stats()}
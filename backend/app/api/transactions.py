@@ -1,80 +1,192 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+import hashlib
+import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
-import pandas as pd
-import io
 from ..core.database import get_db
-from ..services.transaction_service import TransactionService
-from ..services.file_processor import FileProcessor
+from ..services.async_services import EXPORT_MEDIA_TYPES, export_stream, get_transaction_service
+from ..services.transaction_service import DEFAULT_USER_ID, filtered_transactions_statement
+from ..services.file_registry import FileRegistryService
+from ..services.file_processor import CSV_CHUNK_ROWS, SUPPORTED_EXTENSIONS
+from ..services.ingestion_jobs import IngestionJobService, get_executor, run_ingestion_job, spool_path
+from ..utils.pagination import encode_cursor
 
+# Bytes read from the upload per await while spooling it to disk
+UPLOAD_READ_BYTES = 1024 * 1024
 
 router = APIRouter()
 @router.post("/upload")
 async def upload_transactions(
+    response: Response,
     file: UploadFile = File(...),
+    background: bool = True,
+    chunk_rows: int = CSV_CHUNK_ROWS,
     db: Session = Depends(get_db)
 ):
-    """Upload and process transaction file"""
+    """Upload a transaction file and ingest it as a job
+
+    The upload is spooled to disk and handed to the ingestion executor. By default the
+    handler returns a job id at once (202); poll ``/jobs/{job_id}`` for progress.
+    With ``background=false`` the job runs in the request's threadpool and the final
+    counts are returned directly.
+    """
+    if not file.filename.endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file type. Please upload CSV, XLSX, JSON, NDJSON, Parquet or Arrow IPC files."
+        )
+
     try:
-        if not file.filename.endswith(('.csv', '.xlsx', '.json')):
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file type. Please upload CSV, XLSX or JSON files."
-            )
-            
-        content = await file.read()
-        
-        # Process file based on type
-        processor = FileProcessor()
-        if file.filename.endswith('.csv'):
-            df = processor.process_csv(io.StringIO(content.decode('utf-8')))
-        elif file.filename.endswith('.xlsx'):
-            df = processor.process_excel(io.BytesIO(content))
-        elif file.filename.endswith('.json'):
-            df = processor.process_json(io.StringIO(content.decode('utf-8')))
-        
-        transaction_service = TransactionService(db)
-        result = transaction_service.bulk_create_transactions(df)
-        
+        file_path = spool_path(file.filename)
+        file_size = 0
+        content_hash = hashlib.sha256()
+        with open(file_path, 'wb') as spooled:
+            while chunk := await file.read(UPLOAD_READ_BYTES):
+                spooled.write(chunk)
+                content_hash.update(chunk)
+                file_size += len(chunk)
+
+        # Identical bytes were ingested before: short-circuit without queueing anything
+        duplicate = FileRegistryService(db).find_duplicate(DEFAULT_USER_ID, content_hash.hexdigest())
+        if duplicate is not None:
+            os.remove(file_path)
+            return {
+                "message": "File already ingested",
+                "total_transactions": duplicate.total_rows,
+                "processed_transactions": 0,
+                "skipped_duplicates": duplicate.total_rows,
+                "skipped_reasons": {
+                    "duplicate_file": duplicate.id,
+                    "already_ingested": 0,
+                    "duplicate_transaction": 0
+                }
+            }
+
+        job = IngestionJobService(db).create_job(
+            filename=file.filename,
+            file_path=file_path,
+            file_size=file_size,
+            chunk_rows=chunk_rows,
+            content_hash=content_hash.hexdigest()
+        )
+
+        if background:
+            get_executor().submit(job.id)
+            response.status_code = 202
+            return {
+                "message": "Upload accepted for processing",
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/transactions/jobs/{job.id}"
+            }
+
+        result = await run_in_threadpool(run_ingestion_job, job.id)
+        if result["status"] == "failed":
+            raise HTTPException(status_code=500, detail=result["error"])
         return {
             "message": "Transactions uploaded successfully",
-            "total_transactions": len(df),
-            "processed_transactions": result["created"],
-            "skipped_duplicates": result["skipped"]
+            **result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str, db: Session = Depends(get_db)):
+    """Get progress, row counts and errors for an ingestion job"""
+    job = IngestionJobService(db).get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
+
 @router.get("/")
 async def get_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category: str = None,
     start_date: str = None,
     end_date: str = None,
-    db: Session = Depends(get_db)
+    user_id: str = None,
+    cursor: str = None,
+    service = Depends(get_transaction_service)
 ):
-    """get filtered transactions"""
-    service = TransactionService(db)
-    transactions = service.get_filtered_transactions(
-        skip=skip,
-        limit=limit,
-        category=category,
-        start_date=start_date,
-        end_date=end_date
-    )
+    """get filtered transactions, ordered by user, date and id
+
+    Pass the ``X-Next-Cursor`` header of a full page back as ``cursor`` for the next
+    one; unlike ``skip`` it costs the same at any depth.
+    """
+    try:
+        transactions = await service.get_filtered_transactions(
+            skip=skip,
+            limit=limit,
+            category=category,
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if transactions and len(transactions) == limit:
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.user_id, last.date, last.id)
     return transactions
 
+@router.get("/export")
+async def export_transactions(
+    format: str = "csv",
+    category: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    user_id: str = None
+):
+    """Stream every transaction matching the filters as CSV or NDJSON"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_MEDIA_TYPES)}")
+    try:
+        statement = filtered_transactions_statement(category, start_date, end_date, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        export_stream(statement, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    )
+
 @router.get("/categories")
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(service = Depends(get_transaction_service)):
     """Get all categories of transactions"""
-    service = TransactionService(db)
-    return service.get_categories()
+    return await service.get_categories()
 
 @router.get("/summary")
 async def get_transaction_summary(
     period: str = "30d",
-    db: Session = Depends(get_db)
+    user_id: str = None,
+    start: str = None,
+    end: str = None,
+    service = Depends(get_transaction_service)
+):
+    """Get transaction summary for a period, or for explicit start/end dates"""
+    try:
+        return await service.get_summary(period, user_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{transaction_id}")
+async def delete_transaction(
+    transaction_id: str,
+    user_id: str = None,
+    service = Depends(get_transaction_service)
 ):
-    """Get transaction summary for a period"""
-    service = TransactionService(db)
-    return service.get_summary(period)
\ No newline at end of file
+    """Delete a transaction and remove it from the daily rollup"""
+    if not await service.delete_transactions([transaction_id], user_id):
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return {"deleted": transaction_id}
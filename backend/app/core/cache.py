@@ -0,0 +1,268 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Version scope for queries that aggregate every user (no user_id given)
+ALL_USERS_SCOPE = "*"
+
+
+class MemoryCacheBackend:
+    """Process-local backend with per-key expiry, for tests and single-process runs"""
+
+    name = "memory"
+    # Versions live in this process only, so other processes' writes never bump them
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.monotonic():
+                self._values.pop(key, None)
+                self._expires.pop(key, None)
+            return self._values.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._values[key] = value
+            self._expires[key] = time.monotonic() + ttl
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._values[key] = int(self._values.get(key, 0)) + 1
+            return self._values[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._expires.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend on settings.REDIS_URL, so API processes and workers see the same versions"""
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(
+            url, decode_responses=True, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match="analytics:*"):
+            self.client.delete(key)
+
+
+class AnalyticsCache:
+    """Cache analytics results by (user, endpoint, parameters) behind a per-user data version
+
+    Ingestion bumps the user's version (and the all-users version), so stale
+    entries are never read again and simply expire. Backend errors are logged
+    and treated as misses; the cache never fails a request.
+    """
+
+    def __init__(self, backend=None, ttl: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0, "errors": 0})
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_compute(self, user_id: Optional[str], endpoint: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Return the cached result for this call, computing and storing it on a miss"""
+        if not self.enabled:
+            return compute()
+        found, key, cached = self._lookup(user_id, endpoint, params)
+        if found:
+            return cached
+        result = compute()
+        self._store(key, endpoint, result)
+        return result
+
+    async def get_or_compute_async(
+        self,
+        user_id: Optional[str],
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """get_or_compute for coroutine computations; shares keys with the sync path"""
+        if not self.enabled:
+            return await compute()
+        found, key, cached = self._lookup(user_id, endpoint, params)
+        if found:
+            return cached
+        result = await compute()
+        self._store(key, endpoint, result)
+        return result
+
+    def _lookup(self, user_id: Optional[str], endpoint: str, params: Dict[str, Any]) -> Tuple[bool, Optional[str], Any]:
+        """(found, key, value); key is None when the backend could not be reached"""
+        try:
+            key = self._key(user_id, endpoint, params)
+            cached = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Analytics cache read failed for {endpoint}: {e}")
+            self._count(endpoint, "errors")
+            return False, None, None
+
+        if cached is not None:
+            self._count(endpoint, "hits")
+            return True, key, json.loads(cached)
+        self._count(endpoint, "misses")
+        return False, key, None
+
+    def _store(self, key: Optional[str], endpoint: str, result: Any) -> None:
+        if key is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(result, default=str), self.ttl)
+        except Exception as e:
+            logger.warning(f"Analytics cache write failed for {endpoint}: {e}")
+            self._count(endpoint, "errors")
+
+    def bump(self, user_id: str) -> Optional[int]:
+        """Invalidate every cached result that could include this user's data; returns the new version"""
+        if not self.enabled:
+            return None
+        try:
+            version = self.backend.incr(self._version_key(user_id))
+            self.backend.incr(self._version_key(ALL_USERS_SCOPE))
+            return int(version)
+        except Exception as e:
+            logger.warning(f"Analytics cache invalidation failed for {user_id}: {e}")
+            self._count("invalidate", "errors")
+            return None
+
+    def data_version(self, user_id: Optional[str]) -> Optional[int]:
+        """Current data version for a user (or all users); None when versions are not tracked"""
+        if not self.enabled:
+            return None
+        try:
+            return int(self.backend.get(self._version_key(user_id or ALL_USERS_SCOPE)) or 0)
+        except Exception as e:
+            logger.warning(f"Analytics cache version read failed for {user_id}: {e}")
+            return None
+
+    def shared_data_version(self, user_id: Optional[str]) -> Optional[int]:
+        """data_version when every process reads and bumps the same versions, otherwise None
+
+        In-process state validated by version alone (columnar cache entries, prefix
+        indexes) has no expiry, so it may only be reused when a write from another
+        process (a Celery worker, another API worker) is certain to bump the version.
+        """
+        if not self.enabled or not getattr(self.backend, 'shared', False):
+            return None
+        return self.data_version(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process, overall and per endpoint"""
+        with self._lock:
+            by_endpoint = {endpoint: dict(counts) for endpoint, counts in self._counters.items()}
+        hits = sum(counts["hits"] for counts in by_endpoint.values())
+        misses = sum(counts["misses"] for counts in by_endpoint.values())
+        return {
+            "backend": self.backend.name if self.enabled else None,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "errors": sum(counts["errors"] for counts in by_endpoint.values()),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "endpoints": by_endpoint
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+    def _key(self, user_id: Optional[str], endpoint: str, params: Dict[str, Any]) -> str:
+        scope = user_id or ALL_USERS_SCOPE
+        version = self.backend.get(self._version_key(scope)) or 0
+        # Relative periods ("30d") end today, so the day is part of the key
+        payload = json.dumps({"params": params, "day": date.today().isoformat()}, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"analytics:{scope}:v{version}:{endpoint}:{digest}"
+
+    def _version_key(self, scope: str) -> str:
+        return f"analytics:version:{scope}"
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            self._counters[endpoint][outcome] += 1
+
+
+def create_backend(kind: str):
+    """Backend for settings.ANALYTICS_CACHE_BACKEND: redis, memory or none"""
+    if kind == "redis":
+        try:
+            return RedisCacheBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed; analytics cache disabled")
+            return None
+    if kind == "memory":
+        return MemoryCacheBackend()
+    return None
+
+
+analytics_cache = AnalyticsCache(create_backend(settings.ANALYTICS_CACHE_BACKEND), settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+
+def cached_result(endpoint: str):
+    """Serve a service method's result from analytics_cache, keyed by its user_id and arguments
+
+    Works on both plain and ``async def`` methods; both share the endpoint's keys.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        def cache_params(self, args, kwargs) -> Dict[str, Any]:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            return {name: value for name, value in bound.arguments.items() if name != 'self'}
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                params = cache_params(self, args, kwargs)
+                return await analytics_cache.get_or_compute_async(
+                    params.get('user_id'), endpoint, params, lambda: method(self, *args, **kwargs)
+                )
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            params = cache_params(self, args, kwargs)
+            return analytics_cache.get_or_compute(
+                params.get('user_id'), endpoint, params, lambda: method(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -11,8 +11,33 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", "5432"))
 
+    # Async engine for request handlers; derived from DATABASE_URL when unset.
+    # ASYNC_DB_ENABLED=false keeps the handlers on the sync engine, run in the threadpool
+    ASYNC_DB_ENABLED: bool = os.getenv("ASYNC_DB_ENABLED", "true").lower() == "true"
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20"))
+
+    # Postgres partitioning of transactions (migration 006): monthly ranges on date,
+    # optionally hash-split by user_id into this many sub-partitions (0 = none)
+    TRANSACTION_HASH_PARTITIONS: int = int(os.getenv("TRANSACTION_HASH_PARTITIONS", "0"))
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = int(os.getenv("TRANSACTION_PARTITION_MONTHS_AHEAD", "3"))
+
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+    # Analytics result cache
+    ANALYTICS_CACHE_BACKEND: str = os.getenv("ANALYTICS_CACHE_BACKEND", "redis")  # redis, memory or none
+    ANALYTICS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+
+    # In-process per-user transaction columns (0 disables); least recently used users are evicted past this.
+    # Only used with the redis analytics cache backend, whose data versions every process shares
+    COLUMNAR_CACHE_MAX_BYTES: int = int(os.getenv("COLUMNAR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Ingestion jobs
+    INGESTION_EXECUTOR: str = os.getenv("INGESTION_EXECUTOR", "local")  # local or celery
+    INGESTION_LOCAL_WORKERS: int = int(os.getenv("INGESTION_LOCAL_WORKERS", "2"))
+    UPLOAD_SPOOL_DIR: str = os.getenv("UPLOAD_SPOOL_DIR", "./uploads")
     
     # AI/ML APIs
     HUGGINGFACE_API_KEY: Optional[str] = os.getenv("HUGGINGFACE_API_KEY")
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from .config import settings
@@ -10,6 +11,13 @@ from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
 
+# Sync URL prefix -> async driver, used when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = [
+    ('postgresql+psycopg2://', 'postgresql+asyncpg://'),
+    ('postgresql://', 'postgresql+asyncpg://'),
+    ('sqlite:///', 'sqlite+aiosqlite:///'),
+]
+
 def create_database_engine():
     """Create database engine with retry logic"""
     max_retries = 5
@@ -56,6 +64,46 @@ def get_db() -> Session:
     finally:
         db.close()
 
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL switched to its async driver (asyncpg / aiosqlite)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    for sync_prefix, async_prefix in ASYNC_DRIVERS:
+        if settings.DATABASE_URL.startswith(sync_prefix):
+            return async_prefix + settings.DATABASE_URL[len(sync_prefix):]
+    raise ValueError(f"No async driver known for {settings.DATABASE_URL.split(':', 1)[0]}; set ASYNC_DATABASE_URL")
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine for request handlers, created on first use"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = async_database_url()
+        options = {'pool_pre_ping': True, 'pool_recycle': 300, 'echo': settings.DEBUG}
+        if not url.startswith('sqlite'):
+            options.update(pool_size=settings.ASYNC_DB_POOL_SIZE, max_overflow=settings.ASYNC_DB_MAX_OVERFLOW)
+        _async_engine = create_async_engine(url, **options)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+        logger.info("Async database engine created")
+    return _async_engine
+
+def async_session() -> AsyncSession:
+    """New AsyncSession for use as ``async with``, e.g. in a streaming body that outlives the request scope"""
+    get_async_engine()
+    return _async_session_factory()
+
+async def get_async_db() -> AsyncSession:
+    """Request-scoped AsyncSession; queries yield to the event loop instead of blocking it"""
+    async with async_session() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Async database session error: {e}")
+            await db.rollback()
+            raise
+
 def test_database_connection():
     """Test database connection"""
     try:
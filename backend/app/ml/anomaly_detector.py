@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from ..utils.fingerprint import normalize_description
+
+# Scale making the MAD a consistent estimator of the standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# Robust z-score above which a transaction counts as anomalous (Iglewicz and Hoaglin)
+ANOMALY_THRESHOLD = 3.5
+
+# Observations a merchant or category needs before its baseline is trusted
+MIN_BASELINE_COUNT = 5
+
+# Lower bounds on the MAD, so fixed-price subscriptions (MAD 0) do not flag a few cents' change
+MIN_MAD_AMOUNT = 1.0
+MIN_MAD_FRACTION = 0.05
+
+BASELINE_COLUMNS = ['scope', 'key', 'flow', 'median', 'mad', 'count']
+
+
+class RobustAnomalyDetector:
+    """Median/MAD anomaly scoring per merchant and per category, split by money flow direction
+
+    Debits and credits get separate baselines, so salary credits never inflate
+    the spread that coffee purchases are judged against. A transaction is scored
+    against its merchant's baseline when that has MIN_BASELINE_COUNT observations,
+    otherwise against its category's. Only amounts above the median score positive.
+    """
+
+    def __init__(self, min_count: int = MIN_BASELINE_COUNT):
+        self.min_count = min_count
+
+    def baselines(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Median, MAD and count of absolute amounts per (scope, key, flow)"""
+        observations = self._observations(df)
+        if observations.empty:
+            return pd.DataFrame(columns=BASELINE_COLUMNS)
+
+        groups = [observations['scope'], observations['key'], observations['flow']]
+        median = observations.groupby(groups)['value'].transform('median')
+        deviation = (observations['value'] - median).abs()
+        stats = pd.DataFrame({
+            'median': observations.groupby(groups)['value'].median(),
+            'mad': deviation.groupby(groups).median(),
+            'count': observations.groupby(groups).size()
+        })
+        stats.index.names = ['scope', 'key', 'flow']
+        return stats.reset_index()[BASELINE_COLUMNS]
+
+    def score(self, df: pd.DataFrame, baselines: pd.DataFrame) -> pd.DataFrame:
+        """Robust z-score of every row against its baseline, indexed like ``df``
+
+        Rows with no trusted baseline get a NaN score.
+        """
+        score = np.full(len(df), np.nan)
+        baseline_scope = np.full(len(df), None, dtype=object)
+        baseline_key = np.full(len(df), None, dtype=object)
+        baseline_median = np.full(len(df), np.nan)
+
+        if len(df) and not baselines.empty:
+            trusted = baselines[baselines['count'] >= self.min_count]
+            observations = self._observations(df.reset_index(drop=True))
+            observations['row'] = observations.index
+
+            # Category scores first, then overwritten wherever a merchant baseline exists
+            for scope in ('category', 'merchant'):
+                matched = observations[observations['scope'] == scope].merge(
+                    trusted[trusted['scope'] == scope], on=['scope', 'key', 'flow'], how='inner'
+                )
+                if matched.empty:
+                    continue
+                median = matched['median'].to_numpy(dtype=float)
+                spread = MAD_SCALE * np.maximum.reduce([
+                    matched['mad'].to_numpy(dtype=float),
+                    MIN_MAD_FRACTION * median,
+                    np.full(len(matched), MIN_MAD_AMOUNT)
+                ])
+                rows = matched['row'].to_numpy()
+                score[rows] = (matched['value'].to_numpy(dtype=float) - median) / spread
+                baseline_scope[rows] = scope
+                baseline_key[rows] = matched['key'].to_numpy()
+                baseline_median[rows] = median
+
+        return pd.DataFrame({
+            'score': score,
+            'baseline_scope': baseline_scope,
+            'baseline_key': baseline_key,
+            'baseline_median': baseline_median
+        }, index=df.index)
+
+    def _observations(self, df: pd.DataFrame) -> pd.DataFrame:
+        """One row per (transaction, scope): merchant and category keys with flow and absolute amount"""
+        if df.empty:
+            return pd.DataFrame(columns=['scope', 'key', 'flow', 'value'])
+
+        amounts = df['amount'].astype(float)
+        flow = pd.Series(np.where(amounts < 0, 'debit', 'credit'), index=df.index)
+        category = df['category'].astype(object).fillna('').astype(str) if 'category' in df.columns else pd.Series('', index=df.index)
+        frames = [
+            pd.DataFrame({'scope': 'merchant', 'key': merchant_keys(df), 'flow': flow, 'value': amounts.abs()}),
+            pd.DataFrame({'scope': 'category', 'key': category.replace('', 'other'), 'flow': flow, 'value': amounts.abs()})
+        ]
+        observations = pd.concat(frames)
+        return observations[observations['key'] != '']
+
+
+def merchant_keys(df: pd.DataFrame) -> pd.Series:
+    """Merchant name, or the description without digits and reference codes when there is none"""
+    description = normalize_description(df['description']) if 'description' in df.columns else pd.Series('', index=df.index)
+    description = description.str.replace(r'[^a-z ]+', ' ', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+    if 'merchant' not in df.columns:
+        return description
+    merchant = df['merchant'].fillna('').astype(str).str.strip().str.lower()
+    return merchant.where(merchant != '', description)
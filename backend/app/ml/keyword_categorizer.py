@@ -0,0 +1,63 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+
+class KeywordCategorizer:
+    """Compiled keyword matcher with first-category-wins semantics
+
+    Each category's keywords are compiled once into a single trie-shaped regex, so
+    matching cost grows with text length rather than keyword count. Texts are
+    factorized before matching, so repeated descriptions are only scanned once,
+    and each category only scans texts no earlier category has claimed.
+    """
+
+    def __init__(self, category_keywords: Dict[str, List[str]], default: str = 'other'):
+        self.default = default
+        self.patterns = []
+        for category, keywords in category_keywords.items():
+            keywords = [keyword for keyword in keywords if keyword]
+            if keywords:
+                self.patterns.append((category, re.compile(_trie_pattern(keywords))))
+
+    def categorize(self, texts: pd.Series) -> pd.Series:
+        """Return the first matching category for every text"""
+        codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+        unique_texts = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+
+        categories = np.full(len(unique_texts), self.default, dtype=object)
+        unresolved = np.ones(len(unique_texts), dtype=bool)
+
+        for category, pattern in self.patterns:
+            if not unresolved.any():
+                break
+            candidates = np.flatnonzero(unresolved)
+            hits = unique_texts.iloc[candidates].str.contains(pattern, na=False).to_numpy(dtype=bool)
+            matched = candidates[hits]
+            categories[matched] = category
+            unresolved[matched] = False
+
+        return pd.Series(categories[codes], index=texts.index, dtype=object)
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Build a prefix-factored alternation that matches if any keyword occurs"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    # For containment a completed keyword already matches, so longer keywords
+    # sharing the prefix are redundant and the branch can stop here
+    if '' in node:
+        return ''
+    alternatives = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items())]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
@@ -0,0 +1,269 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from ..utils.periods import shift_months
+from .anomaly_detector import merchant_keys
+
+# name, nominal interval in days, tolerance in days, calendar months per step (0: fixed days), minimum occurrences
+CADENCES = [
+    ('weekly', 7.0, 1.0, 0, 4),
+    ('biweekly', 14.0, 2.0, 0, 3),
+    ('monthly', 30.44, 4.0, 1, 3),
+    ('quarterly', 91.31, 8.0, 3, 3),
+    ('annual', 365.25, 15.0, 12, 2),
+]
+
+# Amount buckets are this wide relative to the amount, so small price changes stay in one series
+AMOUNT_BUCKET_RATIO = 0.15
+
+# Most recent occurrence dates kept per series; cadence and regularity are judged on these
+RECENT_OCCURRENCES = 13
+
+# Share of recent intervals that must fall within the cadence's tolerance
+MIN_REGULARITY = 0.75
+
+SERIES_KEY = ['merchant_key', 'flow', 'amount_bucket']
+
+SERIES_COLUMNS = SERIES_KEY + [
+    'description', 'occurrences', 'amount_total', 'last_amount', 'first_date', 'last_date', 'recent_dates',
+    'cadence', 'interval_days', 'regularity', 'is_recurring', 'next_expected_date', 'lapses_on'
+]
+
+_NOMINAL_DAYS = np.array([cadence[1] for cadence in CADENCES])
+_TOLERANCE_DAYS = np.array([cadence[2] for cadence in CADENCES])
+_MIN_OCCURRENCES = np.array([cadence[4] for cadence in CADENCES])
+
+
+class RecurringDetector:
+    """Subscriptions and recurring bills: series of same-merchant, similar-amount transactions at a regular cadence
+
+    Transactions are grouped by merchant key, money flow direction and a
+    logarithmic amount bucket, sorted by date within each group, and the median
+    interval between consecutive dates picks the cadence. A series is recurring
+    when enough of its recent intervals fall within that cadence's tolerance.
+    Everything is a sort plus grouped aggregates, so a batch is O(n log n).
+
+    Series state (SERIES_COLUMNS) keeps only counters and the last
+    RECENT_OCCURRENCES dates, so new transactions are folded in without
+    re-reading history.
+    """
+
+    def __init__(self, history: int = RECENT_OCCURRENCES):
+        self.history = history
+
+    def detect(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Recurring series in ``df`` alone"""
+        series = self.update(pd.DataFrame(columns=SERIES_COLUMNS), df)
+        return series[series['is_recurring']].reset_index(drop=True)
+
+    def update(self, state: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        """Fold transactions into stored series, returning the new state of every series ``df`` touches
+
+        ``state`` may hold any stored series; those ``df`` does not touch are ignored.
+        """
+        observations = self.observations(df)
+        if observations.empty:
+            return pd.DataFrame(columns=SERIES_COLUMNS)
+
+        raw = observations.groupby(SERIES_KEY).size().rename('weight').reset_index()
+        observations = self._snap(observations, pd.concat([raw, self._weights(state)]))
+        observations = observations.sort_values(SERIES_KEY + ['date'], kind='mergesort')
+        added = observations.groupby(SERIES_KEY, sort=False).agg(
+            new_count=('date', 'size'),
+            new_total=('amount', 'sum'),
+            new_first=('date', 'min'),
+            new_last=('date', 'last'),
+            new_last_amount=('amount', 'last'),
+            new_description=('description', 'last')
+        ).reset_index()
+
+        prior = self._prior(state, added[SERIES_KEY])
+        dates = pd.concat([self._stored_dates(prior), observations[SERIES_KEY + ['date']]])
+        series = added.merge(self._summarize(dates), on=SERIES_KEY).merge(
+            prior.drop(columns='recent_dates'), on=SERIES_KEY, how='left'
+        )
+
+        prior_last = pd.to_datetime(series['prior_last_date'])
+        newer = prior_last.isna() | (series['new_last'] >= prior_last)
+        series['occurrences'] = series['occurrences'].fillna(0).astype(int) + series['new_count']
+        series['amount_total'] = series['amount_total'].fillna(0.0).astype(float) + series['new_total']
+        series['first_date'] = pd.concat(
+            [pd.to_datetime(series['first_date']), series['new_first']], axis=1
+        ).min(axis=1).dt.date
+        series['last_amount'] = series['new_last_amount'].where(newer, series['last_amount'])
+        series['description'] = series['new_description'].where(newer, series['description'])
+        return series[SERIES_COLUMNS]
+
+    def remove(self, state: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        """Take deleted transactions back out of stored series, returning the new state of the series they were in
+
+        Series left without recent dates come back with zero occurrences.
+        """
+        observations = self.observations(df)
+        if observations.empty or state.empty:
+            return pd.DataFrame(columns=SERIES_COLUMNS)
+
+        observations = self._snap(observations, self._weights(state))
+        removed = observations.groupby(SERIES_KEY, sort=False).agg(
+            removed_count=('date', 'size'),
+            removed_total=('amount', 'sum')
+        ).reset_index()
+        prior = self._prior(state, removed[SERIES_KEY])
+        if prior.empty:
+            return pd.DataFrame(columns=SERIES_COLUMNS)
+
+        dates = self._stored_dates(prior).merge(
+            observations[SERIES_KEY + ['date']].drop_duplicates(), on=SERIES_KEY + ['date'], how='left', indicator=True
+        )
+        dates = dates[dates['_merge'] == 'left_only'].drop(columns='_merge')
+        series = prior.drop(columns='recent_dates').merge(removed, on=SERIES_KEY).merge(
+            self._summarize(dates), on=SERIES_KEY, how='left'
+        )
+
+        series['occurrences'] = (series['occurrences'].astype(int) - series['removed_count']).clip(lower=0)
+        series['amount_total'] = (series['amount_total'].astype(float) - series['removed_total']).clip(lower=0.0)
+        empty = series['recent_dates'].isna()
+        series.loc[empty, 'occurrences'] = 0
+        series['recent_dates'] = series['recent_dates'].fillna('')
+        series['is_recurring'] = series['is_recurring'].fillna(False).astype(bool)
+        series['last_date'] = series['last_date'].fillna(series['prior_last_date'])
+        return series[SERIES_COLUMNS]
+
+    def observations(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Series key, date, absolute amount and description of every transaction that can belong to a series"""
+        columns = SERIES_KEY + ['date', 'amount', 'description']
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+
+        amounts = df['amount'].astype(float)
+        magnitude = amounts.abs()
+        observations = pd.DataFrame({
+            'merchant_key': merchant_keys(df),
+            'flow': np.where(amounts < 0, 'debit', 'credit'),
+            'amount_bucket': amount_buckets(magnitude),
+            'date': pd.to_datetime(df['date']),
+            'amount': magnitude,
+            'description': df['description'].fillna('').astype(str)
+        }, index=df.index)
+        return observations[(observations['merchant_key'] != '') & (magnitude >= 0.01)][columns]
+
+    def candidate_keys(self, df: pd.DataFrame) -> pd.DataFrame:
+        """SERIES_KEY rows ``df``'s transactions may fall into, neighbouring amount buckets included"""
+        keys = self.observations(df)[SERIES_KEY].drop_duplicates()
+        return pd.concat(
+            [keys.assign(amount_bucket=keys['amount_bucket'] + offset) for offset in (-1, 0, 1)]
+        ).drop_duplicates()
+
+    def _snap(self, observations: pd.DataFrame, weights: pd.DataFrame) -> pd.DataFrame:
+        """Move each observation into the heaviest of its own and the two neighbouring amount buckets
+
+        Bucket edges are fixed, so a steady amount sitting on one would otherwise split its series.
+        Ties keep the observation's own bucket.
+        """
+        weight = weights.groupby(SERIES_KEY)['weight'].sum()
+        bucket = observations['amount_bucket'].to_numpy()
+        best_bucket, best_weight = bucket.copy(), np.full(len(bucket), -1.0)
+        for offset in (0, -1, 1):
+            candidate = pd.MultiIndex.from_arrays(
+                [observations['merchant_key'], observations['flow'], bucket + offset], names=SERIES_KEY
+            )
+            candidate_weight = weight.reindex(candidate).fillna(0).to_numpy(dtype=float)
+            heavier = candidate_weight > best_weight
+            best_bucket = np.where(heavier, bucket + offset, best_bucket)
+            best_weight = np.where(heavier, candidate_weight, best_weight)
+        return observations.assign(amount_bucket=best_bucket)
+
+    def _weights(self, state: pd.DataFrame) -> pd.DataFrame:
+        """Stored series keys weighted by their occurrences"""
+        if state.empty:
+            return pd.DataFrame({'merchant_key': [], 'flow': [], 'amount_bucket': [], 'weight': []})
+        return state[SERIES_KEY].assign(weight=state['occurrences'].astype(float))
+
+    def _prior(self, state: pd.DataFrame, keys: pd.DataFrame) -> pd.DataFrame:
+        """Stored state of the series in ``keys``, with last_date kept aside for comparison"""
+        prior = state[SERIES_COLUMNS].astype({'amount_bucket': int})
+        if not prior.empty:
+            prior = prior.merge(keys, on=SERIES_KEY)
+        return prior.drop(
+            columns=['cadence', 'interval_days', 'regularity', 'is_recurring', 'next_expected_date', 'lapses_on']
+        ).rename(columns={'last_date': 'prior_last_date'})
+
+    def _stored_dates(self, prior: pd.DataFrame) -> pd.DataFrame:
+        """One row per stored recent date of each series"""
+        if prior.empty:
+            return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in (
+                ('merchant_key', object), ('flow', object), ('amount_bucket', int), ('date', 'datetime64[ns]')
+            )})
+        dates = prior[SERIES_KEY].assign(date=prior['recent_dates'].str.split(',')).explode('date')
+        dates = dates[dates['date'].notna() & (dates['date'] != '')]
+        return dates.assign(date=pd.to_datetime(dates['date']))
+
+    def _summarize(self, dates: pd.DataFrame) -> pd.DataFrame:
+        """Cadence, regularity and next expected date of each series from its (SERIES_KEY, date) rows"""
+        if dates.empty:
+            return pd.DataFrame(columns=SERIES_KEY + [
+                'last_date', 'interval_days', 'recent_dates', 'regularity', 'cadence', 'is_recurring',
+                'next_expected_date', 'lapses_on'
+            ])
+        dates = dates.drop_duplicates().sort_values(SERIES_KEY + ['date'], kind='mergesort')
+        dates = dates[dates.groupby(SERIES_KEY, sort=False).cumcount(ascending=False) < self.history]
+        dates = dates.assign(
+            interval=dates.groupby(SERIES_KEY, sort=False)['date'].diff().dt.days,
+            iso=dates['date'].dt.strftime('%Y-%m-%d')
+        )
+        series = dates.groupby(SERIES_KEY, sort=False).agg(
+            recent_count=('date', 'size'),
+            last_date=('date', 'max'),
+            interval_days=('interval', 'median'),
+            recent_dates=('iso', ','.join)
+        ).reset_index()
+
+        # The first cadence whose tolerance band holds the median interval; bands do not overlap
+        interval = series['interval_days'].to_numpy(dtype=float)
+        fits = np.abs(interval[:, None] - _NOMINAL_DAYS[None, :]) <= _TOLERANCE_DAYS[None, :]
+        cadence = np.where(fits.any(axis=1), fits.argmax(axis=1), -1)
+        known = cadence >= 0
+        series['nominal'] = np.where(known, _NOMINAL_DAYS[cadence], np.nan)
+        series['tolerance'] = np.where(known, _TOLERANCE_DAYS[cadence], np.nan)
+
+        intervals = dates[dates['interval'].notna()].merge(
+            series[SERIES_KEY + ['nominal', 'tolerance']], on=SERIES_KEY
+        )
+        regular = (intervals['interval'] - intervals['nominal']).abs() <= intervals['tolerance']
+        regularity = regular.groupby([intervals[column] for column in SERIES_KEY]).mean().rename('regularity')
+        series = series.merge(regularity.reset_index(), on=SERIES_KEY, how='left')
+        series['regularity'] = series['regularity'].fillna(0.0)
+
+        # Index -1 picks the trailing None for series matching no cadence
+        series['cadence'] = np.array([name for name, *_ in CADENCES] + [None], dtype=object)[cadence]
+        series['is_recurring'] = (
+            known
+            & (series['recent_count'].to_numpy() >= _MIN_OCCURRENCES[cadence])
+            & (series['regularity'].to_numpy() >= MIN_REGULARITY)
+        )
+
+        last_date = series['last_date'].dt.date
+        series['next_expected_date'] = [
+            next_occurrence(day, index) if recurring else None
+            for day, index, recurring in zip(last_date, cadence, series['is_recurring'])
+        ]
+        series['lapses_on'] = [
+            expected + timedelta(days=int(np.ceil(_TOLERANCE_DAYS[index]))) if expected else None
+            for expected, index in zip(series['next_expected_date'], cadence)
+        ]
+        series['last_date'] = last_date
+        return series.drop(columns=['recent_count', 'nominal', 'tolerance'])
+
+
+def amount_buckets(amounts: pd.Series) -> np.ndarray:
+    """Logarithmic bucket of each absolute amount, AMOUNT_BUCKET_RATIO wide"""
+    values = np.maximum(amounts.to_numpy(dtype=float), 0.01)
+    return np.floor(np.log(values) / np.log1p(AMOUNT_BUCKET_RATIO)).astype(int)
+
+
+def next_occurrence(last_date, cadence_index: int):
+    """Date one cadence step after ``last_date``: calendar months for monthly and longer, days otherwise"""
+    _, nominal, _, months, _ = CADENCES[cadence_index]
+    if months:
+        return shift_months(last_date, months)
+    return last_date + timedelta(days=int(round(nominal)))
@@ -4,6 +4,9 @@ from typing import Dict,Any,List
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
 import re
+from .keyword_categorizer import KeywordCategorizer
+from .anomaly_detector import ANOMALY_THRESHOLD, RobustAnomalyDetector
+from .recurring_detector import RecurringDetector
 class TransactionAnalyzer:
     def __init__(self):
         self.category_keywords = {
@@ -18,11 +21,23 @@ class TransactionAnalyzer:
             'insurance': ['insurance', 'premium', 'policy'],
             'investment': ['investment', 'stock', 'bond', 'mutual fund', '401k']
         }
-    async def categorize_transactions(self,df:pd.DataFrame)->pd.DataFrame:
+        self.categorizer = KeywordCategorizer(self.category_keywords)
+        self.anomaly_detector = RobustAnomalyDetector()
+        self.recurring_detector = RecurringDetector()
+    def categorize_transactions(self,df:pd.DataFrame)->pd.DataFrame:
         """Categorize transactions based on desciption and merchant"""
-        df['category']=df.apply(self._categorize_single_transaction,axis=1)
+        if df.empty:
+            df['category']=pd.Series(dtype=object)
+            return df
+        df['category']=self.categorizer.categorize(self._categorization_text(df))
         return df
+    def _categorization_text(self,df:pd.DataFrame)->pd.Series:
+        """Vectorized equivalent of the text built in _categorize_single_transaction"""
+        description = df['description'].astype(str).str.lower() if 'description' in df.columns else ' '
+        merchant = df['merchant'].astype(str).str.lower() if 'merchant' in df.columns else ' '
+        return pd.Series(description,index=df.index,dtype=object)+pd.Series(merchant,index=df.index,dtype=object)
     def _categorize_single_transaction(self,row)->str:
+        """Row-at-a-time reference implementation (kept for benchmarks)"""
         description = str(row.get('description',' ')).lower()
         merchant = str(row.get('merchant',' ')).lower()
 
@@ -51,27 +66,41 @@ class TransactionAnalyzer:
         monthly_spending = df.groupby('month')['amount'].sum()
         analysis['monthly_trends']=monthly_spending.to_dict()
         analysis['unusual_transactions']=self._identify_unusual_transactions(df)
+        analysis['recurring_transactions']=self._identify_recurring_transactions(df)
 
         date_range = (df['date'].max()-df['date'].min()).days
         analysis['transactions_per_day']=len(df)/max(date_range,1)
 
         return analysis
+    def _identify_recurring_transactions(self,df:pd.DataFrame)->List[Dict[str,Any]]:
+        """subscriptions and recurring bills found in ``df``; RecurringService keeps them per user at ingest"""
+        series = self.recurring_detector.detect(df)
+        return [
+            {
+                'merchant':row.merchant_key,
+                'description':row.description,
+                'cadence':row.cadence,
+                'typical_amount':round(row.amount_total/row.occurrences,2),
+                'occurrences':int(row.occurrences),
+                'last_date':str(row.last_date),
+                'next_expected_date':str(row.next_expected_date)
+            }
+            for row in series.itertuples()
+        ]
     def _identify_unusual_transactions(self,df:pd.DataFrame)->List[Dict[str,Any]]:
-        """identify transactions that are unusually large"""
+        """identify transactions that are unusually large for their merchant or category
 
-        #calculating z-score for amounts
-        mean_amount = df['amount'].mean()
-        std_amount = df['amount'].std()
-
-        unusual_transactions=[]
-        for _,row in df.iterrows():
-            z_score = abs((row['amount']-mean_amount)/std_amount) if std_amount>0 else 0
-            if z_score>2:
-                unusual_transactions.append({
-                    'amount':row['amount'],
-                    'description':row['description'],
-                    'date':str(row[date]),
-                    'z_score':z_score
-                })
-        return unusual_transactions[:10]
-    
\ No newline at end of file
+        Robust (median/MAD) z-scores against baselines built from ``df`` itself;
+        stored per-user baselines are used at ingest by AnomalyService.
+        """
+        scores = self.anomaly_detector.score(df,self.anomaly_detector.baselines(df))['score']
+        unusual = scores[scores>=ANOMALY_THRESHOLD].nlargest(10)
+        return [
+            {
+                'amount':float(df.at[index,'amount']),
+                'description':df.at[index,'description'],
+                'date':str(pd.Timestamp(df.at[index,'date']).date()),
+                'z_score':float(z_score)
+            }
+            for index,z_score in unusual.items()
+        ]
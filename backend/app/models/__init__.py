@@ -0,0 +1,11 @@
+# Import every model so relationship() targets resolve however the package is entered
+from .user import User
+from .lookup import Category, Merchant
+from .transaction import Transaction
+from .financial_goal import FinancialGoal
+from .chat_history import ChatHistory
+from .ingestion_job import IngestionJob
+from .ingested_file import IngestedFile, IngestedRange
+from .daily_rollup import DailyUserCategoryRollup
+from .anomaly import AnomalyBaseline, TransactionAnomaly
+from .recurring import RecurringSeries
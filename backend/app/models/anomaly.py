@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Text, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class AnomalyBaseline(Base):
+    """Robust amount statistics for one user's merchant or category, per money flow direction"""
+    __tablename__ = "anomaly_baselines"
+
+    user_id = Column(String, primary_key=True)
+    scope = Column(String, primary_key=True)  # merchant or category
+    key = Column(String, primary_key=True)
+    flow = Column(String, primary_key=True)  # debit or credit
+
+    # Median and median absolute deviation of absolute amounts over the window
+    median = Column(Float, nullable=False)
+    mad = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+    window_start = Column(Date, nullable=False)
+    window_end = Column(Date, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TransactionAnomaly(Base):
+    """A transaction scored above the anomaly threshold against its user's baseline"""
+    __tablename__ = "transaction_anomalies"
+
+    transaction_id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+
+    # Copied from the transaction so top-N lookups never touch the transactions table
+    amount = Column(Float, nullable=False)
+    description = Column(Text, nullable=False)
+    category = Column(String, nullable=True)
+    merchant = Column(String, nullable=True)
+
+    score = Column(Float, nullable=False)
+    baseline_scope = Column(String, nullable=False)
+    baseline_key = Column(String, nullable=False)
+    baseline_median = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_anomalies_user_date', 'user_id', 'date'),
+        Index('idx_anomalies_date', 'date'),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, BigInteger, Integer, Date, Index
+from ..core.database import Base
+
+# Category key used for transactions stored without one
+ROLLUP_DEFAULT_CATEGORY = 'Other'
+
+class DailyUserCategoryRollup(Base):
+    """Per-user, per-day, per-category totals kept in step with the transactions table"""
+    __tablename__ = "daily_user_category_rollup"
+
+    user_id = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+
+    # Sum of positive amounts, and of the absolute value of negative amounts, in integer cents
+    income_cents = Column(BigInteger, nullable=False, default=0)
+    expense_cents = Column(BigInteger, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_rollup_date', 'date'),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Float, Date, DateTime, ForeignKey, Text, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, BigInteger, Date, DateTime, ForeignKey, Text, Boolean, cast
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
+from ..utils.money import CENTS_PER_UNIT, DEFAULT_CURRENCY
 
 class FinancialGoal(Base):
     __tablename__ = "financial_goals"
@@ -12,11 +13,17 @@ class FinancialGoal(Base):
     # Goal details
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    target_amount = Column(Float, nullable=False)
-    current_amount = Column(Float, default=0.0)
+    # Money in integer cents of ``currency`` (migration 010)
+    target_amount_cents = Column(BigInteger, nullable=False)
+    current_amount_cents = Column(BigInteger, default=0)
+    currency = Column(String(3), nullable=False, default=DEFAULT_CURRENCY, server_default=DEFAULT_CURRENCY)
     target_date = Column(Date, nullable=True)
     category = Column(String, nullable=True)  # emergency_fund, vacation, house, etc.
 
+    # Major-unit values
+    target_amount = column_property(cast(target_amount_cents, Float) / CENTS_PER_UNIT)
+    current_amount = column_property(cast(current_amount_cents, Float) / CENTS_PER_UNIT)
+
     # Status
     is_completed = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class IngestedFile(Base):
+    __tablename__ = "ingested_files"
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, nullable=False)
+
+    # SHA-256 of the raw uploaded bytes
+    content_hash = Column(String(64), nullable=False)
+    filename = Column(String, nullable=True)
+
+    total_rows = Column(Integer, default=0)
+    created_rows = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    ranges = relationship("IngestedRange", back_populates="file", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'content_hash', name='uq_ingested_files_user_hash'),
+    )
+
+
+class IngestedRange(Base):
+    """Date window one uploaded file covered for one account"""
+    __tablename__ = "ingested_ranges"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(String, ForeignKey("ingested_files.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(String, nullable=False)
+    account_type = Column(String, nullable=False, default='')
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+
+    # Relationships
+    file = relationship("IngestedFile", back_populates="ranges")
+
+    __table_args__ = (
+        Index('idx_ingested_ranges_user_account', 'user_id', 'account_type'),
+    )
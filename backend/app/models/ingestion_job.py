@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, nullable=True, index=True)
+
+    # Source file
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    file_size = Column(BigInteger, default=0)
+    content_hash = Column(String(64), nullable=True)
+    chunk_rows = Column(Integer, nullable=False)
+
+    # Progress
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    bytes_read = Column(BigInteger, default=0)
+    chunks_processed = Column(Integer, default=0)
+    total_rows = Column(Integer, default=0)
+    created_rows = Column(Integer, default=0)
+    skipped_rows = Column(Integer, default=0)
+    already_ingested_rows = Column(Integer, default=0)  # inside a covered window with a known fingerprint
+    duplicate_of = Column(String, nullable=True)  # ingested_files.id when the whole file was seen before
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, SmallInteger
+from ..core.database import Base
+
+class Category(Base):
+    """Distinct transaction category names; transactions store the small integer id"""
+    __tablename__ = "categories"
+
+    # SQLite only autoincrements an INTEGER PRIMARY KEY (a rowid alias), so it gets INTEGER there
+    id = Column(SmallInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+
+class Merchant(Base):
+    """Distinct merchant names; transactions store the integer id"""
+    __tablename__ = "merchants"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
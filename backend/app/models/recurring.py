@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Text, Boolean, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class RecurringSeries(Base):
+    """Same-merchant, similar-amount transactions of one user, and whether they recur at a regular cadence
+
+    Rows that do not (yet) recur are kept as candidates so later transactions can
+    complete them without re-reading history.
+    """
+    __tablename__ = "recurring_series"
+
+    user_id = Column(String, primary_key=True)
+    merchant_key = Column(String, primary_key=True)
+    flow = Column(String, primary_key=True)  # debit or credit
+    amount_bucket = Column(Integer, primary_key=True)  # logarithmic bucket of the absolute amount
+
+    description = Column(Text, nullable=False)  # latest transaction's description
+    occurrences = Column(Integer, nullable=False)
+    amount_total = Column(Float, nullable=False)  # sum of absolute amounts over every occurrence
+    last_amount = Column(Float, nullable=False)
+    first_date = Column(Date, nullable=False)
+    last_date = Column(Date, nullable=False)
+    recent_dates = Column(Text, nullable=False)  # comma-separated ISO dates of the latest occurrences
+
+    cadence = Column(String, nullable=True)  # weekly, biweekly, monthly, quarterly or annual
+    interval_days = Column(Float, nullable=True)  # median days between recent occurrences
+    regularity = Column(Float, nullable=False)  # share of recent intervals within the cadence's tolerance
+    is_recurring = Column(Boolean, nullable=False)
+    next_expected_date = Column(Date, nullable=True)
+    lapses_on = Column(Date, nullable=True)  # past this date without a new occurrence the series has lapsed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_recurring_user_lapses', 'user_id', 'is_recurring', 'lapses_on'),
+        Index('idx_recurring_user_last_date', 'user_id', 'last_date'),
+    )
@@ -1,61 +1,76 @@
-<<<<<<< HEAD
-from sqlalchemy import Column, String, Float, Date, DateTime, ForeignKey, Text, Index
-=======
-from sqlalchemy import Column,String,Float,Date,DateTime,ForeignKey,Text,Index
->>>>>>> 75f1347 (Updates)
-from sqlalchemy.orm import relationship
+from typing import Sequence
+from sqlalchemy import Column, String, Float, BigInteger, Integer, SmallInteger, Date, DateTime, ForeignKey, Text, Index, Select, UniqueConstraint, cast, select
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
+from ..utils.money import CENTS_PER_UNIT, DEFAULT_CURRENCY
+from .lookup import Category, Merchant
 
 class Transaction(Base):
     __tablename__ = "transactions"
-<<<<<<< HEAD
     
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     
     # Transaction details
-    amount = Column(Float, nullable=False)
+    # Integer minor units (cents) of ``currency`` (migration 010); ``amount`` below is the major-unit value
+    amount_cents = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=False, default=DEFAULT_CURRENCY, server_default=DEFAULT_CURRENCY)
     description = Column(Text, nullable=False)
-    category = Column(String, nullable=True)
-    merchant = Column(String, nullable=True)
+    # Dictionary-encoded: ids into the categories and merchants lookup tables (migration 009)
+    category_id = Column(SmallInteger, ForeignKey("categories.id"), nullable=True)
+    merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=True)
     account_type = Column(String, nullable=True)
+
+    # Content fingerprint of (user, date, amount, normalized description) used for dedup
+    fingerprint = Column(String(64), nullable=False)
     
     # Dates
     date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    amount = column_property(cast(amount_cents, Float) / CENTS_PER_UNIT)
+
+    # Names, read through a per-row subquery; bulk reads should join instead (transaction_select)
+    category = column_property(
+        select(Category.name).where(Category.id == category_id).correlate_except(Category).scalar_subquery()
+    )
+    merchant = column_property(
+        select(Merchant.name).where(Merchant.id == merchant_id).correlate_except(Merchant).scalar_subquery()
+    )
+
     # Relationships
     user = relationship("User", back_populates="transactions")
     
-    # Indexes for better query performance
+    # Indexes for better query performance. On Postgres the table is range-partitioned
+    # by month on date (migration 006), where the primary key is (id, date[, user_id])
     __table_args__ = (
         Index('idx_user_date', 'user_id', 'date'),
-        Index('idx_user_category', 'user_id', 'category'),
-        Index('idx_date_amount', 'date', 'amount'),
-=======
-    id = Column(String,primary_key=True,index=True)
-    user_id = Column(String,ForeignKey("users.id"),nullable=False)
-    
-    amount = Column(Float,nullable=False)
-    description = Column(Text,nullable=False)
-    category = Column(String,nullable=True)
-    merchant = Column(String,nullable=True)
-    account_type = Column(String,nullable=True)
+        Index('idx_user_category', 'user_id', 'category_id'),
+        Index('idx_date_amount', 'date', 'amount_cents'),
+        # date is part of the fingerprint, so including it keeps uniqueness identical
+        # while letting the constraint double as a (user_id, date) range index
+        UniqueConstraint('user_id', 'date', 'fingerprint', name='uq_transactions_user_fingerprint'),
+    )
 
+# Conflict target for set-based dedup (INSERT ... ON CONFLICT DO NOTHING)
+DEDUP_CONSTRAINT_COLUMNS = ['user_id', 'date', 'fingerprint']
 
-    #Dates
-    date = Column(Date, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+def transaction_select(columns: Sequence[str]) -> Select:
+    """Select of Transaction columns by name, labelled as named
 
-    user = relationship("User",back_populates="transactions")
-    # Indexing for better query performance
-    __table_args__=(
-        Index('idx_user_date','user_id','date'),
-        Index('idx_user_category','user_id','category'),
-        Index('idx_date_amount','date','amount')
->>>>>>> 75f1347 (Updates)
-    )
\ No newline at end of file
+    ``category`` and ``merchant`` come from an outer join to their lookup tables,
+    so a large read costs one hash join rather than a subquery per row.
+    """
+    names = {'category': Category.name, 'merchant': Merchant.name}
+    statement = select(*[
+        names[column].label(column) if column in names else getattr(Transaction, column)
+        for column in columns
+    ]).select_from(Transaction)
+    if 'category' in columns:
+        statement = statement.outerjoin(Category, Category.id == Transaction.category_id)
+    if 'merchant' in columns:
+        statement = statement.outerjoin(Merchant, Merchant.id == Transaction.merchant_id)
+    return statement
@@ -0,0 +1,353 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from .columnar_cache import UserColumns, columnar_cache
+from .frame_loader import load_frame_async
+from .prefix_index import load_rollup, rollup_days, rollup_statement
+from ..ml.spending_forecaster import SpendingForecaster
+from ..utils.money import CENTS_PER_UNIT, cents_value
+
+# Windows behind the sections whose range is fixed rather than requested
+INSIGHTS_DAYS = 30
+
+# History behind predictions: 26 weeks, so every weekday and day of the month recurs several times
+PREDICTION_BASE_DAYS = 182
+
+
+@dataclass
+class PeriodFrame:
+    """One scope's daily rollup rows between start and end as parallel arrays
+
+    ``day`` counts days from ``start``; ``category`` indexes into ``categories``,
+    which is sorted so per-category output keeps a stable name order. ``income``
+    and ``expenses`` are int64 cents, converted to major units only in the output.
+    """
+    start: date
+    end: date
+    day: np.ndarray
+    category: np.ndarray
+    categories: List[str]
+    income: np.ndarray
+    expenses: np.ndarray
+    count: np.ndarray
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def window(self, start: date, end: date) -> np.ndarray:
+        """Row mask for [start, end]"""
+        return (self.day >= (start - self.start).days) & (self.day <= (end - self.start).days)
+
+    def date_at(self, day: int) -> date:
+        return self.start + timedelta(days=int(day))
+
+
+class AnalyticsEngine:
+    """Compute every dashboard metric family from one columnar load of the daily rollup
+
+    ``load`` (or ``load_async`` on an AsyncSession) runs the only query; each
+    section is a handful of masked NumPy reductions over the loaded arrays, so
+    several sections over overlapping periods share a single scan. A single user's
+    frame comes from their cached transaction columns instead when they fit the
+    columnar cache, so repeat requests run no query at all.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.forecaster = SpendingForecaster()
+
+    def load(self, start: date, end: date, user_id: str = None) -> PeriodFrame:
+        """Load rollup rows for [start, end] (one user, or summed over all users) as arrays"""
+        columns = columnar_cache.get(self.db, user_id) if user_id else None
+        if columns is not None:
+            return self._columns_frame(columns, start, end)
+        return self._frame(load_rollup(self.db, user_id, since=start, until=end), start, end)
+
+    async def load_async(self, start: date, end: date, user_id: str = None) -> PeriodFrame:
+        """``load`` on an AsyncSession"""
+        columns = await columnar_cache.get_async(self.db, user_id) if user_id else None
+        if columns is not None:
+            return self._columns_frame(columns, start, end)
+        return self._frame(await load_frame_async(self.db, rollup_statement(user_id, start, end)), start, end)
+
+    def bundle_start(self, end: date, *starts: date) -> date:
+        """Earliest date any bundle section needs"""
+        return min(*starts, end - timedelta(days=INSIGHTS_DAYS))
+
+    def bundle(
+        self,
+        frame: PeriodFrame,
+        end: date,
+        period: str,
+        dashboard_start: date,
+        trends_start: date,
+        summary_start: date
+    ) -> Dict[str, Any]:
+        """Dashboard, spending trends, insights and summary sections from one loaded frame"""
+        return {
+            'dashboard': self.dashboard(frame, dashboard_start, end, period),
+            'spendingTrends': self.spending_trends(frame, trends_start, end),
+            'insights': self.insights(frame, end),
+            'summary': self.summary(frame, summary_start, end)
+        }
+
+    def dashboard(self, frame: PeriodFrame, start: date, end: date, period: str) -> Dict[str, Any]:
+        """Totals, monthly rates, daily spending and expense categories for [start, end]"""
+        rows = frame.window(start, end)
+        transaction_count = int(frame.count[rows].sum())
+        if not transaction_count:
+            return empty_dashboard_data()
+
+        income_cents = int(frame.income[rows].sum())
+        expense_cents = int(frame.expenses[rows].sum())
+        net_cents = income_cents - expense_cents
+
+        # Monthly calculations (approximate)
+        days_in_period = (end - start).days
+        monthly_multiplier = 30 / days_in_period if days_in_period > 0 else 1
+        savings_rate = (net_cents / income_cents * 100) if income_cents > 0 else 0
+
+        return {
+            'totalBalance': cents_value(net_cents),
+            'monthlyIncome': cents_value(income_cents) * monthly_multiplier,
+            'monthlyExpenses': cents_value(expense_cents) * monthly_multiplier,
+            'savingsRate': float(savings_rate),
+            'spendingTrend': [
+                {'date': str(day), 'amount': cents_value(cents)}
+                for day, cents in self._daily_expenses(frame, rows).items()
+            ],
+            'categoryBreakdown': [
+                {'name': category, 'value': cents_value(cents)}
+                for category, cents in self._category_expenses(frame, rows).items()
+            ],
+            'totalTransactions': transaction_count,
+            'period': period
+        }
+
+    def spending_trends(self, frame: PeriodFrame, start: date, end: date, category: str = None) -> Dict[str, Any]:
+        """Weekly spending totals and summary statistics for [start, end]"""
+        rows = frame.window(start, end)
+        if category:
+            rows &= frame.category == self._code(frame, category)
+        daily = pd.Series(self._daily_expenses(frame, rows), dtype=np.int64)
+        if daily.empty:
+            return {'trends': [], 'summary': {}}
+
+        weekly_trends = daily.groupby(pd.to_datetime(daily.index).to_period('W')).sum()
+        return {
+            'trends': [
+                {'period': str(week), 'amount': cents_value(cents)}
+                for week, cents in weekly_trends.items()
+            ],
+            'summary': {
+                'total_spent': cents_value(daily.sum()),
+                'average_weekly': float(weekly_trends.mean()) / CENTS_PER_UNIT,
+                'highest_week': cents_value(weekly_trends.max()),
+                'lowest_week': cents_value(weekly_trends.min()),
+                'trend_direction': calculate_trend_direction(weekly_trends)
+            }
+        }
+
+    def predictions(self, frame: PeriodFrame, end: date, horizon: int) -> Dict[str, Any]:
+        """Daily spending forecast for the ``horizon`` days after ``end`` from the last PREDICTION_BASE_DAYS days
+
+        Each day carries a [lower, upper] prediction interval; ``confidence`` is its
+        nominal coverage. ``method`` is the model SpendingForecaster picked.
+        """
+        start = end - timedelta(days=PREDICTION_BASE_DAYS)
+        rows = frame.window(start, end)
+        if not frame.count[rows].sum() or horizon <= 0:
+            return {'predictions': [], 'confidence': 0}
+
+        forecast = self.forecaster.forecast(self._daily_series(frame, rows, start, end), end, horizon)
+        point, lower, upper = (
+            np.round(values[0]).astype(np.int64) for values in (forecast.point, forecast.lower, forecast.upper)
+        )
+        return {
+            'predictions': [
+                {
+                    'date': str(forecast.date_at(step)),
+                    'predicted_spending': cents_value(point[step]),
+                    'lower': cents_value(lower[step]),
+                    'upper': cents_value(upper[step]),
+                    'confidence': forecast.level
+                }
+                for step in range(forecast.horizon)
+            ],
+            'total_predicted_spending': cents_value(point.sum()),
+            'confidence': forecast.level,
+            'method': str(forecast.method[0])
+        }
+
+    def insights(self, frame: PeriodFrame, end: date) -> Dict[str, Any]:
+        """Top spending category and savings rate over the last INSIGHTS_DAYS days"""
+        rows = frame.window(end - timedelta(days=INSIGHTS_DAYS), end)
+        if not frame.count[rows].sum():
+            return {'insights': [], 'recommendations': []}
+
+        insights = []
+        recommendations = []
+
+        # Spending insights
+        by_category = self._category_expenses(frame, rows)
+        if by_category:
+            top_category = max(by_category, key=by_category.get)
+            top_amount = cents_value(by_category[top_category])
+
+            insights.append(f"Your highest spending category is {top_category} with ${top_amount:.2f}")
+
+            if top_amount > 500:
+                recommendations.append(f"Consider reviewing your {top_category} expenses for potential savings")
+
+        # Income insights
+        total_income = int(frame.income[rows].sum())
+        if total_income > 0:
+            total_expenses = int(frame.expenses[rows].sum())
+            savings_rate = (total_income - total_expenses) / total_income * 100
+
+            insights.append(f"Your current savings rate is {savings_rate:.1f}%")
+
+            if savings_rate < 20:
+                recommendations.append("Try to increase your savings rate to at least 20%")
+            elif savings_rate > 30:
+                recommendations.append("Great job! You're saving more than 30% of your income")
+
+        return {
+            'insights': insights,
+            'recommendations': recommendations,
+            'period': f'{INSIGHTS_DAYS} days'
+        }
+
+    def summary(self, frame: PeriodFrame, start: date, end: date) -> Dict[str, Any]:
+        """Transaction count, income, expenses and net amount per category for [start, end]"""
+        rows = frame.window(start, end)
+        transaction_count = int(frame.count[rows].sum())
+        if not transaction_count:
+            return {
+                "total_transactions": 0,
+                "total_income": 0,
+                "total_expenses": 0,
+                "net_amount": 0,
+                "categories": {}
+            }
+
+        size = len(frame.categories)
+        net = exact_sums(frame.category[rows], frame.income[rows] - frame.expenses[rows], size)
+        counts = exact_sums(frame.category[rows], frame.count[rows], size)
+        income = int(frame.income[rows].sum())
+        expenses = int(frame.expenses[rows].sum())
+        return {
+            "total_transactions": transaction_count,
+            "total_income": cents_value(income),
+            "total_expenses": cents_value(expenses),
+            "net_amount": cents_value(income - expenses),
+            "categories": {
+                category: cents_value(net[code])
+                for code, category in enumerate(frame.categories)
+                if counts[code] > 0
+            }
+        }
+
+    def _frame(self, rows: pd.DataFrame, start: date, end: date) -> PeriodFrame:
+        codes, categories = pd.factorize(rows['category'], sort=True)
+        return PeriodFrame(
+            start=start,
+            end=end,
+            day=rollup_days(rows, start),
+            category=codes.astype(np.int64),
+            categories=list(categories),
+            income=rows['income_cents'].to_numpy(dtype=np.int64),
+            expenses=rows['expense_cents'].to_numpy(dtype=np.int64),
+            count=rows['transaction_count'].to_numpy(dtype=np.int64)
+        )
+
+    def _columns_frame(self, columns: UserColumns, start: date, end: date) -> PeriodFrame:
+        """One row per cached transaction in [start, end]; the sections sum them exactly like rollup rows"""
+        rows = columns.window(start, end)
+        amount = columns.amount_cents[rows]
+        order = np.argsort(np.array(columns.categories, dtype=object))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return PeriodFrame(
+            start=start,
+            end=end,
+            day=(columns.date[rows] - np.datetime64(start, 'D')).astype(np.int64),
+            category=rank[columns.category[rows]],
+            categories=[columns.categories[code] for code in order],
+            income=np.where(amount > 0, amount, 0),
+            expenses=np.where(amount < 0, -amount, 0),
+            count=np.ones(len(amount), dtype=np.int64)
+        )
+
+    def _daily_expenses(self, frame: PeriodFrame, rows: np.ndarray) -> Dict[date, int]:
+        """Cents spent per day, for days with at least one expense, oldest first"""
+        spending = rows & (frame.expenses > 0)
+        totals = exact_sums(frame.day[spending], frame.expenses[spending], frame.days)
+        spent_days = np.flatnonzero(np.bincount(frame.day[spending], minlength=frame.days))
+        return {frame.date_at(day): int(totals[day]) for day in spent_days}
+
+    def _daily_series(self, frame: PeriodFrame, rows: np.ndarray, start: date, end: date) -> np.ndarray:
+        """Cents spent on every day of [start, end], zero on days without expenses"""
+        spending = rows & (frame.expenses > 0)
+        offset = (start - frame.start).days
+        return exact_sums(frame.day[spending] - offset, frame.expenses[spending], (end - start).days + 1)
+
+    def _category_expenses(self, frame: PeriodFrame, rows: np.ndarray) -> Dict[str, int]:
+        """Cents spent per category with expenses, in category name order"""
+        spending = rows & (frame.expenses > 0)
+        size = len(frame.categories)
+        totals = exact_sums(frame.category[spending], frame.expenses[spending], size)
+        present = np.bincount(frame.category[spending], minlength=size)
+        return {
+            category: int(totals[code])
+            for code, category in enumerate(frame.categories)
+            if present[code]
+        }
+
+    def _code(self, frame: PeriodFrame, category: str) -> int:
+        try:
+            return frame.categories.index(category)
+        except ValueError:
+            return -1
+
+
+def exact_sums(codes: np.ndarray, cents: np.ndarray, size: int) -> np.ndarray:
+    """int64 totals of integer ``cents`` per code
+
+    bincount accumulates in float64, which represents every integer below 2**53
+    exactly, so for any realistic total of cents the result matches SUM in SQL.
+    """
+    return np.bincount(codes, weights=cents, minlength=size).astype(np.int64)
+
+
+def empty_dashboard_data() -> Dict[str, Any]:
+    """Return empty dashboard data structure"""
+    return {
+        'totalBalance': 0,
+        'monthlyIncome': 0,
+        'monthlyExpenses': 0,
+        'savingsRate': 0,
+        'spendingTrend': [],
+        'categoryBreakdown': [],
+        'totalTransactions': 0
+    }
+
+
+def calculate_trend_direction(series) -> str:
+    """Calculate if trend is increasing, decreasing, or stable"""
+    if len(series) < 2:
+        return 'stable'
+
+    first_half = series[:len(series)//2].mean()
+    second_half = series[len(series)//2:].mean()
+
+    if second_half > first_half * 1.1:
+        return 'increasing'
+    elif second_half < first_half * 0.9:
+        return 'decreasing'
+    else:
+        return 'stable'
@@ -1,257 +1,126 @@
-from typing import Dict, Any, List
+from typing import Dict, Any
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from ..models.transaction import Transaction
-import pandas as pd
+from ..core.cache import cached_result
+from ..utils.periods import period_start, previous_range, resolve_range
+from .analytics_engine import AnalyticsEngine, INSIGHTS_DAYS, PREDICTION_BASE_DAYS
+from .anomaly_service import AnomalyService
+from .prefix_index import prefix_indexes
+from .recurring_service import RecurringService
 
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
+        self.engine = AnalyticsEngine(db)
 
-    def get_dashboard_data(self, period: str = "30d") -> Dict[str, Any]:
+    @cached_result("dashboard")
+    def get_dashboard_data(self, period: str = "30d", user_id: str = None, start: str = None, end: str = None) -> Dict[str, Any]:
         """Get comprehensive dashboard analytics data"""
-        end_date = datetime.now().date()
-        start_date = self._get_start_date(period, end_date)
-        
-        # Get transactions for the period
-        transactions = self.db.query(Transaction).filter(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date
-            )
-        ).all()
-        
-        if not transactions:
-            return self._empty_dashboard_data()
-        
-        df = pd.DataFrame([{
-            'amount': float(t.amount),
-            'category': t.category or 'Other',
-            'date': t.date,
-            'description': t.description
-        } for t in transactions])
-        
-        # Calculate key metrics
-        total_income = df[df['amount'] > 0]['amount'].sum()
-        total_expenses = abs(df[df['amount'] < 0]['amount'].sum())
-        net_income = total_income - total_expenses
-        
-        # Monthly calculations (approximate)
-        days_in_period = (end_date - start_date).days
-        monthly_multiplier = 30 / days_in_period if days_in_period > 0 else 1
-        
-        monthly_income = total_income * monthly_multiplier
-        monthly_expenses = total_expenses * monthly_multiplier
-        savings_rate = (net_income / total_income * 100) if total_income > 0 else 0
-        
-        # Spending trend (daily aggregation)
-        daily_spending = df[df['amount'] < 0].groupby('date')['amount'].sum().abs()
-        spending_trend = [
-            {'date': str(date), 'amount': float(amount)}
-            for date, amount in daily_spending.items()
-        ]
-        
-        # Category breakdown (expenses only)
-        expense_categories = df[df['amount'] < 0].groupby('category')['amount'].sum().abs()
-        category_breakdown = [
-            {'name': category, 'value': float(amount)}
-            for category, amount in expense_categories.items()
-        ]
-        
-        return {
-            'totalBalance': float(net_income),
-            'monthlyIncome': float(monthly_income),
-            'monthlyExpenses': float(monthly_expenses),
-            'savingsRate': float(savings_rate),
-            'spendingTrend': spending_trend,
-            'categoryBreakdown': category_breakdown,
-            'totalTransactions': len(transactions),
-            'period': period
-        }
+        start_date, end_date = resolve_range(period, start, end)
+        frame = self.engine.load(start_date, end_date, user_id)
+        return self.engine.dashboard(frame, start_date, end_date, period)
 
-    def get_spending_trends(self, period: str = "90d", category: str = None) -> Dict[str, Any]:
+    @cached_result("spending_trends")
+    def get_spending_trends(self, period: str = "90d", category: str = None, user_id: str = None) -> Dict[str, Any]:
         """Get detailed spending trends analysis"""
         end_date = datetime.now().date()
         start_date = self._get_start_date(period, end_date)
-        
-        query = self.db.query(Transaction).filter(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date,
-                Transaction.amount < 0  # Only expenses
-            )
-        )
-        
-        if category:
-            query = query.filter(Transaction.category == category)
-        
-        transactions = query.all()
-        
-        if not transactions:
-            return {'trends': [], 'summary': {}}
-        
-        df = pd.DataFrame([{
-            'amount': abs(float(t.amount)),
-            'category': t.category or 'Other',
-            'date': t.date
-        } for t in transactions])
-        
-        # Weekly trends
-        df['week'] = pd.to_datetime(df['date']).dt.to_period('W')
-        weekly_trends = df.groupby('week')['amount'].sum()
-        
-        trends = [
-            {'period': str(week), 'amount': float(amount)}
-            for week, amount in weekly_trends.items()
-        ]
-        
-        # Summary statistics
-        summary = {
-            'total_spent': float(df['amount'].sum()),
-            'average_weekly': float(weekly_trends.mean()),
-            'highest_week': float(weekly_trends.max()),
-            'lowest_week': float(weekly_trends.min()),
-            'trend_direction': self._calculate_trend_direction(weekly_trends)
-        }
-        
-        return {'trends': trends, 'summary': summary}
+        frame = self.engine.load(start_date, end_date, user_id)
+        return self.engine.spending_trends(frame, start_date, end_date, category)
 
-    def get_predictions(self, horizon: int = 30) -> Dict[str, Any]:
-        """Get financial predictions (simplified version)"""
-        # Get last 90 days of data for prediction base
+    @cached_result("predictions")
+    def get_predictions(self, horizon: int = 30, user_id: str = None) -> Dict[str, Any]:
+        """Get daily spending forecasts with prediction intervals"""
         end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=90)
-        
-        transactions = self.db.query(Transaction).filter(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date
-            )
-        ).all()
-        
-        if not transactions:
-            return {'predictions': [], 'confidence': 0}
-        
-        df = pd.DataFrame([{
-            'amount': float(t.amount),
-            'date': t.date
-        } for t in transactions])
-        
-        # Simple moving average prediction
-        daily_spending = df[df['amount'] < 0].groupby('date')['amount'].sum().abs()
-        avg_daily_spending = daily_spending.mean()
-        
-        # Generate predictions for next 'horizon' days
-        predictions = []
-        for i in range(horizon):
-            future_date = end_date + timedelta(days=i+1)
-            predicted_amount = float(avg_daily_spending)
-            predictions.append({
-                'date': str(future_date),
-                'predicted_spending': predicted_amount,
-                'confidence': 0.7  # Static confidence for now
-            })
-        
-        return {
-            'predictions': predictions,
-            'total_predicted_spending': float(avg_daily_spending * horizon),
-            'confidence': 0.7,
-            'method': 'moving_average'
-        }
+        frame = self.engine.load(end_date - timedelta(days=PREDICTION_BASE_DAYS), end_date, user_id)
+        return self.engine.predictions(frame, end_date, horizon)
 
-    def get_insights(self) -> Dict[str, Any]:
+    @cached_result("insights")
+    def get_insights(self, user_id: str = None) -> Dict[str, Any]:
         """Get financial insights and recommendations"""
-        # Get last 30 days of data
         end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=30)
-        
-        transactions = self.db.query(Transaction).filter(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date
-            )
-        ).all()
-        
-        if not transactions:
-            return {'insights': [], 'recommendations': []}
-        
-        df = pd.DataFrame([{
-            'amount': float(t.amount),
-            'category': t.category or 'Other',
-            'date': t.date
-        } for t in transactions])
-        
-        insights = []
-        recommendations = []
-        
-        # Spending insights
-        expenses = df[df['amount'] < 0]
-        if not expenses.empty:
-            top_category = expenses.groupby('category')['amount'].sum().abs().idxmax()
-            top_amount = expenses.groupby('category')['amount'].sum().abs().max()
-            
-            insights.append(f"Your highest spending category is {top_category} with ${top_amount:.2f}")
-            
-            if top_amount > 500:
-                recommendations.append(f"Consider reviewing your {top_category} expenses for potential savings")
-        
-        # Income insights
-        income = df[df['amount'] > 0]
-        if not income.empty:
-            total_income = income['amount'].sum()
-            total_expenses = abs(expenses['amount'].sum())
-            savings_rate = (total_income - total_expenses) / total_income * 100
-            
-            insights.append(f"Your current savings rate is {savings_rate:.1f}%")
-            
-            if savings_rate < 20:
-                recommendations.append("Try to increase your savings rate to at least 20%")
-            elif savings_rate > 30:
-                recommendations.append("Great job! You're saving more than 30% of your income")
-        
-        return {
-            'insights': insights,
-            'recommendations': recommendations,
-            'period': '30 days'
-        }
+        frame = self.engine.load(end_date - timedelta(days=INSIGHTS_DAYS), end_date, user_id)
+        return self.engine.insights(frame, end_date)
 
-    def _get_start_date(self, period: str, end_date) -> datetime.date:
-        """Convert period string to start date"""
-        if period == "7d":
-            return end_date - timedelta(days=7)
-        elif period == "30d":
-            return end_date - timedelta(days=30)
-        elif period == "90d":
-            return end_date - timedelta(days=90)
-        elif period == "1y":
-            return end_date - timedelta(days=365)
-        else:
-            return end_date - timedelta(days=30)
+    @cached_result("bundle")
+    def get_bundle(
+        self,
+        period: str = "30d",
+        trends_period: str = "90d",
+        summary_period: str = "30d",
+        user_id: str = None
+    ) -> Dict[str, Any]:
+        """Dashboard, spending trends, insights and summary from a single load of the widest range"""
+        end_date = datetime.now().date()
+        dashboard_start = self._get_start_date(period, end_date)
+        trends_start = self._get_start_date(trends_period, end_date)
+        summary_start = self._get_start_date(summary_period, end_date)
+
+        frame = self.engine.load(self.engine.bundle_start(end_date, dashboard_start, trends_start, summary_start), end_date, user_id)
+        return self.engine.bundle(frame, end_date, period, dashboard_start, trends_start, summary_start)
+
+    @cached_result("anomalies")
+    def get_anomalies(
+        self,
+        period: str = "30d",
+        start: str = None,
+        end: str = None,
+        limit: int = 10,
+        user_id: str = None
+    ) -> Dict[str, Any]:
+        """Top-N transactions by robust anomaly score dated within a range"""
+        start_date, end_date = resolve_range(period, start, end)
+        return AnomalyService(self.db).top(start_date, end_date, user_id, limit)
+
+    @cached_result("recurring")
+    def get_recurring(self, status: str = "active", limit: int = 50, user_id: str = None) -> Dict[str, Any]:
+        """Detected subscriptions and recurring bills with their next expected dates"""
+        return RecurringService(self.db).series(user_id, status, limit)
 
-    def _empty_dashboard_data(self) -> Dict[str, Any]:
-        """Return empty dashboard data structure"""
+    def get_range_summary(
+        self,
+        period: str = "30d",
+        start: str = None,
+        end: str = None,
+        user_id: str = None,
+        category: str = None
+    ) -> Dict[str, Any]:
+        """Totals for any date range (explicit start/end or a period) from the prefix-sum index"""
+        start_date, end_date = resolve_range(period, start, end)
+        index = prefix_indexes.get(self.db, user_id, start_date, end_date)
+        summary = {'start': str(start_date), 'end': str(end_date), **index.totals(start_date, end_date, category)}
+        if category is None:
+            summary['categories'] = index.category_totals(start_date, end_date)
+        return summary
+
+    def compare_periods(
+        self,
+        period: str = "mtd",
+        start: str = None,
+        end: str = None,
+        user_id: str = None,
+        category: str = None
+    ) -> Dict[str, Any]:
+        """Totals for a range next to the comparable previous range (e.g. this month vs last month)"""
+        start_date, end_date = resolve_range(period, start, end)
+        previous_start, previous_end = previous_range(start_date, end_date, None if start else period)
+        index = prefix_indexes.get(self.db, user_id, min(start_date, previous_start), max(end_date, previous_end))
+
+        current = index.totals(start_date, end_date, category)
+        previous = index.totals(previous_start, previous_end, category)
+        change = {
+            metric: {
+                'amount': round(current[metric] - previous[metric], 2),
+                'percent': round((current[metric] - previous[metric]) / abs(previous[metric]) * 100, 1) if previous[metric] else None
+            }
+            for metric in ('income', 'expenses', 'net', 'transactions')
+        }
         return {
-            'totalBalance': 0,
-            'monthlyIncome': 0,
-            'monthlyExpenses': 0,
-            'savingsRate': 0,
-            'spendingTrend': [],
-            'categoryBreakdown': [],
-            'totalTransactions': 0
+            'current': {'start': str(start_date), 'end': str(end_date), **current},
+            'previous': {'start': str(previous_start), 'end': str(previous_end), **previous},
+            'change': change
         }
 
-    def _calculate_trend_direction(self, series) -> str:
-        """Calculate if trend is increasing, decreasing, or stable"""
-        if len(series) < 2:
-            return 'stable'
-        
-        first_half = series[:len(series)//2].mean()
-        second_half = series[len(series)//2:].mean()
-        
-        if second_half > first_half * 1.1:
-            return 'increasing'
-        elif second_half < first_half * 0.9:
-            return 'decreasing'
-        else:
-            return 'stable'
\ No newline at end of file
+    def _get_start_date(self, period: str, end_date) -> datetime.date:
+        """Convert period string to start date"""
+        return period_start(period, end_date)
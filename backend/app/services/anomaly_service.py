@@ -0,0 +1,187 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+from sqlalchemy import Select, insert, select
+from sqlalchemy.orm import Session
+from ..core.cache import analytics_cache
+from ..ml.anomaly_detector import ANOMALY_THRESHOLD, BASELINE_COLUMNS, RobustAnomalyDetector
+from ..models.anomaly import AnomalyBaseline, TransactionAnomaly
+from ..models.transaction import Transaction, transaction_select
+
+logger = logging.getLogger(__name__)
+
+# History a baseline is computed over
+BASELINE_WINDOW_DAYS = 180
+
+# Rebuild baselines once new rows are dated this many days past the window they cover
+BASELINE_REFRESH_DAYS = 7
+
+# ...or when one batch is this large relative to the transactions behind the baselines
+BASELINE_REFRESH_GROWTH = 0.5
+
+SCORED_COLUMNS = ['id', 'user_id', 'amount', 'description', 'category', 'merchant', 'date']
+
+ANOMALY_COLUMNS = [
+    TransactionAnomaly.transaction_id,
+    TransactionAnomaly.user_id,
+    TransactionAnomaly.date,
+    TransactionAnomaly.amount,
+    TransactionAnomaly.description,
+    TransactionAnomaly.category,
+    TransactionAnomaly.merchant,
+    TransactionAnomaly.score,
+    TransactionAnomaly.baseline_scope,
+    TransactionAnomaly.baseline_key,
+    TransactionAnomaly.baseline_median
+]
+
+
+def top_anomalies_statement(start: date, end: date, user_id: str = None, limit: int = 10) -> Select:
+    """Highest-scoring stored anomalies dated within [start, end]; shared by sync and async sessions"""
+    statement = select(*ANOMALY_COLUMNS).where(TransactionAnomaly.date >= start, TransactionAnomaly.date <= end)
+    if user_id:
+        statement = statement.where(TransactionAnomaly.user_id == user_id)
+    return statement.order_by(TransactionAnomaly.score.desc()).limit(limit)
+
+
+def anomaly_report(rows: Sequence[Any], start: date, end: date) -> Dict[str, Any]:
+    """Response body for top_anomalies_statement rows"""
+    return {
+        'start': str(start),
+        'end': str(end),
+        'threshold': ANOMALY_THRESHOLD,
+        'anomalies': [
+            {
+                'transaction_id': row.transaction_id,
+                'user_id': row.user_id,
+                'date': str(row.date),
+                'amount': row.amount,
+                'description': row.description,
+                'category': row.category,
+                'merchant': row.merchant,
+                'score': round(row.score, 2),
+                'baseline': {
+                    'scope': row.baseline_scope,
+                    'key': row.baseline_key,
+                    'median': round(row.baseline_median, 2)
+                }
+            }
+            for row in rows
+        ]
+    }
+
+
+class AnomalyService:
+    """Store robust anomaly scores for transactions against per-user baselines
+
+    Ingest scores only the rows it just inserted, against the user's stored
+    baselines; history is read only when those baselines need rebuilding.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.detector = RobustAnomalyDetector()
+
+    def score_new(self, rows: pd.DataFrame, user_id: str) -> int:
+        """Score freshly inserted rows (SCORED_COLUMNS) and store the anomalies; the caller commits"""
+        if rows.empty:
+            return 0
+        as_of = max(rows['date'])
+        baselines = self.load_baselines(user_id)
+        if self._stale(baselines, as_of, len(rows)):
+            baselines = self.refresh_baselines(user_id, as_of)
+        return self._store_scored(rows, baselines)
+
+    def load_baselines(self, user_id: str) -> pd.DataFrame:
+        rows = self.db.execute(
+            select(
+                AnomalyBaseline.scope,
+                AnomalyBaseline.key,
+                AnomalyBaseline.flow,
+                AnomalyBaseline.median,
+                AnomalyBaseline.mad,
+                AnomalyBaseline.count,
+                AnomalyBaseline.window_end
+            ).where(AnomalyBaseline.user_id == user_id)
+        ).all()
+        return pd.DataFrame(rows, columns=BASELINE_COLUMNS + ['window_end'])
+
+    def refresh_baselines(self, user_id: str, as_of: Optional[date] = None) -> pd.DataFrame:
+        """Rebuild a user's baselines from the BASELINE_WINDOW_DAYS up to ``as_of``; the caller commits"""
+        as_of = as_of or date.today()
+        window_start = as_of - timedelta(days=BASELINE_WINDOW_DAYS)
+        baselines = self.detector.baselines(self._history(user_id, window_start, as_of))
+
+        self.db.query(AnomalyBaseline).filter(AnomalyBaseline.user_id == user_id).delete(synchronize_session=False)
+        if not baselines.empty:
+            self.db.execute(
+                insert(AnomalyBaseline),
+                baselines.assign(user_id=user_id, window_start=window_start, window_end=as_of).to_dict('records')
+            )
+        logger.info(f"Rebuilt {len(baselines)} anomaly baselines for {user_id} up to {as_of}")
+        return baselines.assign(window_end=as_of)
+
+    def rescore(self, user_id: str = None) -> int:
+        """Rebuild baselines and re-score the last BASELINE_WINDOW_DAYS for one user, or every user, and commit"""
+        if user_id:
+            user_ids = [user_id]
+        else:
+            user_ids = [owner for (owner,) in self.db.execute(select(Transaction.user_id).distinct())]
+
+        stored = 0
+        as_of = date.today()
+        for owner in user_ids:
+            baselines = self.refresh_baselines(owner, as_of)
+            self.db.query(TransactionAnomaly).filter(
+                TransactionAnomaly.user_id == owner
+            ).delete(synchronize_session=False)
+            history = self._history(owner, as_of - timedelta(days=BASELINE_WINDOW_DAYS), as_of)
+            stored += self._store_scored(history, baselines)
+            self.db.commit()
+            analytics_cache.bump(owner)
+        return stored
+
+    def forget(self, transaction_ids: Iterable[str]) -> None:
+        """Drop stored scores of deleted transactions; the caller commits"""
+        self.db.query(TransactionAnomaly).filter(
+            TransactionAnomaly.transaction_id.in_(list(transaction_ids))
+        ).delete(synchronize_session=False)
+
+    def top(self, start: date, end: date, user_id: str = None, limit: int = 10) -> Dict[str, Any]:
+        return anomaly_report(self.db.execute(top_anomalies_statement(start, end, user_id, limit)).all(), start, end)
+
+    def _stale(self, baselines: pd.DataFrame, as_of: date, new_rows: int) -> bool:
+        if baselines.empty:
+            return True
+        if max(baselines['window_end']) + timedelta(days=BASELINE_REFRESH_DAYS) < as_of:
+            return True
+        # every transaction is counted once in the category scope
+        observed = baselines.loc[baselines['scope'] == 'category', 'count'].sum()
+        return new_rows > BASELINE_REFRESH_GROWTH * observed
+
+    def _history(self, user_id: str, start: date, end: date) -> pd.DataFrame:
+        rows = self.db.execute(
+            transaction_select(SCORED_COLUMNS).where(
+                Transaction.user_id == user_id,
+                Transaction.date >= start,
+                Transaction.date <= end
+            )
+        ).all()
+        return pd.DataFrame(rows, columns=SCORED_COLUMNS)
+
+    def _store_scored(self, rows: pd.DataFrame, baselines: pd.DataFrame) -> int:
+        """Insert the rows scoring at or above ANOMALY_THRESHOLD"""
+        if rows.empty:
+            return 0
+        scored = self.detector.score(rows, baselines)
+        flagged = scored['score'] >= ANOMALY_THRESHOLD
+        if not flagged.any():
+            return 0
+
+        anomalies = rows.loc[flagged, SCORED_COLUMNS].rename(columns={'id': 'transaction_id'})
+        anomalies = anomalies.join(scored.loc[flagged])
+        anomalies['description'] = anomalies['description'].fillna('').astype(str)
+        records: List[Dict[str, Any]] = anomalies.to_dict('records')
+        self.db.execute(insert(TransactionAnomaly), records)
+        return len(records)
@@ -0,0 +1,262 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import cached_result
+from ..core.config import settings
+from ..core.database import SessionLocal, async_session
+from ..models.lookup import Category, Merchant
+from ..models.transaction import Transaction
+from ..utils.periods import period_start, resolve_range
+from .analytics_engine import AnalyticsEngine, INSIGHTS_DAYS, PREDICTION_BASE_DAYS
+from .analytics_services import AnalyticsService
+from .anomaly_service import anomaly_report, top_anomalies_statement
+from .lookup_service import category_names_statement
+from .recurring_service import recurring_report, recurring_series_statement
+from .transaction_service import TransactionService, filtered_transactions_statement
+
+# Export formats and their media types
+EXPORT_MEDIA_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+EXPORT_COLUMNS = ['id', 'user_id', 'date', 'amount', 'currency', 'description', 'category', 'merchant', 'account_type']
+
+# Rows fetched from the server-side cursor, and written out, per chunk
+EXPORT_BATCH_ROWS = 1000
+
+
+class AsyncAnalyticsService:
+    """AnalyticsService for AsyncSession: the rollup load is awaited, sections are shared with the sync engine
+
+    Cache endpoints match AnalyticsService, so both paths read each other's entries.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.engine = AnalyticsEngine(db)
+
+    @cached_result("dashboard")
+    async def get_dashboard_data(self, period: str = "30d", user_id: str = None, start: str = None, end: str = None) -> Dict[str, Any]:
+        """Get comprehensive dashboard analytics data"""
+        start_date, end_date = resolve_range(period, start, end)
+        frame = await self.engine.load_async(start_date, end_date, user_id)
+        return self.engine.dashboard(frame, start_date, end_date, period)
+
+    @cached_result("spending_trends")
+    async def get_spending_trends(self, period: str = "90d", category: str = None, user_id: str = None) -> Dict[str, Any]:
+        """Get detailed spending trends analysis"""
+        end_date = datetime.now().date()
+        start_date = period_start(period, end_date)
+        frame = await self.engine.load_async(start_date, end_date, user_id)
+        return self.engine.spending_trends(frame, start_date, end_date, category)
+
+    @cached_result("predictions")
+    async def get_predictions(self, horizon: int = 30, user_id: str = None) -> Dict[str, Any]:
+        """Get daily spending forecasts with prediction intervals"""
+        end_date = datetime.now().date()
+        frame = await self.engine.load_async(end_date - timedelta(days=PREDICTION_BASE_DAYS), end_date, user_id)
+        return self.engine.predictions(frame, end_date, horizon)
+
+    @cached_result("insights")
+    async def get_insights(self, user_id: str = None) -> Dict[str, Any]:
+        """Get financial insights and recommendations"""
+        end_date = datetime.now().date()
+        frame = await self.engine.load_async(end_date - timedelta(days=INSIGHTS_DAYS), end_date, user_id)
+        return self.engine.insights(frame, end_date)
+
+    @cached_result("bundle")
+    async def get_bundle(
+        self,
+        period: str = "30d",
+        trends_period: str = "90d",
+        summary_period: str = "30d",
+        user_id: str = None
+    ) -> Dict[str, Any]:
+        """Dashboard, spending trends, insights and summary from a single load of the widest range"""
+        end_date = datetime.now().date()
+        dashboard_start = period_start(period, end_date)
+        trends_start = period_start(trends_period, end_date)
+        summary_start = period_start(summary_period, end_date)
+
+        frame = await self.engine.load_async(
+            self.engine.bundle_start(end_date, dashboard_start, trends_start, summary_start), end_date, user_id
+        )
+        return self.engine.bundle(frame, end_date, period, dashboard_start, trends_start, summary_start)
+
+    @cached_result("anomalies")
+    async def get_anomalies(
+        self,
+        period: str = "30d",
+        start: str = None,
+        end: str = None,
+        limit: int = 10,
+        user_id: str = None
+    ) -> Dict[str, Any]:
+        """Top-N transactions by robust anomaly score dated within a range"""
+        start_date, end_date = resolve_range(period, start, end)
+        result = await self.db.execute(top_anomalies_statement(start_date, end_date, user_id, limit))
+        return anomaly_report(result.all(), start_date, end_date)
+
+    @cached_result("recurring")
+    async def get_recurring(self, status: str = "active", limit: int = 50, user_id: str = None) -> Dict[str, Any]:
+        """Detected subscriptions and recurring bills with their next expected dates"""
+        as_of = date.today()
+        result = await self.db.execute(recurring_series_statement(user_id, status, as_of, limit))
+        return recurring_report(result.all(), as_of)
+
+    async def get_range_summary(self, *args, **kwargs) -> Dict[str, Any]:
+        """Prefix-index lookups; the index registry is sync, so it runs on the session's greenlet bridge"""
+        return await self.db.run_sync(lambda db: AnalyticsService(db).get_range_summary(*args, **kwargs))
+
+    async def compare_periods(self, *args, **kwargs) -> Dict[str, Any]:
+        return await self.db.run_sync(lambda db: AnalyticsService(db).compare_periods(*args, **kwargs))
+
+
+class AsyncTransactionService:
+    """Read paths of TransactionService on an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_filtered_transactions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        category: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        user_id: str = None,
+        cursor: str = None
+    ) -> List[Transaction]:
+        """Get a page of filtered transactions, after ``cursor`` (keyset) or ``skip`` rows (offset)"""
+        statement = filtered_transactions_statement(category, start_date, end_date, user_id, cursor)
+        if skip:
+            statement = statement.offset(skip)
+        result = await self.db.execute(statement.limit(limit))
+        return list(result.scalars())
+
+    async def export_transactions(self, statement: Select, fmt: str = 'csv') -> AsyncIterator[str]:
+        """Stream the rows of a listing statement as CSV or NDJSON text
+
+        ``stream`` reads through a server-side cursor, so only EXPORT_BATCH_ROWS rows
+        are held at a time however large the result is.
+        """
+        result = await self.db.stream(_export_statement(statement))
+
+        if fmt == 'csv':
+            yield _csv_lines([EXPORT_COLUMNS])
+        async for rows in result.partitions():
+            yield _export_lines(rows, fmt)
+
+    async def get_categories(self) -> List[str]:
+        """Get all categories, from the categories lookup table rather than a scan of transactions"""
+        result = await self.db.execute(category_names_statement())
+        return list(result.scalars())
+
+    @cached_result("summary")
+    async def get_summary(self, period: str = "30d", user_id: str = None, start: str = None, end: str = None) -> Dict[str, Any]:
+        """Get transaction summary for a period, or for explicit YYYY-MM-DD start/end dates"""
+        start_date, end_date = resolve_range(period, start, end)
+        engine = AnalyticsEngine(self.db)
+        return engine.summary(await engine.load_async(start_date, end_date, user_id), start_date, end_date)
+
+    async def delete_transactions(self, transaction_ids: List[str], user_id: str = None) -> int:
+        """Delete transactions and update the rollup, through the sync service on the greenlet bridge"""
+        return await self.db.run_sync(lambda db: TransactionService(db).delete_transactions(transaction_ids, user_id))
+
+
+class ThreadpoolService:
+    """A sync service behind the async services' interface: every method call runs in the threadpool"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def __getattr__(self, name: str):
+        method = getattr(self.service, name)
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(method, *args, **kwargs)
+        return call
+
+
+def service_dependency(async_service, sync_service):
+    """FastAPI dependency for a request-scoped service
+
+    Yields ``async_service`` on an AsyncSession, or ``sync_service`` on a sync Session
+    wrapped in ThreadpoolService when ASYNC_DB_ENABLED is off (no async driver installed).
+    Handlers await the same methods either way.
+    """
+    async def dependency() -> AsyncIterator[Any]:
+        if settings.ASYNC_DB_ENABLED:
+            async with async_session() as db:
+                yield async_service(db)
+            return
+        db = SessionLocal()
+        try:
+            yield ThreadpoolService(sync_service(db))
+        finally:
+            await run_in_threadpool(db.close)
+    return dependency
+
+
+get_analytics_service = service_dependency(AsyncAnalyticsService, AnalyticsService)
+get_transaction_service = service_dependency(AsyncTransactionService, TransactionService)
+
+
+def export_stream(statement: Select, fmt: str) -> Union[AsyncIterator[str], Iterator[str]]:
+    """Body of an export response, on its own session: it is sent after the request's dependencies are closed
+
+    With ASYNC_DB_ENABLED off it is a sync generator, which StreamingResponse iterates in the threadpool.
+    """
+    if settings.ASYNC_DB_ENABLED:
+        return _async_export(statement, fmt)
+    return _threadpool_export(statement, fmt)
+
+
+async def _async_export(statement: Select, fmt: str) -> AsyncIterator[str]:
+    async with async_session() as db:
+        async for chunk in AsyncTransactionService(db).export_transactions(statement, fmt):
+            yield chunk
+
+
+def _threadpool_export(statement: Select, fmt: str) -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        result = db.execute(_export_statement(statement))
+        if fmt == 'csv':
+            yield _csv_lines([EXPORT_COLUMNS])
+        for rows in result.partitions():
+            yield _export_lines(rows, fmt)
+    finally:
+        db.close()
+
+
+def _export_statement(statement: Select) -> Select:
+    """The export columns of a listing statement, fetched EXPORT_BATCH_ROWS at a time from a server-side cursor
+
+    Category and merchant names come from joins to their lookup tables.
+    """
+    names = {'category': Category.name, 'merchant': Merchant.name}
+    columns = [names[name] if name in names else getattr(Transaction, name) for name in EXPORT_COLUMNS]
+    return statement.with_only_columns(*columns).outerjoin(
+        Category, Category.id == Transaction.category_id
+    ).outerjoin(
+        Merchant, Merchant.id == Transaction.merchant_id
+    ).execution_options(yield_per=EXPORT_BATCH_ROWS)
+
+
+def _export_lines(rows: Sequence[Sequence[Any]], fmt: str) -> str:
+    return _csv_lines(rows) if fmt == 'csv' else _ndjson_lines(rows)
+
+
+def _csv_lines(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
+
+
+def _ndjson_lines(rows: Sequence[Sequence[Any]]) -> str:
+    return ''.join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + '\n' for row in rows)
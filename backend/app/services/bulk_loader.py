@@ -0,0 +1,93 @@
+import csv
+import io
+import logging
+from typing import Set
+import pandas as pd
+from sqlalchemy.orm import Session
+from ..models.lookup import Category
+from ..models.transaction import DEDUP_CONSTRAINT_COLUMNS
+from .rollup_service import rollup_merge_sql
+
+logger = logging.getLogger(__name__)
+
+# Columns written by the loader, in COPY order; money goes in as integer cents,
+# category and merchant as lookup ids
+LOAD_COLUMNS = [
+    'id', 'user_id', 'amount_cents', 'currency', 'description', 'category_id',
+    'merchant_id', 'account_type', 'date', 'fingerprint'
+]
+
+# Lookup ids of missing names; the CSV writer quotes them as "", which FORCE_NULL reads back as NULL
+NULLABLE_ID_COLUMNS = ['category_id', 'merchant_id']
+
+
+class PostgresCopyLoader:
+    """Stream transaction rows into Postgres with COPY through a temp staging table
+
+    Rows are copied into a session-local staging table in chunks, then merged into
+    ``transactions`` with a single ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``
+    whose RETURNING rows, joined back to their category names, also update the daily rollup.
+    Everything runs on the session's connection, so it commits or rolls back with it.
+    """
+
+    staging_table = "transactions_staging"
+
+    def __init__(self, db: Session, chunk_rows: int = 50000):
+        self.db = db
+        self.chunk_rows = chunk_rows
+
+    @staticmethod
+    def is_supported(db: Session) -> bool:
+        """COPY needs Postgres and a driver exposing copy_expert (psycopg2)"""
+        dialect = db.get_bind().dialect
+        return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+
+    def load(self, rows: pd.DataFrame) -> Set[str]:
+        """Load rows and return the fingerprints of those that were new"""
+        if rows.empty:
+            return set()
+
+        columns = ', '.join(LOAD_COLUMNS)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} "
+                f"(LIKE transactions INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+
+            for start in range(0, len(rows), self.chunk_rows):
+                chunk = rows.iloc[start:start + self.chunk_rows]
+                cursor.copy_expert(
+                    f"COPY {self.staging_table} ({columns}) FROM STDIN "
+                    f"WITH (FORMAT csv, FORCE_NULL ({', '.join(NULLABLE_ID_COLUMNS)}))",
+                    self._to_csv_buffer(chunk)
+                )
+
+            # The rollup is folded from exactly the rows that were new, in the same statement
+            cursor.execute(
+                f"WITH inserted AS ("
+                f"INSERT INTO transactions ({columns}) "
+                f"SELECT {columns} FROM {self.staging_table} "
+                f"ON CONFLICT ({', '.join(DEDUP_CONSTRAINT_COLUMNS)}) DO NOTHING "
+                f"RETURNING user_id, date, category_id, amount_cents, fingerprint"
+                f"), named AS ("
+                f"SELECT inserted.user_id, inserted.date, {Category.__tablename__}.name AS category, inserted.amount_cents "
+                f"FROM inserted LEFT JOIN {Category.__tablename__} ON {Category.__tablename__}.id = inserted.category_id"
+                f"), rolled_up AS ({rollup_merge_sql('named')}) "
+                f"SELECT fingerprint FROM inserted"
+            )
+            inserted = {fingerprint for (fingerprint,) in cursor.fetchall()}
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+        finally:
+            cursor.close()
+
+        logger.info(f"COPY loaded {len(inserted)} of {len(rows)} rows")
+        return inserted
+
+    def _to_csv_buffer(self, chunk: pd.DataFrame) -> io.StringIO:
+        """Serialize one chunk as CSV; quoting keeps empty strings distinct from NULL"""
+        buffer = io.StringIO()
+        chunk[LOAD_COLUMNS].to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_NONNUMERIC)
+        buffer.seek(0)
+        return buffer
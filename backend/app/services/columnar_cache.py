@@ -0,0 +1,298 @@
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.cache import analytics_cache
+from ..core.config import settings
+from ..models.daily_rollup import ROLLUP_DEFAULT_CATEGORY
+from ..models.transaction import Transaction, transaction_select
+from ..utils.money import CENTS_PER_UNIT
+from .frame_loader import load_frame, load_frame_async
+
+logger = logging.getLogger(__name__)
+
+# Transaction columns a UserColumns is built from
+SOURCE_COLUMNS = ['date', 'amount_cents', 'category', 'description', 'merchant']
+
+
+def user_columns_statement(user_id: str) -> Select:
+    """Every transaction of one user as SOURCE_COLUMNS; shared by sync and async sessions"""
+    return transaction_select(SOURCE_COLUMNS).where(Transaction.user_id == user_id)
+
+
+# Per-row arrays of a UserColumns, kept in the same (date) order
+ARRAY_COLUMNS = ('date', 'amount_cents', 'category', 'description', 'merchant')
+
+
+@dataclass
+class UserColumns:
+    """One user's transactions as date-sorted NumPy arrays, money as int64 cents
+
+    ``category``, ``description`` and ``merchant`` are int32 codes into the
+    ``categories``, ``descriptions`` and ``merchants`` dictionaries, which only
+    ever grow, so codes stay valid across appends. Empty categories are stored as
+    the rollup's default category and missing merchants as ''. Instances are never
+    modified: ``appended`` returns a new one, so readers need no lock.
+    """
+    date: np.ndarray
+    amount_cents: np.ndarray
+    category: np.ndarray
+    description: np.ndarray
+    merchant: np.ndarray
+    categories: List[str]
+    descriptions: List[str]
+    merchants: List[str]
+
+    @classmethod
+    def empty(cls) -> 'UserColumns':
+        return cls(
+            date=np.empty(0, dtype='datetime64[D]'),
+            amount_cents=np.empty(0, dtype=np.int64),
+            category=np.empty(0, dtype=np.int32),
+            description=np.empty(0, dtype=np.int32),
+            merchant=np.empty(0, dtype=np.int32),
+            categories=[],
+            descriptions=[],
+            merchants=[]
+        )
+
+    @classmethod
+    def from_rows(cls, rows: pd.DataFrame) -> 'UserColumns':
+        return cls.empty().appended(rows)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the arrays plus the dictionary strings"""
+        arrays = sum(getattr(self, name).nbytes for name in ARRAY_COLUMNS)
+        strings = sum(
+            sys.getsizeof(value)
+            for dictionary in (self.categories, self.descriptions, self.merchants)
+            for value in dictionary
+        )
+        return arrays + strings
+
+    def appended(self, rows: pd.DataFrame) -> 'UserColumns':
+        """Copy with transaction rows (SOURCE_COLUMNS) merged in date order"""
+        if rows.empty:
+            return self
+
+        category = rows['category'].astype(object)
+        category = category.where(category.notna() & (category != ''), ROLLUP_DEFAULT_CATEGORY)
+        categories, category_codes = _encode(self.categories, category)
+        descriptions, description_codes = _encode(self.descriptions, rows['description'].fillna(''))
+        merchants, merchant_codes = _encode(self.merchants, rows['merchant'].astype(object).fillna(''))
+        dates = pd.to_datetime(rows['date']).to_numpy(dtype='datetime64[D]')
+        order = np.argsort(dates, kind='stable')
+
+        columns = UserColumns(
+            date=np.concatenate([self.date, dates[order]]),
+            amount_cents=np.concatenate([self.amount_cents, rows['amount_cents'].to_numpy(dtype=np.int64)[order]]),
+            category=np.concatenate([self.category, category_codes[order]]),
+            description=np.concatenate([self.description, description_codes[order]]),
+            merchant=np.concatenate([self.merchant, merchant_codes[order]]),
+            categories=categories,
+            descriptions=descriptions,
+            merchants=merchants
+        )
+        # Rows older than the newest cached one (a backfilled statement) need a full re-sort
+        if len(self.date) and dates.min() < self.date[-1]:
+            order = np.argsort(columns.date, kind='stable')
+            for name in ARRAY_COLUMNS:
+                setattr(columns, name, getattr(columns, name)[order])
+        return columns
+
+    def window(self, start: date, end: date) -> slice:
+        """Positions of the rows dated within [start, end]"""
+        low = np.searchsorted(self.date, np.datetime64(start, 'D'), side='left')
+        high = np.searchsorted(self.date, np.datetime64(end, 'D'), side='right')
+        return slice(int(low), int(high))
+
+    def frame(self, start: date, end: date) -> pd.DataFrame:
+        """Rows within [start, end] as a DataFrame of date, amount (major units), category, description and merchant"""
+        rows = self.window(start, end)
+        return pd.DataFrame({
+            'date': self.date[rows].astype('datetime64[ns]'),
+            'amount': self.amount_cents[rows] / CENTS_PER_UNIT,
+            'category': np.array(self.categories, dtype=object)[self.category[rows]],
+            'description': np.array(self.descriptions, dtype=object)[self.description[rows]],
+            'merchant': np.array(self.merchants, dtype=object)[self.merchant[rows]]
+        })
+
+
+class ColumnarCache:
+    """LRU of per-user UserColumns within a memory budget, validated against the analytics data version
+
+    Ingest in this process appends the rows it inserted to a cached user in place
+    of a reload; a version bump from anywhere else (another worker, a delete)
+    makes the next read reload the user. Entries never expire, so nothing is
+    cached unless the version is shared across processes (see
+    ``AnalyticsCache.shared_data_version``); with the ``memory`` or ``none``
+    analytics cache backend every read goes to the database. Users larger than
+    the whole budget are not cached either, and callers fall back to the
+    database for them.
+    """
+
+    def __init__(self, max_bytes: int = settings.COLUMNAR_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # user_id -> (columns, data version, bytes)
+        self._entries: "OrderedDict[str, Tuple[UserColumns, int, int]]" = OrderedDict()
+        self._oversized: Dict[str, Optional[int]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'loads': 0, 'appends': 0, 'evictions': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def lookup(self, user_id: str) -> Optional[UserColumns]:
+        """Cached columns of a user if they match the current data version"""
+        if not self.enabled or not user_id:
+            return None
+        version = analytics_cache.shared_data_version(user_id)
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] != version:
+                return None
+            self._entries.move_to_end(user_id)
+            self._counters['hits'] += 1
+            return entry[0]
+
+    def get(self, db: Session, user_id: str) -> Optional[UserColumns]:
+        """Columns of a user, loading them when missing or stale; None when the user does not fit the budget"""
+        columns = self.lookup(user_id)
+        if columns is not None or not self._cacheable(user_id):
+            return columns
+        version = analytics_cache.shared_data_version(user_id)
+        return self._loaded(user_id, load_frame(db, user_columns_statement(user_id), categorical=()), version)
+
+    async def get_async(self, db: AsyncSession, user_id: str) -> Optional[UserColumns]:
+        """``get`` on an AsyncSession"""
+        columns = self.lookup(user_id)
+        if columns is not None or not self._cacheable(user_id):
+            return columns
+        version = analytics_cache.shared_data_version(user_id)
+        rows = await load_frame_async(db, user_columns_statement(user_id), categorical=())
+        return self._loaded(user_id, rows, version)
+
+    def append(self, user_id: str, rows: pd.DataFrame, version: Optional[int] = None) -> None:
+        """Add rows this process just inserted to a cached user
+
+        ``version`` is the data version after the insert; anything but the next
+        version means another writer got in between, so the entry is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            self._oversized.pop(user_id, None)
+        if entry is None or rows.empty:
+            return
+
+        columns, seen, _ = entry
+        if version is None or version != seen + 1:
+            self.forget(user_id)
+            return
+
+        appended = columns.appended(rows)
+        with self._lock:
+            if self._entries.get(user_id) is not entry:
+                return
+            self._counters['appends'] += 1
+            self._put(user_id, appended, version)
+
+    def forget(self, user_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+            self._oversized.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._oversized.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'users': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                **self._counters
+            }
+
+    def _cacheable(self, user_id: str) -> bool:
+        if not self.enabled or not user_id:
+            return False
+        version = analytics_cache.shared_data_version(user_id)
+        if version is None:
+            return False
+        with self._lock:
+            return user_id not in self._oversized or self._oversized[user_id] != version
+
+    def _loaded(self, user_id: str, rows: pd.DataFrame, version: Optional[int]) -> Optional[UserColumns]:
+        columns = UserColumns.from_rows(rows)
+        if version is None:
+            return columns
+        with self._lock:
+            self._counters['loads'] += 1
+            if not self._put(user_id, columns, version):
+                self._oversized[user_id] = version
+                logger.info(f"Columns of {user_id} ({columns.nbytes} bytes) exceed the columnar cache budget")
+                return None
+        return columns
+
+    def _put(self, user_id: str, columns: UserColumns, version: Optional[int]) -> bool:
+        """Store an entry and evict least recently used users until the budget holds; caller holds the lock"""
+        previous = self._entries.pop(user_id, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        size = columns.nbytes
+        if size > self.max_bytes:
+            return False
+
+        self._entries[user_id] = (columns, version, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self._counters['evictions'] += 1
+        return True
+
+
+def _encode(dictionary: List[str], values: pd.Series) -> Tuple[List[str], np.ndarray]:
+    """Codes of ``values`` in ``dictionary``, returning the dictionary extended with unseen values"""
+    codes, uniques = pd.factorize(values.astype(str))
+    positions = {value: position for position, value in enumerate(dictionary)}
+    unseen = [value for value in uniques if value not in positions]
+    dictionary = dictionary + unseen
+    positions.update((value, len(dictionary) - len(unseen) + offset) for offset, value in enumerate(unseen))
+    mapping = np.array([positions[value] for value in uniques], dtype=np.int32)
+    return dictionary, mapping[codes]
+
+
+columnar_cache = ColumnarCache()
+
+
+def user_frame(db: Session, user_id: str, start: date, end: date) -> pd.DataFrame:
+    """One user's transactions within [start, end] as ``UserColumns.frame`` rows
+
+    Served from the columnar cache when it holds the user; otherwise the window is
+    read from the database and passed through the same encoding, so both ways
+    return identical frames.
+    """
+    columns = columnar_cache.get(db, user_id)
+    if columns is None:
+        statement = user_columns_statement(user_id).where(Transaction.date >= start, Transaction.date <= end)
+        columns = UserColumns.from_rows(load_frame(db, statement, categorical=()))
+    return columns.frame(start, end)
@@ -0,0 +1,235 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+# Rows inspected when inferring a layout
+LAYOUT_SAMPLE_ROWS = 200
+
+# Distinct bank layouts remembered per process
+LAYOUT_CACHE_SIZE = 256
+
+# Columns the standardized frame keeps
+STANDARD_COLUMNS = ['amount', 'description', 'date', 'category', 'merchant', 'account_type', 'currency']
+
+# Source fields folded into the signed amount: a single Amount column, or split Debit/Credit columns
+AMOUNT_SIGNS = {'amount': 1, 'credit': 1, 'debit': -1}
+
+# Amounts that only read one way when decimals have at most two digits: "12,50" and
+# "1.250" are decimal-comma, "12.50" and "1,250" decimal-point; "1250" fits both
+_DECIMAL_COMMA_AMOUNT = re.compile(r'^\d{1,3}(\.\d{3})*,\d{1,2}$|^\d+,\d{1,2}$|^\d{1,3}(\.\d{3})+$')
+_DECIMAL_POINT_AMOUNT = re.compile(r'^\d{1,3}(,\d{3})*\.\d{1,2}$|^\d+\.\d{1,2}$|^\d{1,3}(,\d{3})+$')
+_PLAIN_AMOUNT = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+@dataclass
+class FileLayout:
+    """Parsing plan for one bank export layout, inferred once per header signature
+
+    ``date_formats`` are tried in order, each only for the values the earlier
+    ones rejected. ``amount_columns`` are the standardized fields holding the
+    amount: ``['amount']``, or ``debit``/``credit`` for split-column exports. ``ambiguous`` marks an inference the sample could not settle
+    (e.g. every day was 12 or less, or amounts used both decimal conventions);
+    such layouts are used for their own file but never cached.
+    """
+    signature: str
+    rename: Dict[str, str]
+    usecols: List[str]
+    date_formats: List[str] = field(default_factory=list)
+    amount_columns: List[str] = field(default_factory=list)
+    decimal: str = '.'
+    thousands: Optional[str] = ','
+    amount_numeric: bool = False
+    dtype: Dict[str, str] = field(default_factory=dict)
+    ambiguous: bool = False
+
+
+def layout_signature(columns: Sequence, first_row: Dict[str, Any], column_mappings: Dict[str, str]) -> str:
+    """Cache key for a file's layout: its header row plus the shape of its date/amount values
+
+    Headers such as ``Date,Description,Amount`` are shared by many banks, so the
+    digit-masked shape of the first row's date and amount (``9/9/9``, ``9.9,9``)
+    is folded in. The shape cannot tell ``12,50`` from ``1,250`` or dd/mm from
+    mm/dd, so a cached layout is still checked with layout_fits before use.
+    """
+    shapes = [
+        re.sub(r'\d+', '9', str(first_row.get(column, '')).strip())
+        for column in columns
+        if column_mappings.get(column, column) in ('date', *AMOUNT_SIGNS)
+    ]
+    key = '\x1f'.join(str(column) for column in columns) + '\x1e' + '\x1f'.join(shapes)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def infer_layout(
+    sample: pd.DataFrame,
+    signature: str,
+    column_mappings: Dict[str, str],
+    date_formats: Sequence[str]
+) -> FileLayout:
+    """Infer column mapping, date formats and number conventions from a small sample
+
+    Raises ValueError when the amount cannot be read unambiguously: two columns
+    map to the same amount field, or an Amount column sits beside Debit/Credit.
+    """
+    rename = {}
+    for column in sample.columns:
+        target = column_mappings.get(column, column)
+        # first source column wins when several map to the same descriptive field
+        if (target in STANDARD_COLUMNS or target in AMOUNT_SIGNS) and target not in rename.values():
+            rename[column] = target
+
+    amount_sources = [column for column in sample.columns if column_mappings.get(column, column) in AMOUNT_SIGNS]
+    amount_columns = [rename[column] for column in amount_sources if column in rename]
+    if len(amount_sources) > len(amount_columns) or ('amount' in amount_columns and len(amount_columns) > 1):
+        raise ValueError(f"Conflicting amount columns: {amount_sources}")
+    source_for = {target: source for source, target in rename.items()}
+
+    layout = FileLayout(
+        signature=signature,
+        rename=rename,
+        usecols=list(rename),
+        amount_columns=amount_columns
+    )
+
+    if 'date' in source_for and not pd.api.types.is_datetime64_any_dtype(sample[source_for['date']]):
+        layout.date_formats, ambiguous = _infer_date_formats(_present(sample[source_for['date']]), date_formats)
+        layout.ambiguous |= ambiguous
+
+    if amount_columns:
+        amounts = _amount_values(sample, source_for, amount_columns)
+        comma, point = _decimal_evidence(amounts)
+        if comma > point:
+            layout.decimal, layout.thousands = ',', '.'
+        layout.ambiguous |= bool(comma and point)
+        layout.amount_numeric = bool(len(amounts)) and bool(amounts.str.match(_PLAIN_AMOUNT).all())
+
+    for source, target in rename.items():
+        if target in AMOUNT_SIGNS:
+            # numeric amounts are left to the parser so one odd row cannot fail the whole read
+            if not layout.amount_numeric:
+                layout.dtype[source] = 'str'
+        elif target != 'date':
+            layout.dtype[source] = 'str'
+
+    return layout
+
+
+def layout_fits(layout: FileLayout, sample: pd.DataFrame) -> bool:
+    """Whether a cached layout reads this file's sample without contradicting it
+
+    Every sample date must parse with the layout's formats, and the amounts must
+    not favour the other decimal convention, so a US layout cached under the
+    same signature is never applied to a European file (or vice versa).
+    """
+    if any(column not in sample.columns for column in layout.usecols):
+        return False
+    source_for = {target: source for source, target in layout.rename.items()}
+
+    if 'date' in source_for and not pd.api.types.is_datetime64_any_dtype(sample[source_for['date']]):
+        dates = _present(sample[source_for['date']])
+        if len(dates) and (not layout.date_formats or parse_dates(dates, layout.date_formats).isna().any()):
+            return False
+
+    if layout.amount_columns:
+        amounts = _amount_values(sample, source_for, layout.amount_columns)
+        comma, point = _decimal_evidence(amounts)
+        if (comma > point and layout.decimal != ',') or (point > comma and layout.decimal == ','):
+            return False
+        if layout.amount_numeric and not amounts.str.match(_PLAIN_AMOUNT).all():
+            return False
+    return True
+
+
+def parse_dates(values: pd.Series, date_formats: Sequence[str]) -> pd.Series:
+    """Parse with the first format, then fill the values it rejected from each later one in turn"""
+    dates = pd.to_datetime(values, format=date_formats[0], errors='coerce')
+    for fmt in date_formats[1:]:
+        missing = dates.isna() & values.notna()
+        if not missing.any():
+            break
+        dates = dates.fillna(pd.to_datetime(values.where(missing), format=fmt, errors='coerce'))
+    return dates
+
+
+def _present(values: pd.Series) -> pd.Series:
+    """Non-empty sample values as stripped strings"""
+    values = values.dropna().astype(str).str.strip()
+    return values[values != '']
+
+
+def _amount_values(sample: pd.DataFrame, source_for: Dict[str, str], amount_columns: Sequence[str]) -> pd.Series:
+    """Non-empty sample values of every amount column, judged together for number conventions"""
+    return pd.concat([_present(sample[source_for[column]]) for column in amount_columns], ignore_index=True)
+
+
+def _decimal_evidence(amounts: pd.Series) -> Tuple[int, int]:
+    """Counts of amounts that only read as decimal-comma and only as decimal-point"""
+    unsigned = amounts.str.replace(r'[^\d.,]', '', regex=True)
+    return int(unsigned.str.match(_DECIMAL_COMMA_AMOUNT).sum()), int(unsigned.str.match(_DECIMAL_POINT_AMOUNT).sum())
+
+
+def _infer_date_formats(values: pd.Series, date_formats: Sequence[str]) -> Tuple[List[str], bool]:
+    """Candidate formats covering the sample, most values first (earlier formats win ties)
+
+    Mixed-format files get one format per group of values, chosen here once so
+    every chunk of the file reads its dates the same way. The result is
+    ambiguous when another candidate parses just as many values into different
+    dates, e.g. ``03/04/2026`` under both mm/dd and dd/mm.
+    """
+    chosen, ambiguous = [], False
+    remaining = values
+    while len(remaining):
+        parsed = {fmt: pd.to_datetime(remaining, format=fmt, errors='coerce') for fmt in date_formats if fmt not in chosen}
+        best_format, best_count = None, 0
+        for fmt, dates in parsed.items():
+            if dates.notna().sum() > best_count:
+                best_format, best_count = fmt, dates.notna().sum()
+        if best_format is None:
+            break
+        best = parsed[best_format]
+        ambiguous |= any(
+            dates.notna().sum() == best_count and (dates != best)[dates.notna() & best.notna()].any()
+            for fmt, dates in parsed.items()
+            if fmt != best_format
+        )
+        chosen.append(best_format)
+        remaining = remaining[best.isna()]
+    return chosen, ambiguous
+
+
+class LayoutCache:
+    """Thread-safe LRU of inferred layouts keyed by header signature"""
+
+    def __init__(self, max_entries: int = LAYOUT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, FileLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, signature: str) -> Optional[FileLayout]:
+        with self._lock:
+            layout = self._entries.get(signature)
+            if layout is not None:
+                self._entries.move_to_end(signature)
+            return layout
+
+    def put(self, layout: FileLayout) -> None:
+        with self._lock:
+            self._entries[layout.signature] = layout
+            self._entries.move_to_end(layout.signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, signature: str) -> None:
+        with self._lock:
+            self._entries.pop(signature, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+layout_cache = LayoutCache()
@@ -1,8 +1,47 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import ijson
 import json
-from typing import Dict, Any
+import logging
+from itertools import islice
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, Optional
 import io
 from datetime import datetime
+from .file_layout import (
+    AMOUNT_SIGNS, FileLayout, LAYOUT_SAMPLE_ROWS, STANDARD_COLUMNS, infer_layout, layout_cache, layout_fits, layout_signature, parse_dates
+)
+from ..utils.money import cents_to_amount, parse_cents, to_cents
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed per chunk in streaming mode
+CSV_CHUNK_ROWS = 50000
+
+# Upload extensions accepted by the API
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.json', '.ndjson', '.jsonl', '.parquet', '.arrow', '.feather', '.arrows')
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Array keys searched, in priority order, when a JSON upload is an object
+JSON_ARRAY_KEYS = ('transactions', 'data')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.arrows')
+
+# Candidate date formats, in priority order
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%m-%d-%Y',
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%Y/%m/%d',
+    '%m/%d/%y',
+    '%m-%d-%y',
+    '%d/%m/%y',
+    '%d-%m-%y'
+]
+
+# Share of a chunk's dates the file's formats may fail on before its cached layout is dropped
+DATE_FORMAT_TOLERANCE = 0.05
 
 class FileProcessor:
     def __init__(self):
@@ -12,8 +51,10 @@ class FileProcessor:
             'Amount': 'amount',
             'AMOUNT': 'amount',
             'Transaction Amount': 'amount',
-            'Debit': 'amount',
-            'Credit': 'amount',
+            'Debit': 'debit',
+            'DEBIT': 'debit',
+            'Credit': 'credit',
+            'CREDIT': 'credit',
             
             'Description': 'description',
             'DESCRIPTION': 'description',
@@ -38,17 +79,183 @@ class FileProcessor:
             
             'Account': 'account_type',
             'Account Type': 'account_type',
-            'ACCOUNT': 'account_type'
+            'ACCOUNT': 'account_type',
+
+            'Currency': 'currency',
+            'CURRENCY': 'currency'
         }
 
     def process_csv(self, file_content: io.StringIO) -> pd.DataFrame:
         """Process CSV file and return standardized DataFrame"""
         try:
-            df = pd.read_csv(file_content)
-            return self._standardize_dataframe(df)
+            layout = self._csv_layout(file_content)
+            df = pd.read_csv(file_content, **self._read_csv_options(layout))
+            return self._standardize_dataframe(df, layout)
         except Exception as e:
             raise ValueError(f"Error processing CSV file: {str(e)}")
 
+    def iter_file_chunks(self, filename: str, binary_stream: BinaryIO, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Yield standardized DataFrames for any supported upload, chunked where the format allows"""
+        if filename.endswith('.csv'):
+            yield from self.iter_csv_chunks(binary_stream, chunksize=chunksize)
+        elif filename.endswith('.xlsx'):
+            yield self.process_excel(binary_stream)
+        elif filename.endswith('.json'):
+            yield from self.iter_json_chunks(binary_stream, chunksize=chunksize)
+        elif filename.endswith(NDJSON_EXTENSIONS):
+            yield from self.iter_ndjson_chunks(binary_stream, chunksize=chunksize)
+        elif filename.endswith('.parquet'):
+            yield from self.iter_parquet_chunks(binary_stream, chunksize=chunksize)
+        elif filename.endswith(ARROW_EXTENSIONS):
+            yield from self.iter_arrow_chunks(binary_stream)
+        else:
+            raise ValueError(f"Unsupported file type: {filename}")
+
+    def iter_csv_chunks(self, binary_stream: BinaryIO, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Stream a CSV file and yield standardized DataFrames of at most ``chunksize`` rows"""
+        text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8', newline='')
+        try:
+            layout = self._csv_layout(text_stream)
+            for chunk in pd.read_csv(text_stream, chunksize=chunksize, **self._read_csv_options(layout)):
+                yield self._standardize_dataframe(chunk, layout)
+        except Exception as e:
+            raise ValueError(f"Error processing CSV file: {str(e)}")
+        finally:
+            # Leave the caller's stream open
+            text_stream.detach()
+
+    def iter_json_chunks(self, binary_stream: BinaryIO, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Incrementally parse a JSON upload and yield standardized record batches
+
+        Handles a top-level array and ``{"transactions": [...]}`` / ``{"data": [...]}``
+        documents without materializing the whole array. Any other object falls
+        back to process_json, matching its single-record behaviour.
+        """
+        try:
+            prefix = self._json_records_prefix(binary_stream)
+            binary_stream.seek(0)
+            if prefix is not None:
+                yield from self._record_batches(ijson.items(binary_stream, prefix, use_float=True), chunksize)
+                return
+        except Exception as e:
+            raise ValueError(f"Error processing JSON file: {str(e)}")
+
+        text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8')
+        try:
+            yield self.process_json(text_stream)
+        finally:
+            text_stream.detach()
+
+    def _json_records_prefix(self, binary_stream: BinaryIO) -> Optional[str]:
+        """ijson prefix of the record array, chosen the way process_json chooses it
+
+        Reads parse events only, stopping at a top-level array or the first
+        JSON_ARRAY_KEYS key; a later key is only scanned for when an earlier one
+        is missing. The first key present wins even when its array is empty.
+        None means the document is left to process_json.
+        """
+        events = ijson.parse(binary_stream)
+        _, event, _ = next(events)
+        if event == 'start_array':
+            return 'item'
+        if event != 'start_map':
+            return None
+
+        arrays = {}
+        for prefix, event, value in events:
+            if prefix == '' and event == 'map_key' and value in JSON_ARRAY_KEYS:
+                _, value_event, _ = next(events)
+                arrays[value] = value_event == 'start_array'
+                if value == JSON_ARRAY_KEYS[0]:
+                    break
+        for key in JSON_ARRAY_KEYS:
+            if key in arrays:
+                return f'{key}.item' if arrays[key] else None
+        return None
+
+    def iter_ndjson_chunks(self, binary_stream: BinaryIO, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Parse newline-delimited JSON (one transaction object per line) in record batches"""
+        try:
+            records = (json.loads(line) for line in binary_stream if line.strip())
+            yield from self._record_batches(records, chunksize)
+        except Exception as e:
+            raise ValueError(f"Error processing NDJSON file: {str(e)}")
+
+    def _record_batches(self, records: Iterable[Dict[str, Any]], chunksize: int) -> Iterator[pd.DataFrame]:
+        """Group an iterator of records into standardized DataFrames of ``chunksize`` rows"""
+        records = iter(records)
+        layout = None
+        while True:
+            batch = list(islice(records, chunksize))
+            if not batch:
+                return
+            df = pd.DataFrame.from_records(batch)
+            # The first batch settles the layout for the whole file
+            layout = layout or self._layout_for(df)
+            yield self._standardize_dataframe(df, layout)
+
+    def process_parquet(self, file_content: BinaryIO) -> pd.DataFrame:
+        """Process a Parquet file and return standardized DataFrame"""
+        try:
+            parquet_file = pq.ParquetFile(file_content)
+            table = parquet_file.read(columns=self._arrow_columns(parquet_file.schema_arrow))
+            return self._standardize_dataframe(self._arrow_to_pandas(table))
+        except Exception as e:
+            raise ValueError(f"Error processing Parquet file: {str(e)}")
+
+    def iter_parquet_chunks(self, binary_stream: BinaryIO, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Stream a Parquet file in record batches of at most ``chunksize`` rows"""
+        try:
+            parquet_file = pq.ParquetFile(binary_stream)
+            columns = self._arrow_columns(parquet_file.schema_arrow)
+            layout = None
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                df = self._arrow_to_pandas(pa.Table.from_batches([batch]))
+                layout = layout or self._layout_for(df)
+                yield self._standardize_dataframe(df, layout)
+        except Exception as e:
+            raise ValueError(f"Error processing Parquet file: {str(e)}")
+
+    def process_arrow(self, file_content: BinaryIO) -> pd.DataFrame:
+        """Process an Arrow IPC (file or stream format) upload and return standardized DataFrame"""
+        chunks = list(self.iter_arrow_chunks(file_content))
+        if not chunks:
+            raise ValueError("Error processing Arrow file: no record batches found")
+        return pd.concat(chunks, ignore_index=True)
+
+    def iter_arrow_chunks(self, binary_stream: BinaryIO) -> Iterator[pd.DataFrame]:
+        """Yield one standardized DataFrame per Arrow IPC record batch"""
+        try:
+            try:
+                reader = pa.ipc.open_file(binary_stream)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # Not the random-access file format; read it as an IPC stream instead
+                binary_stream.seek(0)
+                batches = pa.ipc.open_stream(binary_stream)
+
+            layout = None
+            for batch in batches:
+                columns = self._arrow_columns(batch.schema)
+                df = self._arrow_to_pandas(pa.Table.from_batches([batch]).select(columns))
+                layout = layout or self._layout_for(df)
+                yield self._standardize_dataframe(df, layout)
+        except Exception as e:
+            raise ValueError(f"Error processing Arrow file: {str(e)}")
+
+    def _arrow_columns(self, schema: pa.Schema) -> list:
+        """Project only the columns that map onto standardized fields"""
+        fields = set(STANDARD_COLUMNS) | set(AMOUNT_SIGNS)
+        return [name for name in schema.names if self.column_mappings.get(name, name) in fields]
+
+    def _arrow_to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        """Convert typed Arrow columns without copying where possible
+
+        Dates come back as datetime64 and numeric amounts stay numeric, so
+        _clean_data skips the string munging for them.
+        """
+        return table.to_pandas(date_as_object=False, self_destruct=True, split_blocks=True)
+
     def process_excel(self, file_content: io.BytesIO) -> pd.DataFrame:
         """Process Excel file and return standardized DataFrame"""
         try:
@@ -80,36 +287,83 @@ class FileProcessor:
         except Exception as e:
             raise ValueError(f"Error processing JSON file: {str(e)}")
 
-    def _standardize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _csv_layout(self, text_stream) -> FileLayout:
+        """Look up (or infer and cache) the layout for a CSV stream, leaving it rewound"""
+        sample = pd.read_csv(text_stream, nrows=LAYOUT_SAMPLE_ROWS, dtype=str)
+        text_stream.seek(0)
+        return self._sample_layout(sample)
+
+    def _read_csv_options(self, layout: FileLayout) -> Dict[str, Any]:
+        """read_csv keyword arguments that apply a known layout"""
+        options = {'usecols': layout.usecols, 'dtype': layout.dtype}
+        if layout.amount_numeric:
+            options['decimal'] = layout.decimal
+            options['thousands'] = layout.thousands
+        return options
+
+    def _layout_for(self, df: pd.DataFrame) -> FileLayout:
+        """Layout for an already-loaded frame (Excel/JSON/record batches)"""
+        return self._sample_layout(df.head(LAYOUT_SAMPLE_ROWS))
+
+    def _sample_layout(self, sample: pd.DataFrame) -> FileLayout:
+        """Cached layout for the sample's signature if it fits the sample, else a fresh inference
+
+        Inferences the sample could not settle are used for this file only.
+        """
+        first_row = sample.iloc[0].to_dict() if len(sample) else {}
+        signature = layout_signature(sample.columns, first_row, self.column_mappings)
+        layout = layout_cache.get(signature)
+        if layout is None or not layout_fits(layout, sample):
+            layout = infer_layout(sample, signature, self.column_mappings, DATE_FORMATS)
+            if not layout.ambiguous:
+                layout_cache.put(layout)
+        return layout
+
+    def _standardize_dataframe(self, df: pd.DataFrame, layout: FileLayout = None) -> pd.DataFrame:
         """Standardize column names and data types"""
-        # Make a copy to avoid modifying original
-        df = df.copy()
+        if layout is None:
+            layout = self._layout_for(df)
+
+        # Keep only the mapped columns (this also copies, leaving the original untouched)
+        df = df[[column for column in layout.usecols if column in df.columns]]
         
-        # Rename columns using mapping
-        df = df.rename(columns=self.column_mappings)
+        # Rename columns using the layout's mapping
+        df = df.rename(columns=layout.rename)
         
-        # Check for required columns
-        missing_columns = [col for col in self.required_columns if col not in df.columns]
+        # Check for required columns (split Debit/Credit columns count as the amount)
+        present = set(df.columns) | ({'amount'} if set(layout.amount_columns) & set(df.columns) else set())
+        missing_columns = [col for col in self.required_columns if col not in present]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
         # Clean and standardize data
-        df = self._clean_data(df)
+        df = self._clean_data(df, layout)
         
         return df
 
-    def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_data(self, df: pd.DataFrame, layout: FileLayout = None) -> pd.DataFrame:
         """Clean and standardize the data"""
         # Remove completely empty rows
         df = df.dropna(how='all')
         
-        # Clean amount column
-        if 'amount' in df.columns:
-            df['amount'] = self._clean_amount_column(df['amount'])
+        # Amounts become exact integer cents (already numeric when the layout allowed typed parsing);
+        # ``amount`` keeps the major-unit value for fingerprinting, categorization and scoring
+        amount_columns = [col for col in (layout.amount_columns if layout is not None else ['amount']) if col in df.columns]
+        for col in amount_columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = to_cents(df[col])
+            elif layout is not None:
+                df[col] = self._clean_amount_column(df[col], layout.decimal, layout.thousands)
+            else:
+                df[col] = self._clean_amount_column(df[col])
+        if amount_columns:
+            df['amount_cents'] = df['amount'] if amount_columns == ['amount'] else self._combine_amounts(df, amount_columns)
+            df = df.drop(columns=[col for col in amount_columns if col != 'amount'])
+            df['amount'] = cents_to_amount(df['amount_cents'])
         
         # Clean date column
         if 'date' in df.columns:
-            df['date'] = self._clean_date_column(df['date'])
+            df['date'] = self._parse_dates(df['date'], layout)
         
         # Clean description column
         if 'description' in df.columns:
@@ -117,10 +371,12 @@ class FileProcessor:
             df['description'] = df['description'].replace('nan', '')
         
         # Clean optional columns
-        for col in ['category', 'merchant', 'account_type']:
+        for col in ['category', 'merchant', 'account_type', 'currency']:
             if col in df.columns:
                 df[col] = df[col].astype(str).str.strip()
                 df[col] = df[col].replace('nan', '')
+        if 'currency' in df.columns:
+            df['currency'] = df['currency'].str.upper()
         
         # Remove rows with missing required data
         df = df.dropna(subset=['amount', 'date', 'description'])
@@ -130,41 +386,57 @@ class FileProcessor:
         
         return df
 
-    def _clean_amount_column(self, amount_series: pd.Series) -> pd.Series:
-        """Clean and convert amount column to numeric"""
+    def _clean_amount_column(self, amount_series: pd.Series, decimal: str = '.', thousands: str = ',') -> pd.Series:
+        """Clean an amount column and convert it to integer cents (nullable Int64)"""
         # Convert to string first to handle various formats
         amounts = amount_series.astype(str)
         
         # Remove common currency symbols and formatting
         amounts = amounts.str.replace('$', '', regex=False)
-        amounts = amounts.str.replace(',', '', regex=False)
+        if thousands:
+            amounts = amounts.str.replace(thousands, '', regex=False)
+        if decimal != '.':
+            amounts = amounts.str.replace(decimal, '.', regex=False)
         amounts = amounts.str.replace('(', '-', regex=False)  # Handle negative amounts in parentheses
         amounts = amounts.str.replace(')', '', regex=False)
         amounts = amounts.str.strip()
         
-        # Convert to numeric
-        amounts = pd.to_numeric(amounts, errors='coerce')
-        
-        return amounts
+        # Convert to cents from the digits themselves, without a float in between
+        return parse_cents(amounts)
+
+    def _combine_amounts(self, df: pd.DataFrame, amount_columns) -> pd.Series:
+        """Signed cents from split Debit/Credit cents columns: credit - debit
+
+        Banks differ on whether debits carry a minus sign, so magnitudes are used.
+        A row is missing its amount only when every column is empty.
+        """
+        signed = [df[col].abs() * AMOUNT_SIGNS[col] for col in amount_columns]
+        return pd.concat(signed, axis=1).sum(axis=1, min_count=1).astype('Int64')
+
+    def _parse_dates(self, date_series: pd.Series, layout: FileLayout = None) -> pd.Series:
+        """Parse dates with the file's inferred formats, probing candidates only when it has none
+
+        The formats stay pinned for every chunk of a file, so the same value never
+        reads as different dates in different chunks; values they reject are dropped.
+        """
+        if pd.api.types.is_datetime64_any_dtype(date_series):
+            return date_series
+        if layout is None or not layout.date_formats:
+            return self._clean_date_column(date_series)
+
+        dates = parse_dates(date_series, layout.date_formats)
+        failed = dates.isna().sum() - date_series.isna().sum()
+        if failed > DATE_FORMAT_TOLERANCE * max(len(date_series), 1):
+            # The sample was not representative; re-infer on the next file with this header
+            layout_cache.forget(layout.signature)
+            logger.warning(f"{failed} of {len(date_series)} dates did not match {', '.join(layout.date_formats)}")
+        return dates
 
     def _clean_date_column(self, date_series: pd.Series) -> pd.Series:
         """Clean and convert date column to datetime"""
         # Try to parse dates with multiple formats
-        date_formats = [
-            '%Y-%m-%d',
-            '%m/%d/%Y',
-            '%m-%d-%Y',
-            '%d/%m/%Y',
-            '%d-%m-%Y',
-            '%Y/%m/%d',
-            '%m/%d/%y',
-            '%m-%d-%y',
-            '%d/%m/%y',
-            '%d-%m-%y'
-        ]
-        
         dates = None
-        for fmt in date_formats:
+        for fmt in DATE_FORMATS:
             try:
                 dates = pd.to_datetime(date_series, format=fmt, errors='coerce')
                 if not dates.isna().all():
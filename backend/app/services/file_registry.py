@@ -0,0 +1,138 @@
+import logging
+import uuid
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models.ingested_file import IngestedFile, IngestedRange
+
+logger = logging.getLogger(__name__)
+
+
+class CoveredWindows:
+    """Merged per-account date windows a user has already ingested"""
+
+    def __init__(self, windows: Dict[str, List[Tuple[date, date]]] = None):
+        self._intervals = {}
+        for account, spans in (windows or {}).items():
+            self._intervals[account] = self._merge(spans)
+
+    @staticmethod
+    def _merge(spans: List[Tuple[date, date]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Union overlapping or adjacent spans into sorted, disjoint [start, end] arrays"""
+        merged = []
+        for start, end in sorted(spans):
+            if merged and np.datetime64(start, 'D') <= merged[-1][1] + np.timedelta64(1, 'D'):
+                merged[-1][1] = max(merged[-1][1], np.datetime64(end, 'D'))
+            else:
+                merged.append([np.datetime64(start, 'D'), np.datetime64(end, 'D')])
+        starts = np.array([span[0] for span in merged], dtype='datetime64[D]')
+        ends = np.array([span[1] for span in merged], dtype='datetime64[D]')
+        return starts, ends
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
+
+    def contains(self, accounts: pd.Series, dates: pd.Series) -> np.ndarray:
+        """Vectorized test of whether each (account, date) falls inside a covered window"""
+        inside = np.zeros(len(dates), dtype=bool)
+        day_values = pd.to_datetime(dates).to_numpy().astype('datetime64[D]')
+        account_values = accounts.to_numpy()
+
+        for account, (starts, ends) in self._intervals.items():
+            rows = np.flatnonzero(account_values == account)
+            if not len(rows):
+                continue
+            days = day_values[rows]
+            window = np.searchsorted(starts, days, side='right') - 1
+            valid = window >= 0
+            inside[rows[valid]] = days[valid] <= ends[window[valid]]
+        return inside
+
+
+class FileRegistryService:
+    """Remember which files, and which per-account date windows, each user has ingested"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find_duplicate(self, user_id: str, content_hash: str) -> Optional[IngestedFile]:
+        """Previously ingested file with identical bytes, if any"""
+        return self.db.query(IngestedFile).filter(
+            IngestedFile.user_id == user_id,
+            IngestedFile.content_hash == content_hash
+        ).first()
+
+    def covered_windows(self, user_id: str) -> CoveredWindows:
+        """All date windows already ingested for the user, merged per account"""
+        windows: Dict[str, List[Tuple[date, date]]] = {}
+        rows = self.db.query(
+            IngestedRange.account_type, IngestedRange.start_date, IngestedRange.end_date
+        ).filter(IngestedRange.user_id == user_id)
+        for account, start, end in rows:
+            windows.setdefault(account or '', []).append((start, end))
+        return CoveredWindows(windows)
+
+    def forget_windows(self, removed: pd.DataFrame) -> int:
+        """Forget the files whose windows cover deleted rows; runs in the caller's transaction
+
+        ``removed`` holds the deleted rows' user_id, account_type and date. Such a
+        file's hash no longer short-circuits a re-upload and its windows no longer
+        skip rows, so uploading it again restores what was deleted. Rows that still
+        exist are deduplicated by fingerprint as usual. Returns the files forgotten.
+        """
+        if removed.empty:
+            return 0
+        accounts = removed['account_type'].fillna('').astype(str)
+        bounds = pd.to_datetime(removed['date']).groupby([removed['user_id'], accounts]).agg(['min', 'max'])
+
+        file_ids = set()
+        for (user_id, account), row in bounds.iterrows():
+            file_ids.update(file_id for (file_id,) in self.db.query(IngestedRange.file_id).filter(
+                IngestedRange.user_id == user_id,
+                IngestedRange.account_type == account,
+                IngestedRange.start_date <= row['max'].date(),
+                IngestedRange.end_date >= row['min'].date()
+            ))
+        if not file_ids:
+            return 0
+
+        # Bulk deletes skip the ORM cascade, so the ranges go explicitly
+        self.db.query(IngestedRange).filter(IngestedRange.file_id.in_(file_ids)).delete(synchronize_session=False)
+        self.db.query(IngestedFile).filter(IngestedFile.id.in_(file_ids)).delete(synchronize_session=False)
+        logger.info(f"Forgot {len(file_ids)} ingested files after deleting {len(removed)} transactions")
+        return len(file_ids)
+
+    def record_file(
+        self,
+        user_id: str,
+        content_hash: str,
+        filename: str,
+        total_rows: int,
+        created_rows: int,
+        coverage: Dict[str, Tuple[date, date]]
+    ) -> Optional[IngestedFile]:
+        """Store the file hash and the window it covered for each account"""
+        ingested = IngestedFile(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            content_hash=content_hash,
+            filename=filename,
+            total_rows=total_rows,
+            created_rows=created_rows,
+            ranges=[
+                IngestedRange(user_id=user_id, account_type=account, start_date=start, end_date=end)
+                for account, (start, end) in coverage.items()
+            ]
+        )
+        self.db.add(ingested)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same bytes finished first
+            self.db.rollback()
+            logger.info(f"File {content_hash[:12]} already recorded for {user_id}")
+            return None
+        return ingested
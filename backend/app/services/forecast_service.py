@@ -0,0 +1,85 @@
+import logging
+from datetime import date, timedelta
+from typing import List, Sequence
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+from ..ml.spending_forecaster import SpendingForecaster
+from ..models.daily_rollup import DailyUserCategoryRollup as Rollup
+from .analytics_engine import PREDICTION_BASE_DAYS
+from .frame_loader import load_frame
+from .prefix_index import rollup_days
+
+logger = logging.getLogger(__name__)
+
+# Users forecast per call; the parameter search holds users x SMOOTHING_GRID series in memory
+FORECAST_CHUNK_USERS = 2000
+
+FORECAST_COLUMNS = ['user_id', 'date', 'method', 'predicted_cents', 'lower_cents', 'upper_cents']
+
+
+def daily_expense_statement(user_ids: Sequence[str], start: date, end: date) -> Select:
+    """Expense cents per (user, day) in [start, end] for the given users, summed over categories"""
+    return (
+        select(Rollup.user_id, Rollup.date, func.sum(Rollup.expense_cents).label('expense_cents'))
+        .where(Rollup.user_id.in_(list(user_ids)), Rollup.date >= start, Rollup.date <= end)
+        .group_by(Rollup.user_id, Rollup.date)
+    )
+
+
+class ForecastService:
+    """Spending forecasts for the whole user base, e.g. from a nightly job
+
+    Users are taken in chunks; each chunk is one query against the daily rollup,
+    one dense (users x days) expense matrix and one SpendingForecaster call, so
+    the same model as the predictions endpoint runs as matrix operations.
+    """
+
+    def __init__(self, db: Session, forecaster: SpendingForecaster = None):
+        self.db = db
+        self.forecaster = forecaster or SpendingForecaster()
+
+    def forecast_all(
+        self,
+        end: date,
+        horizon: int,
+        user_id: str = None,
+        chunk_users: int = FORECAST_CHUNK_USERS
+    ) -> pd.DataFrame:
+        """FORECAST_COLUMNS rows for every day of the horizon of every user with expenses before ``end``"""
+        start = end - timedelta(days=PREDICTION_BASE_DAYS)
+        user_ids = [user_id] if user_id else self._active_users(start, end)
+        frames = []
+        for offset in range(0, len(user_ids), chunk_users):
+            chunk = user_ids[offset:offset + chunk_users]
+            frames.append(self._forecast_chunk(chunk, start, end, horizon))
+            logger.info(f"Forecast {offset + len(chunk)} of {len(user_ids)} users")
+        if not frames:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _active_users(self, start: date, end: date) -> List[str]:
+        statement = (
+            select(Rollup.user_id)
+            .where(Rollup.date >= start, Rollup.date <= end, Rollup.expense_cents > 0)
+            .distinct()
+            .order_by(Rollup.user_id)
+        )
+        return list(self.db.execute(statement).scalars())
+
+    def _forecast_chunk(self, user_ids: List[str], start: date, end: date, horizon: int) -> pd.DataFrame:
+        rows = load_frame(self.db, daily_expense_statement(user_ids, start, end), categorical=())
+        positions = pd.Index(user_ids).get_indexer(rows['user_id'])
+        history = np.zeros((len(user_ids), (end - start).days + 1), dtype=np.int64)
+        history[positions, rollup_days(rows, start)] = rows['expense_cents'].to_numpy(dtype=np.int64)
+
+        forecast = self.forecaster.forecast(history, end, horizon)
+        return pd.DataFrame({
+            'user_id': np.repeat(np.asarray(user_ids, dtype=object), horizon),
+            'date': np.tile(np.datetime64(forecast.start, 'D') + np.arange(horizon), len(user_ids)),
+            'method': np.repeat(forecast.method, horizon),
+            'predicted_cents': np.round(forecast.point).astype(np.int64).ravel(),
+            'lower_cents': np.round(forecast.lower).astype(np.int64).ravel(),
+            'upper_cents': np.round(forecast.upper).astype(np.int64).ravel()
+        })[FORECAST_COLUMNS]
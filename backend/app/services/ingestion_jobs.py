@@ -0,0 +1,193 @@
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.ingestion_job import IngestionJob
+from .file_processor import FileProcessor
+from .file_registry import FileRegistryService
+from .transaction_service import TransactionService, DEFAULT_USER_ID
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJobService:
+    """Create and inspect background ingestion jobs"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(
+        self,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        chunk_rows: int,
+        content_hash: str = None,
+        user_id: str = None
+    ) -> IngestionJob:
+        """Record a queued job for a file already written to the spool directory"""
+        job = IngestionJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            filename=filename,
+            file_path=file_path,
+            file_size=file_size,
+            content_hash=content_hash,
+            chunk_rows=chunk_rows,
+            status="queued"
+        )
+        self.db.add(job)
+        self.db.commit()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's progress as a dict, or None if it does not exist"""
+        job = self.db.get(IngestionJob, job_id)
+        if job is None:
+            return None
+        return serialize_job(job)
+
+
+def serialize_job(job: IngestionJob) -> Dict[str, Any]:
+    """Public view of a job"""
+    progress = (job.bytes_read or 0) / job.file_size if job.file_size else 0.0
+    if job.status == "completed":
+        progress = 1.0
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "progress": round(min(progress, 1.0), 4),
+        "chunks_processed": job.chunks_processed or 0,
+        "total_transactions": job.total_rows or 0,
+        "processed_transactions": job.created_rows or 0,
+        "skipped_duplicates": job.skipped_rows or 0,
+        "skipped_reasons": {
+            # identical bytes to a file ingested before; nothing was parsed
+            "duplicate_file": job.duplicate_of,
+            # inside an already-ingested account window with a known fingerprint
+            "already_ingested": job.already_ingested_rows or 0,
+            # new to this file's window but matched an existing fingerprint on insert
+            "duplicate_transaction": (job.skipped_rows or 0) - (job.already_ingested_rows or 0)
+        },
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def spool_path(filename: str) -> str:
+    """Unique path in the spool directory that keeps the upload's extension"""
+    os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(settings.UPLOAD_SPOOL_DIR, f"{uuid.uuid4()}{extension}")
+
+
+def run_ingestion_job(job_id: str) -> Dict[str, Any]:
+    """Process a spooled upload, recording progress on the job row after every chunk
+
+    Runs in whichever worker picked the job up (a local thread or a Celery worker)
+    and always uses its own database session.
+    """
+    db = SessionLocal()
+    file_path = None
+    try:
+        job = db.get(IngestionJob, job_id)
+        if job is None:
+            raise ValueError(f"Ingestion job {job_id} not found")
+        file_path = job.file_path
+
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        db.commit()
+
+        try:
+            user_id = job.user_id or DEFAULT_USER_ID
+            registry = FileRegistryService(db)
+            duplicate = registry.find_duplicate(user_id, job.content_hash) if job.content_hash else None
+
+            if duplicate is not None:
+                # Identical bytes were ingested before (e.g. a concurrent re-upload)
+                job.duplicate_of = duplicate.id
+                job.total_rows = duplicate.total_rows
+                job.skipped_rows = duplicate.total_rows
+            else:
+                with open(job.file_path, 'rb') as source:
+                    def on_progress(progress: Dict[str, Any]) -> None:
+                        job.chunks_processed = progress["chunk"]
+                        job.total_rows = progress["total_rows"]
+                        job.created_rows = progress["total_created"]
+                        job.skipped_rows = progress["total_rows"] - progress["total_created"]
+                        job.already_ingested_rows = progress["total_already_ingested"]
+                        job.bytes_read = source.tell()
+                        db.commit()
+
+                    chunks = FileProcessor().iter_file_chunks(job.filename, source, chunksize=job.chunk_rows)
+                    result = TransactionService(db).ingest_chunks(chunks, user_id, on_progress=on_progress)
+
+                if job.content_hash:
+                    registry.record_file(
+                        user_id=user_id,
+                        content_hash=job.content_hash,
+                        filename=job.filename,
+                        total_rows=result["total"],
+                        created_rows=result["created"],
+                        coverage=result["coverage"]
+                    )
+
+            job.status = "completed"
+            job.bytes_read = job.file_size
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return serialize_job(job)
+    finally:
+        db.close()
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+
+
+class LocalExecutor:
+    """Runs jobs on an in-process thread pool; needs no broker (development and tests)"""
+
+    def __init__(self, max_workers: int = None):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.INGESTION_LOCAL_WORKERS,
+            thread_name_prefix="ingestion"
+        )
+
+    def submit(self, job_id: str):
+        return self._pool.submit(run_ingestion_job, job_id)
+
+
+class CeleryExecutor:
+    """Hands jobs to Celery workers through the Redis broker"""
+
+    def submit(self, job_id: str):
+        from ..worker import ingest_file
+        return ingest_file.delay(job_id)
+
+
+_executor = None
+
+
+def get_executor():
+    """Executor selected by settings.INGESTION_EXECUTOR, created once per process"""
+    global _executor
+    if _executor is None:
+        if settings.INGESTION_EXECUTOR == "celery":
+            _executor = CeleryExecutor()
+        else:
+            _executor = LocalExecutor()
+    return _executor
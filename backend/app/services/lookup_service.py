@@ -0,0 +1,143 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Type
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from ..models.lookup import Category, Merchant
+
+logger = logging.getLogger(__name__)
+
+# Names per INSERT / IN (...) statement when adding or resolving lookup entries
+LOOKUP_BATCH_SIZE = 1000
+
+# Cached names per lookup table before the process cache starts over
+LOOKUP_CACHE_MAX_NAMES = 200_000
+
+
+def category_names_statement() -> Select:
+    """Every non-empty category name, from the categories lookup table; shared by sync and async sessions"""
+    return select(Category.name).where(Category.name != '').order_by(Category.name)
+
+
+def category_id_of(name: str):
+    """Scalar subquery for the id of a category name, so filters compare the indexed category_id"""
+    return select(Category.id).where(Category.name == name).scalar_subquery()
+
+
+class LookupIdCache:
+    """Process-wide name -> id maps per lookup table
+
+    Ids are never reassigned once a name is committed, so entries cannot go
+    stale; a table's map is simply dropped when it outgrows ``max_names``.
+    """
+
+    def __init__(self, max_names: int = LOOKUP_CACHE_MAX_NAMES):
+        self.max_names = max_names
+        self._ids: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, names: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            known = self._ids.get(table, {})
+            return {name: known[name] for name in names if name in known}
+
+    def put(self, table: str, ids: Dict[str, int]) -> None:
+        with self._lock:
+            known = self._ids.setdefault(table, {})
+            if len(known) + len(ids) > self.max_names:
+                known.clear()
+            known.update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+
+lookup_ids = LookupIdCache()
+
+
+class LookupService:
+    """Dictionary-encode category and merchant names into the ids transactions store
+
+    Names not seen before are added in a short transaction of their own, committed
+    before the caller's insert, so an id handed out is never rolled back from
+    under the process cache. A rolled-back ingest can leave unused names behind,
+    which is harmless.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def encode(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """``rows`` with category_id and merchant_id for their category and merchant names; NULL names get NULL ids"""
+        return rows.assign(
+            category_id=self._codes(Category, rows['category']),
+            merchant_id=self._codes(Merchant, rows['merchant'])
+        )
+
+    def ids(self, model: Type, names: List[str]) -> Dict[str, int]:
+        """Id of every name in ``names``, adding the ones the lookup table lacks"""
+        table = model.__tablename__
+        known = lookup_ids.get(table, names)
+        missing = [name for name in names if name not in known]
+        if missing:
+            found = self._fetch_or_add(model, missing)
+            lookup_ids.put(table, found)
+            known.update(found)
+        return known
+
+    def _codes(self, model: Type, names: pd.Series) -> pd.Series:
+        """Object column of Python int ids (None for missing names), one lookup per distinct name"""
+        codes, uniques = pd.factorize(names)
+        uniques = [str(name) for name in uniques]
+        ids = self.ids(model, uniques)
+        # -1 (a missing name) indexes the trailing None
+        table = np.array([ids[name] for name in uniques] + [None], dtype=object)
+        return pd.Series(table[codes], index=names.index, dtype=object)
+
+    def _fetch_or_add(self, model: Type, names: List[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        with self._own_transaction() as connection:
+            dialect = connection.dialect.name
+            for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+                batch = names[start:start + LOOKUP_BATCH_SIZE]
+                if dialect in ('postgresql', 'sqlite'):
+                    dialect_insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+                    connection.execute(
+                        dialect_insert(model).values([{'name': name} for name in batch]).on_conflict_do_nothing(
+                            index_elements=['name']
+                        )
+                    )
+                else:
+                    existing = set(connection.execute(select(model.name).where(model.name.in_(batch))).scalars())
+                    new_names = [name for name in batch if name not in existing]
+                    if new_names:
+                        connection.execute(insert(model), [{'name': name} for name in new_names])
+                found.update(
+                    (name, id_) for id_, name in connection.execute(
+                        select(model.id, model.name).where(model.name.in_(batch))
+                    )
+                )
+        logger.info(f"Resolved {len(names)} new {model.__tablename__} names")
+        return found
+
+    @contextmanager
+    def _own_transaction(self) -> Iterator[Connection]:
+        """Connection in a transaction committed on exit
+
+        A session bound to a connection rather than an engine (one the caller keeps
+        in a transaction of its own) gets a savepoint on that connection instead.
+        """
+        bind = self.db.get_bind()
+        if isinstance(bind, Connection):
+            with bind.begin_nested():
+                yield bind
+        else:
+            with bind.begin() as connection:
+                yield connection
@@ -0,0 +1,58 @@
+import logging
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+# plpgsql function created by migration 006: creates any missing monthly partitions
+# (with their hash sub-partitions) covering [from_date, to_date] and returns how many
+ENSURE_PARTITIONS_FUNCTION = "ensure_transaction_partitions"
+
+
+class TransactionPartitionService:
+    """Monthly range partitions of ``transactions`` on Postgres
+
+    Inserts into a month without a partition fail, so ingest makes sure the months
+    it is about to write exist, and the worker creates future months ahead of time.
+    Everything is a no-op on SQLite or on a schema that is not partitioned.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_partitioned(self) -> bool:
+        if self.db.get_bind().dialect.name != 'postgresql':
+            return False
+        return bool(self.db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+            {"table": Transaction.__tablename__}
+        ).scalar())
+
+    def ensure_range(self, start: date, end: date) -> int:
+        """Create missing monthly partitions for [start, end] in the session's transaction
+
+        Creating a partition locks the parent until commit, so callers should commit
+        soon after; months that already exist cost one catalog lookup each.
+        """
+        if not self.is_partitioned():
+            return 0
+        created = self.db.execute(
+            text(f"SELECT {ENSURE_PARTITIONS_FUNCTION}(:start, :end)"),
+            {"start": start, "end": end}
+        ).scalar()
+        if created:
+            logger.info(f"Created {created} transaction partitions for {start} to {end}")
+        return created
+
+    def ensure_ahead(self, months: int = None) -> int:
+        """Create partitions from this month through ``months`` months ahead, and commit"""
+        months = settings.TRANSACTION_PARTITION_MONTHS_AHEAD if months is None else months
+        today = date.today()
+        month_index = today.year * 12 + today.month - 1 + months
+        last_month = date(month_index // 12, month_index % 12 + 1, 1)
+        created = self.ensure_range(today.replace(day=1), last_month)
+        self.db.commit()
+        return created
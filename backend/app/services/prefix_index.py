@@ -0,0 +1,262 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+from ..core.cache import analytics_cache, ALL_USERS_SCOPE
+from ..models.daily_rollup import DailyUserCategoryRollup as Rollup
+from ..utils.money import cents_value
+from .frame_loader import load_frame
+
+logger = logging.getLogger(__name__)
+
+# Indexes kept in memory (one per user, plus the all-users scope)
+PREFIX_INDEX_MAX_USERS = 256
+
+# Planes of the cumulative array, in order
+INDEX_METRICS = ('income', 'expenses', 'transactions')
+
+
+def rollup_statement(user_id: Optional[str] = None, since: Optional[date] = None, until: Optional[date] = None) -> Select:
+    """Daily rollup rows for one user (or summed over all users), optionally within [since, until]
+
+    A Core select, so sync and async sessions run the identical query.
+    """
+    statement = select(
+        Rollup.date,
+        Rollup.category,
+        func.sum(Rollup.income_cents).label('income_cents'),
+        func.sum(Rollup.expense_cents).label('expense_cents'),
+        func.sum(Rollup.transaction_count).label('transaction_count')
+    )
+    if user_id:
+        statement = statement.where(Rollup.user_id == user_id)
+    if since:
+        statement = statement.where(Rollup.date >= since)
+    if until:
+        statement = statement.where(Rollup.date <= until)
+    return statement.group_by(Rollup.date, Rollup.category)
+
+
+def load_rollup(
+    db: Session,
+    user_id: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None
+) -> pd.DataFrame:
+    """rollup_statement results as a DataFrame: dates as datetime64, categories categorical"""
+    return load_frame(db, rollup_statement(user_id, since, until))
+
+
+def rollup_days(rows: pd.DataFrame, origin: date) -> np.ndarray:
+    """Days from ``origin`` of each rollup row's date"""
+    return (rows['date'].to_numpy(dtype='datetime64[D]') - np.datetime64(origin, 'D')).astype(np.int64)
+
+
+class PrefixSumIndex:
+    """Cumulative daily income and expenses (int64 cents) and counts per category for one user
+
+    ``cumulative[m, c, k]`` is metric ``m`` for category ``c`` summed over the first
+    ``k`` days from ``origin``, so any inclusive date range is two lookups per metric,
+    and the integer differences are exact however long the history.
+
+    The categories, their positions and the cumulative array are replaced together
+    as one immutable state, and every read takes that state once, so a reader
+    running alongside ``refresh_tail`` sees either the old index or the new one.
+    """
+
+    def __init__(self, origin: date, categories: List[str], daily: np.ndarray):
+        self.origin = origin
+        cumulative = np.zeros(daily.shape[:2] + (daily.shape[2] + 1,), dtype=np.int64)
+        np.cumsum(daily, axis=2, out=cumulative[:, :, 1:])
+        self._set_state(list(categories), cumulative)
+
+    @classmethod
+    def from_rollup(cls, rows: pd.DataFrame) -> 'PrefixSumIndex':
+        """Build from rollup rows (date, category, income_cents, expense_cents, transaction_count)"""
+        if rows.empty:
+            return cls(date.today(), [], np.zeros((len(INDEX_METRICS), 0, 0), dtype=np.int64))
+        origin = rows['date'].min().date()
+        categories = sorted(rows['category'].unique())
+        days = (rows['date'].max().date() - origin).days + 1
+        return cls(origin, categories, cls._dense(rows, origin, categories, days))
+
+    @property
+    def categories(self) -> List[str]:
+        return self._state[0]
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        return self._state[2]
+
+    @property
+    def days(self) -> int:
+        return self.cumulative.shape[2] - 1
+
+    @property
+    def end(self) -> date:
+        return self.origin + timedelta(days=self.days - 1)
+
+    def totals(self, start: date, end: date, category: str = None) -> Dict[str, Any]:
+        """Income, expenses, net and transaction count over [start, end], optionally for one category"""
+        _, positions, cumulative, total = self._state
+        i, j = self._bounds(start, end, cumulative.shape[2] - 1)
+        if category is None:
+            values = total[:, j] - total[:, i]
+        elif category in positions:
+            position = positions[category]
+            values = cumulative[:, position, j] - cumulative[:, position, i]
+        else:
+            values = np.zeros(len(INDEX_METRICS), dtype=np.int64)
+        return self._metrics(values)
+
+    def category_totals(self, start: date, end: date) -> Dict[str, Dict[str, Any]]:
+        """Per-category totals over [start, end] for categories with at least one transaction"""
+        categories, _, cumulative, _ = self._state
+        i, j = self._bounds(start, end, cumulative.shape[2] - 1)
+        values = cumulative[:, :, j] - cumulative[:, :, i]
+        return {
+            category: self._metrics(values[:, position])
+            for position, category in enumerate(categories)
+            if round(values[2, position]) > 0
+        }
+
+    def refresh_tail(self, rows: pd.DataFrame, since: date) -> bool:
+        """Recompute every day from ``since`` on from fresh rollup rows
+
+        Returns False when the change reaches before the index origin (or the index
+        is empty), in which case the caller should rebuild it instead.
+        """
+        previous, _, previous_cumulative, _ = self._state
+        if not previous or since < self.origin:
+            return False
+
+        categories = previous + sorted(set(rows['category']) - set(previous))
+        previous_days = previous_cumulative.shape[2] - 1
+        start = min((since - self.origin).days, previous_days)
+        last = rows['date'].max().date() if not rows.empty else self.end
+        days = max(previous_days, (last - self.origin).days + 1)
+
+        cumulative = np.zeros((len(INDEX_METRICS), len(categories), days + 1), dtype=np.int64)
+        cumulative[:, :len(previous), :start + 1] = previous_cumulative[:, :, :start + 1]
+        tail = self._dense(rows, self.origin + timedelta(days=start), categories, days - start)
+        cumulative[:, :, start + 1:] = cumulative[:, :, start:start + 1] + np.cumsum(tail, axis=2)
+        self._set_state(categories, cumulative)
+        return True
+
+    def _set_state(self, categories: List[str], cumulative: np.ndarray) -> None:
+        positions = {category: position for position, category in enumerate(categories)}
+        # One attribute assignment, so concurrent readers never see a half-updated index
+        self._state = (categories, positions, cumulative, cumulative.sum(axis=1))
+
+    def _bounds(self, start: date, end: date, days: int) -> Tuple[int, int]:
+        i = min(max((start - self.origin).days, 0), days)
+        j = min(max((end - self.origin).days + 1, 0), days)
+        return i, max(i, j)
+
+    @staticmethod
+    def _metrics(values: np.ndarray) -> Dict[str, Any]:
+        return {
+            'income': cents_value(values[0]),
+            'expenses': cents_value(values[1]),
+            'net': cents_value(values[0] - values[1]),
+            'transactions': int(values[2])
+        }
+
+    @staticmethod
+    def _dense(rows: pd.DataFrame, origin: date, categories: List[str], days: int) -> np.ndarray:
+        """Scatter rollup rows into a (metric, category, day) array starting at ``origin``"""
+        daily = np.zeros((len(INDEX_METRICS), len(categories), days), dtype=np.int64)
+        if rows.empty:
+            return daily
+        positions = {category: position for position, category in enumerate(categories)}
+        day = rollup_days(rows, origin)
+        category = rows['category'].astype(object).map(positions).to_numpy(dtype=np.int64)
+        for plane, column in enumerate(('income_cents', 'expense_cents', 'transaction_count')):
+            np.add.at(daily[plane], (category, day), rows[column].to_numpy(dtype=np.int64))
+        return daily
+
+
+class PrefixIndexRegistry:
+    """LRU of per-user prefix-sum indexes, validated against the analytics data version
+
+    Ingest in this process refreshes a cached index in place from the changed day on;
+    a version bump from anywhere else (another worker) makes the next read rebuild it
+    from the rollup. Indexes never expire, so they are only kept when that version is
+    shared across processes (``AnalyticsCache.shared_data_version``).
+
+    Otherwise (memory or none cache backend) nothing is kept, and ``get`` builds an
+    index over just the requested [since, until] window. That is one rollup scan of
+    the window, the same work as summing it in SQL, rather than a scan of the
+    user's whole history on every request.
+    """
+
+    def __init__(self, max_users: int = PREFIX_INDEX_MAX_USERS):
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, Tuple[PrefixSumIndex, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: str = None, since: date = None, until: date = None) -> PrefixSumIndex:
+        """Index for a user (or all users), building it from the rollup when missing or stale
+
+        ``since``/``until`` are the dates the caller will query. A cached index covers
+        the whole history; an uncached one may hold only that window.
+        """
+        scope = user_id or ALL_USERS_SCOPE
+        version = analytics_cache.shared_data_version(user_id)
+        if version is None:
+            return PrefixSumIndex.from_rollup(load_rollup(db, user_id, since, until))
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None and entry[1] == version:
+                self._entries.move_to_end(scope)
+                return entry[0]
+
+        index = PrefixSumIndex.from_rollup(load_rollup(db, user_id))
+        with self._lock:
+            self._entries[scope] = (index, version)
+            self._entries.move_to_end(scope)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return index
+
+    def refresh(self, db: Session, user_id: str, since: date, version: Optional[int] = None) -> None:
+        """Update a cached user index after this process changed rows dated ``since`` or later
+
+        ``version`` is the data version after the change; anything but the next
+        version means another writer got in between, so the index is dropped.
+        """
+        with self._lock:
+            self._entries.pop(ALL_USERS_SCOPE, None)
+            entry = self._entries.get(user_id)
+        if entry is None:
+            return
+
+        index, seen = entry
+        if version is None or version != seen + 1:
+            self.forget(user_id)
+            return
+
+        rows = load_rollup(db, user_id, since)
+        with self._lock:
+            if self._entries.get(user_id) is not entry:
+                return
+            if index.refresh_tail(rows, since):
+                self._entries[user_id] = (index, version)
+            else:
+                self._entries.pop(user_id, None)
+
+    def forget(self, user_id: str = None) -> None:
+        with self._lock:
+            self._entries.pop(user_id or ALL_USERS_SCOPE, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+prefix_indexes = PrefixIndexRegistry()
@@ -1,9 +1,12 @@
 import chromadb
 from typing import Dict,List,Any
+from datetime import datetime,timedelta
 import pandas as pd
 from sqlalchemy.orm import Session
-from ..models.transaction import Transaction
+from ..models.transaction import Transaction, transaction_select
 from ..core.config import settings
+from .columnar_cache import user_frame
+from .frame_loader import load_frame
 
 class RAGService:
     def __init__(self,db,Session):
@@ -14,7 +17,7 @@ class RAGService:
         # a collection in chroma is a table -it stores a set of documents +their vector embeddings
         self.collection = self.client.get_or_create_collection("financial_data")
 
-    def get_relevant_context(self,query:str)->Dict[str,Any]:
+    def get_relevant_context(self,query:str,user_id:str=None)->Dict[str,Any]:
         """getting relevant financial context for relevant info"""
         # querying the database for relevant info
         results= self.collection.query(
@@ -22,7 +25,7 @@ class RAGService:
             n_results=5
         )
         # recent transaction history
-        recent_transactions = self._get_recent_transaction_summary()
+        recent_transactions = self._get_recent_transaction_summary(user_id)
         # spending patternsa
         spending_patterns = self._get_spending_patterns()
 
@@ -37,20 +40,23 @@ class RAGService:
             "relevant_documents":results.get()
         }
     
-    def _get_recent_transaction_summary(self)->Dict[str,Any]:
+    def _get_recent_transaction_summary(self,user_id:str=None)->Dict[str,Any]:
         """Get summary of recent transactions"""
 
-        #Get last 30 days of transactions
-        transactions = self.db.query(Transaction).limit(100).all()
-        if not transactions:
+        #Get last 30 days of the user's transactions (from their cached columns when held)
+        if user_id:
+            end_date = datetime.now().date()
+            df = user_frame(self.db,user_id,end_date-timedelta(days=30),end_date)
+            if df.empty:
+                return{"message":"No transaction data available"}
+            return self._summarize_transactions(df)
+
+        df = load_frame(self.db,transaction_select(['amount','category','description','date']).limit(100))
+        if df.empty:
             return{"message":"No transaction data available"}
-        
-        df = pd.DataFrame([{
-            "amount":t.amount,
-            "category":t.category,
-            "desccription":t.description,
-            "date":t.date
-        }for t in transactions])
+        return self._summarize_transactions(df)
+
+    def _summarize_transactions(self,df:pd.DataFrame)->Dict[str,Any]:
         return {
             "total_transactions": len(df),
             "total_spent": df[df["amount"] < 0]["amount"].sum(),
@@ -61,16 +67,13 @@ class RAGService:
     
     def _get_spending_patterns(self) -> Dict[str, Any]:
         """Analyze spending patterns"""
-        transactions = self.db.query(Transaction).filter(Transaction.amount < 0).limit(200).all()
-        
-        if not transactions:
+        df = load_frame(self.db, transaction_select(['amount', 'category', 'date']).where(
+            Transaction.amount_cents < 0
+        ).limit(200))
+
+        if df.empty:
             return {"message": "No spending data available"}
-        
-        df = pd.DataFrame([{
-            "amount": abs(t.amount),
-            "category": t.category,
-            "date": t.date
-        } for t in transactions])
+        df["amount"] = df["amount"].abs()
         
         # Group by category
         category_spending = df.groupby("category")["amount"].agg(['sum', 'mean', 'count']).to_dict()
@@ -0,0 +1,194 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Sequence
+import pandas as pd
+from sqlalchemy import Select, insert, select, tuple_
+from sqlalchemy.orm import Session
+from ..core.cache import analytics_cache
+from ..ml.recurring_detector import SERIES_COLUMNS, SERIES_KEY, RecurringDetector
+from ..models.recurring import RecurringSeries
+from ..models.transaction import Transaction, transaction_select
+
+logger = logging.getLogger(__name__)
+
+# Series that never recurred are dropped once their last occurrence is this much older
+# than the oldest row being ingested; annual series need a little over a year of reach
+CANDIDATE_MAX_AGE_DAYS = 400
+
+# Series keys per IN (...) lookup or delete
+KEY_BATCH_SIZE = 500
+
+SERIES_STATUSES = ('active', 'lapsed', 'all')
+
+DETECTED_COLUMNS = ['user_id', 'date', 'amount', 'description', 'merchant']
+
+REPORT_COLUMNS = [
+    RecurringSeries.user_id,
+    RecurringSeries.merchant_key,
+    RecurringSeries.flow,
+    RecurringSeries.description,
+    RecurringSeries.cadence,
+    RecurringSeries.interval_days,
+    RecurringSeries.regularity,
+    RecurringSeries.occurrences,
+    RecurringSeries.amount_total,
+    RecurringSeries.last_amount,
+    RecurringSeries.first_date,
+    RecurringSeries.last_date,
+    RecurringSeries.next_expected_date,
+    RecurringSeries.lapses_on
+]
+
+
+def recurring_series_statement(
+    user_id: str = None,
+    status: str = "active",
+    as_of: date = None,
+    limit: int = 50
+) -> Select:
+    """Detected recurring series by next expected date; shared by sync and async sessions
+
+    ``active`` series are still within their cadence's tolerance of the next expected date on ``as_of``.
+    """
+    if status not in SERIES_STATUSES:
+        raise ValueError(f"Unknown status '{status}', expected one of {', '.join(SERIES_STATUSES)}")
+    as_of = as_of or date.today()
+
+    statement = select(*REPORT_COLUMNS).where(RecurringSeries.is_recurring.is_(True))
+    if user_id:
+        statement = statement.where(RecurringSeries.user_id == user_id)
+    if status == 'active':
+        statement = statement.where(RecurringSeries.lapses_on >= as_of)
+    elif status == 'lapsed':
+        statement = statement.where(RecurringSeries.lapses_on < as_of)
+    return statement.order_by(RecurringSeries.next_expected_date, RecurringSeries.merchant_key).limit(limit)
+
+
+def recurring_report(rows: Sequence[Any], as_of: date) -> Dict[str, Any]:
+    """Response body for recurring_series_statement rows"""
+    return {
+        'as_of': str(as_of),
+        'series': [
+            {
+                'user_id': row.user_id,
+                'merchant': row.merchant_key,
+                'description': row.description,
+                'flow': row.flow,
+                'cadence': row.cadence,
+                'interval_days': round(row.interval_days, 1),
+                'regularity': round(row.regularity, 2),
+                'occurrences': row.occurrences,
+                'typical_amount': round(row.amount_total / row.occurrences, 2),
+                'last_amount': row.last_amount,
+                'first_date': str(row.first_date),
+                'last_date': str(row.last_date),
+                'next_expected_date': str(row.next_expected_date),
+                'status': 'active' if row.lapses_on >= as_of else 'lapsed'
+            }
+            for row in rows
+        ]
+    }
+
+
+class RecurringService:
+    """Store recurring transaction series (subscriptions, bills, salaries) per user
+
+    Ingest folds only the rows it just inserted into the user's stored series;
+    history is read again only by ``rebuild``.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.detector = RecurringDetector()
+
+    def update(self, rows: pd.DataFrame, user_id: str) -> int:
+        """Fold freshly inserted rows (DETECTED_COLUMNS) into the user's series; the caller commits"""
+        if rows.empty:
+            return 0
+        keys = self.detector.candidate_keys(rows)
+        series = self.detector.update(self.load(user_id, keys), rows)
+        self._replace(user_id, series)
+        self._prune(user_id, min(rows['date']) - timedelta(days=CANDIDATE_MAX_AGE_DAYS))
+        return int(series['is_recurring'].sum())
+
+    def forget(self, rows: pd.DataFrame) -> None:
+        """Take deleted transactions (DETECTED_COLUMNS) out of their series; the caller commits"""
+        for owner, owned in rows.groupby('user_id'):
+            keys = self.detector.candidate_keys(owned)
+            self._replace(owner, self.detector.remove(self.load(owner, keys), owned))
+
+    def rebuild(self, user_id: str = None) -> int:
+        """Detect series from the full history of one user, or every user, replacing what is stored, and commit"""
+        if user_id:
+            user_ids = [user_id]
+        else:
+            user_ids = [owner for (owner,) in self.db.execute(select(Transaction.user_id).distinct())]
+
+        detected = 0
+        for owner in user_ids:
+            history = pd.DataFrame(
+                self.db.execute(
+                    transaction_select(DETECTED_COLUMNS).where(
+                        Transaction.user_id == owner
+                    )
+                ).all(),
+                columns=DETECTED_COLUMNS
+            )
+            self.db.query(RecurringSeries).filter(
+                RecurringSeries.user_id == owner
+            ).delete(synchronize_session=False)
+            series = self.detector.update(pd.DataFrame(columns=SERIES_COLUMNS), history)
+            self._insert(owner, series)
+            if not history.empty:
+                self._prune(owner, max(history['date']) - timedelta(days=CANDIDATE_MAX_AGE_DAYS))
+            self.db.commit()
+            analytics_cache.bump(owner)
+            detected += int(series['is_recurring'].sum())
+            logger.info(f"Detected {int(series['is_recurring'].sum())} recurring series for {owner}")
+        return detected
+
+    def load(self, user_id: str, keys: pd.DataFrame) -> pd.DataFrame:
+        """Stored series of ``user_id`` for the SERIES_KEY rows in ``keys``"""
+        columns = [getattr(RecurringSeries, column) for column in SERIES_COLUMNS]
+        key_columns = tuple_(*[getattr(RecurringSeries, column) for column in SERIES_KEY])
+        wanted = list(keys[SERIES_KEY].itertuples(index=False, name=None))
+
+        rows = []
+        for start in range(0, len(wanted), KEY_BATCH_SIZE):
+            rows.extend(self.db.execute(
+                select(*columns).where(
+                    RecurringSeries.user_id == user_id,
+                    key_columns.in_(wanted[start:start + KEY_BATCH_SIZE])
+                )
+            ).all())
+        return pd.DataFrame(rows, columns=SERIES_COLUMNS)
+
+    def series(self, user_id: str = None, status: str = "active", limit: int = 50) -> Dict[str, Any]:
+        as_of = date.today()
+        rows = self.db.execute(recurring_series_statement(user_id, status, as_of, limit)).all()
+        return recurring_report(rows, as_of)
+
+    def _replace(self, user_id: str, series: pd.DataFrame) -> None:
+        """Write the new state of ``series``, dropping series left without occurrences"""
+        if series.empty:
+            return
+        key_columns = tuple_(*[getattr(RecurringSeries, column) for column in SERIES_KEY])
+        keys = list(series[SERIES_KEY].itertuples(index=False, name=None))
+        for start in range(0, len(keys), KEY_BATCH_SIZE):
+            self.db.query(RecurringSeries).filter(
+                RecurringSeries.user_id == user_id,
+                key_columns.in_(keys[start:start + KEY_BATCH_SIZE])
+            ).delete(synchronize_session=False)
+        self._insert(user_id, series)
+
+    def _insert(self, user_id: str, series: pd.DataFrame) -> None:
+        kept = series[series['occurrences'] > 0].assign(user_id=user_id)
+        if not kept.empty:
+            self.db.execute(insert(RecurringSeries), kept.astype(object).where(kept.notna(), None).to_dict('records'))
+
+    def _prune(self, user_id: str, before: date) -> None:
+        self.db.query(RecurringSeries).filter(
+            RecurringSeries.user_id == user_id,
+            RecurringSeries.is_recurring.is_(False),
+            RecurringSeries.last_date < before
+        ).delete(synchronize_session=False)
@@ -0,0 +1,165 @@
+import logging
+from typing import List
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from ..core.cache import analytics_cache
+from ..models.daily_rollup import DailyUserCategoryRollup, ROLLUP_DEFAULT_CATEGORY
+from ..models.lookup import Category
+from ..models.transaction import Transaction
+from .prefix_index import prefix_indexes
+
+logger = logging.getLogger(__name__)
+
+# Primary key of the rollup and conflict target for delta upserts
+ROLLUP_KEY_COLUMNS = ['user_id', 'date', 'category']
+
+ROLLUP_VALUE_COLUMNS = ['income_cents', 'expense_cents', 'transaction_count']
+
+# Rollup rows per upsert statement (6 bind parameters each)
+ROLLUP_BATCH_SIZE = 2000
+
+
+def rollup_category(column):
+    """SQL expression mapping NULL or empty categories to the rollup's default category"""
+    return func.coalesce(func.nullif(column, ''), ROLLUP_DEFAULT_CATEGORY)
+
+
+def rollup_merge_sql(source: str) -> str:
+    """Postgres statement folding the (user_id, date, category, amount_cents) rows of ``source`` into the rollup
+
+    Used inside the COPY loader's ``WITH inserted AS (INSERT ... RETURNING ...)`` so
+    the rollup is updated in the same statement as the rows it summarizes.
+    """
+    return f"""
+        INSERT INTO {DailyUserCategoryRollup.__tablename__}
+            (user_id, date, category, income_cents, expense_cents, transaction_count)
+        SELECT
+            user_id,
+            date,
+            COALESCE(NULLIF(category, ''), '{ROLLUP_DEFAULT_CATEGORY}'),
+            COALESCE(SUM(amount_cents) FILTER (WHERE amount_cents > 0), 0),
+            COALESCE(-SUM(amount_cents) FILTER (WHERE amount_cents < 0), 0),
+            COUNT(*)
+        FROM {source}
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, date, category) DO UPDATE SET
+            income_cents = {DailyUserCategoryRollup.__tablename__}.income_cents + EXCLUDED.income_cents,
+            expense_cents = {DailyUserCategoryRollup.__tablename__}.expense_cents + EXCLUDED.expense_cents,
+            transaction_count = {DailyUserCategoryRollup.__tablename__}.transaction_count + EXCLUDED.transaction_count
+    """
+
+
+def aggregate_rollup_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    """Collapse transaction rows (user_id, date, category, amount_cents) into per-day, per-category deltas"""
+    amounts = rows['amount_cents'].astype(np.int64)
+    category = rows['category']
+    deltas = pd.DataFrame({
+        'user_id': rows['user_id'],
+        'date': pd.to_datetime(rows['date']).dt.date,
+        'category': category.where(category.notna() & (category != ''), ROLLUP_DEFAULT_CATEGORY),
+        'income_cents': amounts.clip(lower=0),
+        'expense_cents': (-amounts).clip(lower=0),
+        'transaction_count': 1
+    })
+    return deltas.groupby(ROLLUP_KEY_COLUMNS, as_index=False, sort=False)[ROLLUP_VALUE_COLUMNS].sum()
+
+
+class RollupService:
+    """Maintain daily_user_category_rollup alongside inserts and deletes of transactions"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, rows: pd.DataFrame, sign: int = 1) -> int:
+        """Add (sign=1) or subtract (sign=-1) transaction rows; runs in the caller's transaction
+
+        Returns the number of rollup rows touched.
+        """
+        if rows.empty:
+            return 0
+
+        deltas = aggregate_rollup_rows(rows)
+        deltas[ROLLUP_VALUE_COLUMNS] = deltas[ROLLUP_VALUE_COLUMNS] * sign
+        records = deltas.to_dict('records')
+
+        for start in range(0, len(records), ROLLUP_BATCH_SIZE):
+            self._upsert(records[start:start + ROLLUP_BATCH_SIZE])
+
+        if sign < 0:
+            # Days whose last transaction in a category was removed
+            self.db.query(DailyUserCategoryRollup).filter(
+                DailyUserCategoryRollup.user_id.in_(deltas['user_id'].unique().tolist()),
+                DailyUserCategoryRollup.date >= deltas['date'].min(),
+                DailyUserCategoryRollup.date <= deltas['date'].max(),
+                DailyUserCategoryRollup.transaction_count <= 0
+            ).delete(synchronize_session=False)
+        return len(records)
+
+    def rebuild(self, user_id: str = None) -> int:
+        """Recompute the rollup from transactions for one user, or everyone, and commit"""
+        stale = self.db.query(DailyUserCategoryRollup)
+        if user_id:
+            stale = stale.filter(DailyUserCategoryRollup.user_id == user_id)
+        stale.delete(synchronize_session=False)
+
+        category = rollup_category(Category.name)
+        aggregate = select(
+            Transaction.user_id,
+            Transaction.date,
+            category,
+            func.coalesce(func.sum(Transaction.amount_cents).filter(Transaction.amount_cents > 0), 0),
+            func.coalesce(func.sum(-Transaction.amount_cents).filter(Transaction.amount_cents < 0), 0),
+            func.count()
+        ).select_from(Transaction).outerjoin(
+            Category, Category.id == Transaction.category_id
+        ).group_by(Transaction.user_id, Transaction.date, category)
+        if user_id:
+            aggregate = aggregate.where(Transaction.user_id == user_id)
+
+        result = self.db.execute(
+            insert(DailyUserCategoryRollup).from_select(ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS, aggregate)
+        )
+        self.db.commit()
+        if user_id:
+            analytics_cache.bump(user_id)
+            prefix_indexes.forget(user_id)
+            prefix_indexes.forget()
+        else:
+            for (owner,) in self.db.query(DailyUserCategoryRollup.user_id).distinct():
+                analytics_cache.bump(owner)
+            prefix_indexes.clear()
+        logger.info(f"Rebuilt {result.rowcount} rollup rows for {user_id or 'all users'}")
+        return result.rowcount
+
+    def _upsert(self, records: List[dict]) -> None:
+        """Add one batch of deltas to existing rollup rows, creating missing ones"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+            statement = dialect_insert(DailyUserCategoryRollup).values(records)
+            statement = statement.on_conflict_do_update(
+                index_elements=ROLLUP_KEY_COLUMNS,
+                set_={
+                    column: getattr(DailyUserCategoryRollup, column) + getattr(statement.excluded, column)
+                    for column in ROLLUP_VALUE_COLUMNS
+                }
+            )
+            self.db.execute(statement)
+            return
+
+        # Generic engines: update in place, insert whatever did not exist yet
+        for record in records:
+            updated = self.db.query(DailyUserCategoryRollup).filter(
+                DailyUserCategoryRollup.user_id == record['user_id'],
+                DailyUserCategoryRollup.date == record['date'],
+                DailyUserCategoryRollup.category == record['category']
+            ).update({
+                column: getattr(DailyUserCategoryRollup, column) + record[column]
+                for column in ROLLUP_VALUE_COLUMNS
+            }, synchronize_session=False)
+            if not updated:
+                self.db.add(DailyUserCategoryRollup(**record))
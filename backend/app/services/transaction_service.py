@@ -1,13 +1,83 @@
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import logging
+from typing import List, Dict, Any, Callable, Iterable, Set, Tuple
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from ..models.transaction import Transaction
+from sqlalchemy import Select, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..core.cache import analytics_cache, cached_result
+from ..models.transaction import Transaction, DEDUP_CONSTRAINT_COLUMNS, transaction_select
 from ..models.user import User
 from ..ml.transaction_analyzer import TransactionAnalyzer
+from .bulk_loader import PostgresCopyLoader, LOAD_COLUMNS
+from .columnar_cache import columnar_cache, user_frame
+from .file_registry import CoveredWindows, FileRegistryService
+from .lookup_service import LookupService, category_id_of, category_names_statement
+from .analytics_engine import AnalyticsEngine
+from .anomaly_service import AnomalyService
+from .recurring_service import RecurringService
+from .partitioning import TransactionPartitionService
+from .prefix_index import prefix_indexes
+from .rollup_service import RollupService
+from ..utils.fingerprint import transaction_fingerprints
+from ..utils.money import CENTS_PER_UNIT, DEFAULT_CURRENCY, amount_to_cents
+from ..utils.pagination import decode_cursor
+from ..utils.periods import period_start, resolve_range
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bind parameters well under driver limits
+INSERT_BATCH_SIZE = 2000
+
+# Owner of uploads made without an authenticated user
+DEFAULT_USER_ID = "default_user"
+
+# Listing order; (user_id, date) is served by idx_user_date and id breaks ties
+LISTING_ORDER = (Transaction.user_id, Transaction.date, Transaction.id)
+
+# Insert-ready rows: the loaded columns plus the major-unit amount and the category and merchant
+# names their ids encode
+TRANSACTION_ROW_COLUMNS = LOAD_COLUMNS + ['amount', 'category', 'merchant']
+
+
+def filtered_transactions_statement(
+    category: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    user_id: str = None,
+    cursor: str = None
+) -> Select:
+    """Transactions matching the listing filters in LISTING_ORDER, starting after ``cursor``
+
+    A Core select so sync and async sessions share it. Raises ValueError for a
+    malformed date or cursor.
+    """
+    statement = select(Transaction)
+
+    if user_id:
+        statement = statement.where(Transaction.user_id == user_id)
+
+    if category:
+        statement = statement.where(Transaction.category_id == category_id_of(category))
+
+    if start_date:
+        statement = statement.where(Transaction.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+
+    if end_date:
+        statement = statement.where(Transaction.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+
+    if cursor:
+        after = decode_cursor(cursor)
+        statement = statement.where(tuple_(*LISTING_ORDER) > tuple_(*after))
+        if user_id and after[0] == user_id:
+            # Implied by the row comparison for one user, but spelled out so the
+            # planner can prune monthly partitions before the cursor date
+            statement = statement.where(Transaction.date >= after[1])
+
+    return statement.order_by(*LISTING_ORDER)
 
 
 class TransactionService:
@@ -15,48 +85,244 @@ class TransactionService:
         self.db = db
         self.analyzer = TransactionAnalyzer()
 
-    def bulk_create_transactions(self, df: pd.DataFrame, user_id: str = None) -> Dict[str, int]:
-        """Bulk create transactions from DataFrame"""
-        processed_transactions = []
-        skipped_count = 0
+    def bulk_create_transactions(
+        self,
+        df: pd.DataFrame,
+        user_id: str = None,
+        covered: CoveredWindows = None
+    ) -> Dict[str, Any]:
+        """Bulk create transactions from DataFrame, skipping rows whose fingerprint already exists
+
+        When ``covered`` windows are given, rows inside an already-ingested window whose
+        fingerprint is known are dropped before categorization and insert.
+        """
+        user_id = user_id or DEFAULT_USER_ID
 
-        # Clean and categorize data
+        # Clean and fingerprint data
         df = self._clean_transaction_data(df)
+        df = df.assign(fingerprint=transaction_fingerprints(df, user_id))
+        coverage = self._coverage(df)
+
+        already_ingested = self._already_ingested(df, user_id, covered)
+        if already_ingested.any():
+            df = df[~already_ingested]
+
+        # Categorize only what is left
         df = self.analyzer.categorize_transactions(df)
 
-        for _, row in df.iterrows():
-            # Check for duplicates
-            existing = self.db.query(Transaction).filter(
-                and_(
-                    Transaction.amount == row['amount'],
-                    Transaction.description == row['description'],
-                    Transaction.date == pd.to_datetime(row['date']).date()
-                )
-            ).first()
-            
-            if existing:
-                skipped_count += 1
-                continue
-                
-            transaction = Transaction(
-                id=str(uuid.uuid4()),
-                user_id=user_id or "default_user",
-                amount=float(row['amount']),
-                description=str(row['description']),
-                category=row.get('category', 'Other'),
-                date=pd.to_datetime(row['date']).date(),
-                merchant=row.get('merchant', ''),
-                account_type=row.get('account_type', '')
-            )
-            self.db.add(transaction)
-            processed_transactions.append(transaction)
-        
+        rows = self._build_transaction_rows(df, user_id)
+        if not rows.empty:
+            TransactionPartitionService(self.db).ensure_range(rows['date'].min(), rows['date'].max())
+        if PostgresCopyLoader.is_supported(self.db):
+            inserted = PostgresCopyLoader(self.db).load(rows)
+            created = rows[rows['fingerprint'].isin(inserted)]
+        else:
+            records = rows[LOAD_COLUMNS].to_dict('records')
+            inserted = set()
+            for start in range(0, len(records), INSERT_BATCH_SIZE):
+                inserted.update(self._insert_ignoring_duplicates(records[start:start + INSERT_BATCH_SIZE]))
+            created = rows[rows['fingerprint'].isin(inserted)]
+            RollupService(self.db).apply(created)
+        created_count = len(created)
+
+        # Only the new rows are scored and folded into recurring series, against the user's stored state
+        AnomalyService(self.db).score_new(created, user_id)
+        RecurringService(self.db).update(created, user_id)
         self.db.commit()
+        if created_count:
+            version = analytics_cache.bump(user_id)
+            prefix_indexes.refresh(self.db, user_id, rows['date'].min(), version)
+            columnar_cache.append(user_id, created, version)
         return {
-            "created": len(processed_transactions),
-            "skipped": skipped_count
+            "created": created_count,
+            "skipped": int(already_ingested.sum()) + len(df) - created_count,
+            "already_ingested": int(already_ingested.sum()),
+            "coverage": coverage
         }
-    
+
+    def ingest_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        user_id: str = None,
+        on_progress: Callable[[Dict[str, Any]], None] = None,
+        skip_ingested_windows: bool = True
+    ) -> Dict[str, Any]:
+        """Clean, categorize and insert a stream of DataFrames one chunk at a time
+
+        Each chunk is committed before the next one is pulled from the iterator,
+        so memory is bounded by the chunk size rather than the file size. The
+        result includes the date window covered per account across all chunks.
+        """
+        user_id = user_id or DEFAULT_USER_ID
+        covered = FileRegistryService(self.db).covered_windows(user_id) if skip_ingested_windows else None
+        totals = {"total": 0, "created": 0, "skipped": 0, "already_ingested": 0, "coverage": {}, "chunks": []}
+
+        for index, chunk in enumerate(chunks):
+            result = self.bulk_create_transactions(chunk, user_id, covered=covered)
+            progress = {
+                "chunk": index + 1,
+                "rows": len(chunk),
+                "created": result["created"],
+                "skipped": result["skipped"],
+                "already_ingested": result["already_ingested"]
+            }
+            totals["total"] += len(chunk)
+            totals["created"] += result["created"]
+            totals["skipped"] += result["skipped"]
+            totals["already_ingested"] += result["already_ingested"]
+            totals["chunks"].append(progress)
+            for account, (start, end) in result["coverage"].items():
+                seen = totals["coverage"].get(account)
+                totals["coverage"][account] = (min(start, seen[0]), max(end, seen[1])) if seen else (start, end)
+
+            logger.info(
+                f"Ingested chunk {progress['chunk']}: {progress['rows']} rows, "
+                f"{progress['created']} created, {progress['skipped']} skipped "
+                f"({progress['already_ingested']} already ingested)"
+            )
+            if on_progress:
+                on_progress({
+                    **progress,
+                    "total_rows": totals["total"],
+                    "total_created": totals["created"],
+                    "total_already_ingested": totals["already_ingested"]
+                })
+
+        return totals
+
+    def _coverage(self, df: pd.DataFrame) -> Dict[str, Tuple[date, date]]:
+        """First and last date per account in a cleaned frame"""
+        if df.empty:
+            return {}
+        accounts = self._account_column(df)
+        bounds = pd.to_datetime(df['date']).groupby(accounts).agg(['min', 'max'])
+        return {account: (row['min'].date(), row['max'].date()) for account, row in bounds.iterrows()}
+
+    def _already_ingested(self, df: pd.DataFrame, user_id: str, covered: CoveredWindows = None) -> np.ndarray:
+        """Rows inside a covered window whose fingerprint is already stored"""
+        if not covered or df.empty:
+            return np.zeros(len(df), dtype=bool)
+
+        in_window = covered.contains(self._account_column(df), df['date'])
+        if not in_window.any():
+            return in_window
+
+        # One range scan over the (user_id, date, fingerprint) unique index
+        dates = pd.to_datetime(df.loc[in_window, 'date'])
+        existing = {
+            fingerprint for (fingerprint,) in self.db.query(Transaction.fingerprint).filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= dates.min().date(),
+                Transaction.date <= dates.max().date()
+            )
+        }
+        return in_window & df['fingerprint'].isin(existing).to_numpy()
+
+    def _account_column(self, df: pd.DataFrame) -> pd.Series:
+        if 'account_type' in df.columns:
+            return df['account_type'].fillna('').astype(str)
+        return pd.Series('', index=df.index)
+
+    def _build_transaction_rows(self, df: pd.DataFrame, user_id: str) -> pd.DataFrame:
+        """Turn a cleaned, categorized DataFrame into insert-ready rows (one per fingerprint)
+
+        Money is stored as integer cents: taken as parsed by FileProcessor when
+        present, otherwise rounded from ``amount``. The major-unit amount and the
+        category and merchant names are kept next to what is stored for the rollup,
+        anomaly, recurring and columnar cache updates that follow.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=TRANSACTION_ROW_COLUMNS)
+
+        if 'amount_cents' in df.columns:
+            cents = df['amount_cents'].to_numpy(dtype=np.int64)
+        else:
+            cents = amount_to_cents(df['amount'])
+        currency = DEFAULT_CURRENCY
+        if 'currency' in df.columns:
+            currency = df['currency'].where(df['currency'] != '', DEFAULT_CURRENCY).fillna(DEFAULT_CURRENCY)
+            # Every total (rollup, prefix index, columnar cache, engine) sums cents across
+            # rows, so amounts in another currency would be added as if they were USD
+            others = sorted(set(currency.unique()) - {DEFAULT_CURRENCY})
+            if others:
+                raise ValueError(
+                    f"Only {DEFAULT_CURRENCY} transactions are supported until currency conversion exists; "
+                    f"found {', '.join(others)}"
+                )
+
+        rows = pd.DataFrame({
+            'user_id': user_id,
+            'amount_cents': cents,
+            'currency': currency,
+            'amount': cents / CENTS_PER_UNIT,
+            'description': df['description'].astype(str),
+            'category': df['category'] if 'category' in df.columns else 'Other',
+            'merchant': df['merchant'] if 'merchant' in df.columns else '',
+            'account_type': df['account_type'] if 'account_type' in df.columns else '',
+            'date': pd.to_datetime(df['date']).dt.date,
+            'fingerprint': df['fingerprint'] if 'fingerprint' in df.columns else transaction_fingerprints(df, user_id)
+        })
+        # Rows repeated within the same file would conflict with each other anyway
+        rows = rows.drop_duplicates(subset='fingerprint')
+        rows['merchant'] = rows['merchant'].fillna('')
+        rows['account_type'] = rows['account_type'].fillna('')
+        rows.insert(0, 'id', [str(uuid.uuid4()) for _ in range(len(rows))])
+        return LookupService(self.db).encode(rows)
+
+    def _insert_ignoring_duplicates(self, records: List[Dict[str, Any]]) -> Set[str]:
+        """Insert one batch with a single set-based statement and return the fingerprints that were new
+
+        Fallback for engines without COPY support.
+        """
+        if not records:
+            return set()
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+            statement = dialect_insert(Transaction).values(records).on_conflict_do_nothing(
+                index_elements=DEDUP_CONSTRAINT_COLUMNS
+            ).returning(Transaction.fingerprint)
+            return set(self.db.execute(statement).scalars())
+
+        # Generic engines: one anti-join lookup per batch, then a plain insert of the new rows
+        fingerprints = [record['fingerprint'] for record in records]
+        existing = {
+            fingerprint for (fingerprint,) in self.db.query(Transaction.fingerprint).filter(
+                Transaction.user_id == records[0]['user_id'],
+                Transaction.fingerprint.in_(fingerprints)
+            )
+        }
+        new_records = [record for record in records if record['fingerprint'] not in existing]
+        if new_records:
+            self.db.execute(insert(Transaction), new_records)
+        return {record['fingerprint'] for record in new_records}
+
+    def delete_transactions(self, transaction_ids: List[str], user_id: str = None) -> int:
+        """Delete transactions, subtract them from the daily rollup and from their recurring series,
+        drop their anomaly scores and forget the files that covered them"""
+        query = self.db.query(Transaction).filter(Transaction.id.in_(transaction_ids))
+        if user_id:
+            query = query.filter(Transaction.user_id == user_id)
+
+        columns = [
+            'id', 'user_id', 'date', 'category', 'amount_cents', 'amount', 'description', 'merchant', 'account_type'
+        ]
+        removed = pd.DataFrame(self.db.execute(transaction_select(columns).where(query.whereclause)).all(), columns=columns)
+        if removed.empty:
+            return 0
+
+        query.delete(synchronize_session=False)
+        RollupService(self.db).apply(removed, sign=-1)
+        AnomalyService(self.db).forget(removed['id'])
+        RecurringService(self.db).forget(removed)
+        FileRegistryService(self.db).forget_windows(removed)
+        self.db.commit()
+        for owner, dates in removed.groupby('user_id')['date']:
+            version = analytics_cache.bump(owner)
+            prefix_indexes.refresh(self.db, owner, dates.min(), version)
+            columnar_cache.forget(owner)
+        return len(removed)
 
     def get_filtered_transactions(
         self, 
@@ -65,71 +331,25 @@ class TransactionService:
         category: str = None,
         start_date: str = None,
         end_date: str = None,
-        user_id: str = None
+        user_id: str = None,
+        cursor: str = None
     ) -> List[Transaction]:
-        """Get filtered transactions"""
-        query = self.db.query(Transaction)
-        
-        if user_id:
-            query = query.filter(Transaction.user_id == user_id)
-        
-        if category:
-            query = query.filter(Transaction.category == category)
-            
-        if start_date:
-            query = query.filter(Transaction.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-            
-        if end_date:
-            query = query.filter(Transaction.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
-        
-        return query.offset(skip).limit(limit).all()
+        """Get a page of filtered transactions, after ``cursor`` (keyset) or ``skip`` rows (offset)"""
+        statement = filtered_transactions_statement(category, start_date, end_date, user_id, cursor)
+        if skip:
+            statement = statement.offset(skip)
+        return list(self.db.scalars(statement.limit(limit)))
 
     def get_categories(self) -> List[str]:
-        """Get all unique categories"""
-        categories = self.db.query(Transaction.category).distinct().all()
-        return [cat[0] for cat in categories if cat[0]]
-
-    def get_summary(self, period: str = "30d", user_id: str = None) -> Dict[str, Any]:
-        """Get transaction summary for a period"""
-        end_date = datetime.now().date()
-        start_date = self._get_start_date_from_period(period, end_date)
-        
-        query = self.db.query(Transaction).filter(
-            and_(
-                Transaction.date >= start_date,
-                Transaction.date <= end_date
-            )
-        )
-        
-        if user_id:
-            query = query.filter(Transaction.user_id == user_id)
-        
-        transactions = query.all()
-        
-        if not transactions:
-            return {
-                "total_transactions": 0,
-                "total_income": 0,
-                "total_expenses": 0,
-                "net_amount": 0,
-                "categories": {}
-            }
-        
-        df = pd.DataFrame([{
-            'amount': t.amount,
-            'category': t.category or 'Other'
-        } for t in transactions])
-        
-        income = df[df['amount'] > 0]['amount'].sum()
-        expenses = abs(df[df['amount'] < 0]['amount'].sum())
-        
-        return {
-            "total_transactions": len(transactions),
-            "total_income": float(income),
-            "total_expenses": float(expenses),
-            "net_amount": float(income - expenses),
-            "categories": df.groupby('category')['amount'].sum().to_dict()
-        }
+        """Get all categories, from the categories lookup table rather than a scan of transactions"""
+        return list(self.db.scalars(category_names_statement()))
+
+    @cached_result("summary")
+    def get_summary(self, period: str = "30d", user_id: str = None, start: str = None, end: str = None) -> Dict[str, Any]:
+        """Get transaction summary for a period, or for explicit YYYY-MM-DD start/end dates"""
+        start_date, end_date = resolve_range(period, start, end)
+        engine = AnalyticsEngine(self.db)
+        return engine.summary(engine.load(start_date, end_date, user_id), start_date, end_date)
 
     def _clean_transaction_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """clean and standardize transaction data"""
@@ -154,31 +374,15 @@ class TransactionService:
 
     def _get_start_date_from_period(self, period: str, end_date) -> datetime.date:
         """Convert period string to start date"""
-        if period == "7d":
-            return end_date - timedelta(days=7)
-        elif period == "30d":
-            return end_date - timedelta(days=30)
-        elif period == "90d":
-            return end_date - timedelta(days=90)
-        elif period == "1y":
-            return end_date - timedelta(days=365)
-        else:
-            return end_date - timedelta(days=30)
+        return period_start(period, end_date)
     
     async def analyze_spending_patterns(self,user_id:str,period:str)->Dict[str,Any]:
         """Analyze user spending patterns"""
 
-        transactions = self._get_user_transactions(user_id,period)
+        df = user_frame(self.db,user_id,self._analysis_start(period),datetime.now().date())
 
-        if not  transactions:
+        if df.empty:
             return{"message":"no transactions found for analysis"}
-        
-        df = pd.DataFrame([{
-            'amount':t.amount,
-            'category':t.category,
-            'date':t.date,
-            'desccription':t.description
-        }for t in transactions])
 
         # perform analysis
         analysis = await self.analyzer.analyze_patterns(df)
@@ -186,9 +390,8 @@ class TransactionService:
     
 
 
-    def _get_user_transactions(self,user_id:str,period:str)->List[Transaction]:
-        """Get user trasactions for a specific period"""
-
+    def _analysis_start(self,period:str)->date:
+        """Start of the window analyze_spending_patterns covers: 1m, 3m, 6m or 1y back from today"""
         end_date= datetime.now().date()
         if period == "1m":
             start_date = end_date-timedelta(days=30)
@@ -204,12 +407,5 @@ class TransactionService:
 
         else:
             start_date = end_date - timedelta(days=180)  #defaulting to 6 months
-
-        with get_db() as db:
-            transactions = db.query(Transaction).filter(
-                Transaction.user_id == user_id,
-                Transaction.date>= start_date,
-                Transaction.date<=end_date
-            ).all()
-        return transactions
+        return start_date
     
\ No newline at end of file
@@ -0,0 +1,44 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from .money import amount_to_cents
+
+
+def normalize_description(descriptions: pd.Series) -> pd.Series:
+    """Lowercase descriptions and collapse runs of whitespace"""
+    return (
+        descriptions.fillna('').astype(str)
+        .str.strip()
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.lower()
+    )
+
+
+def format_cents(cents: np.ndarray) -> pd.Series:
+    """Format integer cents the way Postgres renders round(amount::numeric, 2)::text"""
+    cents = pd.Series(cents)
+    absolute = cents.abs()
+    sign = pd.Series(np.where(cents < 0, '-', ''), index=cents.index)
+    return sign + (absolute // 100).astype(str) + '.' + (absolute % 100).astype(str).str.zfill(2)
+
+
+def transaction_fingerprints(df: pd.DataFrame, user_id: str) -> pd.Series:
+    """Compute content fingerprints for (user, date, amount, normalized description)
+
+    The canonical form is ``user|YYYY-MM-DD|amount(2dp)|normalized description``
+    hashed with SHA-256, mirroring the SQL backfill in migration 002.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    amounts = format_cents(amount_to_cents(df['amount']))
+    amounts.index = df.index
+    descriptions = normalize_description(df['description'])
+
+    canonical = f"{user_id}|" + dates + '|' + amounts + '|' + descriptions
+    return pd.Series(
+        [hashlib.sha256(value.encode('utf-8')).hexdigest() for value in canonical],
+        index=df.index,
+        dtype=object
+    )
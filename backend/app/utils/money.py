@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Money is stored as integer minor units (cents): this many per major unit
+CENTS_PER_UNIT = 100
+
+# Currency of amounts whose source names none (ISO 4217), and for now the only one ingested
+DEFAULT_CURRENCY = 'USD'
+
+# Cleaned decimal amounts: optional sign, digits, optional fraction
+_DECIMAL_AMOUNT = r'^([+-]?)(\d*)(?:\.(\d*))?$'
+
+
+def amount_to_cents(amounts: pd.Series) -> np.ndarray:
+    """Round amounts half away from zero to integer cents (matches Postgres numeric rounding)"""
+    values = amounts.to_numpy(dtype=float)
+    # the inner round absorbs binary noise such as 1.005 * 100 == 100.49999999999999
+    cents = np.floor(np.round(np.abs(values) * 100, 6) + 0.5)
+    return (np.sign(values) * cents).astype(np.int64)
+
+
+def to_cents(amounts: pd.Series) -> pd.Series:
+    """Nullable Int64 cents for numeric amounts; NaN stays missing"""
+    values = pd.to_numeric(amounts, errors='coerce')
+    present = values.notna().to_numpy()
+    cents = pd.Series(pd.NA, index=amounts.index, dtype='Int64')
+    cents[present] = amount_to_cents(values[present])
+    return cents
+
+
+def parse_cents(amounts: pd.Series) -> pd.Series:
+    """Nullable Int64 cents parsed from cleaned decimal strings such as ``-1234.505``
+
+    The digits are split and combined as integers, so no value passes through a
+    binary float; a third decimal rounds half away from zero like amount_to_cents.
+    Strings that are not plain decimals (``1e3``) go through ``to_cents``;
+    anything unparseable is missing.
+    """
+    text = amounts.astype(str).str.strip()
+    parts = text.str.extract(_DECIMAL_AMOUNT)
+    whole, fraction = parts[1].fillna(''), parts[2].fillna('')
+    exact = (parts[1].notna() & ((whole != '') | (fraction != ''))).to_numpy()
+
+    fraction = fraction.where(exact, '').str.ljust(3, '0')
+    units = pd.to_numeric(whole.where(exact & (whole != ''), '0')).to_numpy(dtype=np.int64)
+    magnitude = (
+        units * CENTS_PER_UNIT
+        + pd.to_numeric(fraction.str[:2]).to_numpy(dtype=np.int64)
+        + (fraction.str[2] >= '5').to_numpy(dtype=np.int64)
+    )
+    cents = pd.Series(np.where(parts[0] == '-', -magnitude, magnitude), index=amounts.index, dtype='Int64')
+    cents[~exact] = to_cents(text[~exact])
+    return cents
+
+
+def cents_to_amount(cents: pd.Series) -> pd.Series:
+    """Major-unit float amounts for integer cents; missing cents become NaN"""
+    values = cents.to_numpy(dtype=float, na_value=np.nan)
+    return pd.Series(values / CENTS_PER_UNIT, index=cents.index)
+
+
+def cents_value(cents) -> float:
+    """One integer cents total as a major-unit float, e.g. for a JSON response"""
+    return int(cents) / CENTS_PER_UNIT
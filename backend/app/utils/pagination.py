@@ -0,0 +1,20 @@
+import base64
+import json
+from datetime import date
+from typing import Tuple
+
+
+def encode_cursor(user_id: str, day: date, transaction_id: str) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    payload = json.dumps([user_id, day.isoformat(), transaction_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, date, str]:
+    """(user_id, date, id) from a cursor made by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        user_id, day, transaction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(user_id), date.fromisoformat(day), str(transaction_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
@@ -0,0 +1,74 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+# Days per unit for relative periods such as "30d", "6w", "3m" and "1y"
+PERIOD_UNIT_DAYS = {'d': 1, 'w': 7, 'm': 30, 'y': 365}
+
+# Used when a period string is not recognised
+DEFAULT_PERIOD_DAYS = 30
+
+_RELATIVE_PERIOD = re.compile(r'^(\d+)([dwmy])$')
+
+
+def period_start(period: str, end_date: date) -> date:
+    """Start date for a period ending on ``end_date``
+
+    Understands ``Nd``, ``Nw``, ``Nm`` (30-day months), ``Ny`` (365-day years),
+    ``mtd`` and ``ytd``; anything else falls back to the last 30 days.
+    """
+    period = (period or '').strip().lower()
+    if period == 'mtd':
+        return end_date.replace(day=1)
+    if period == 'ytd':
+        return end_date.replace(month=1, day=1)
+
+    match = _RELATIVE_PERIOD.match(period)
+    if match:
+        return end_date - timedelta(days=int(match.group(1)) * PERIOD_UNIT_DAYS[match.group(2)])
+    return end_date - timedelta(days=DEFAULT_PERIOD_DAYS)
+
+
+def resolve_range(
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    today: Optional[date] = None
+) -> Tuple[date, date]:
+    """Inclusive (start, end) dates from explicit YYYY-MM-DD bounds, a period, or both
+
+    ``end`` defaults to today and ``start`` to ``period`` counted back from ``end``.
+    Raises ValueError for malformed dates or an inverted range.
+    """
+    end_date = _parse_date(end) if end else (today or datetime.now().date())
+    start_date = _parse_date(start) if start else period_start(period, end_date)
+    if start_date > end_date:
+        raise ValueError(f"start {start_date} is after end {end_date}")
+    return start_date, end_date
+
+
+def previous_range(start_date: date, end_date: date, period: Optional[str] = None) -> Tuple[date, date]:
+    """The comparable window before (start, end): same span of the previous month/year for mtd/ytd,
+    otherwise the equally long window immediately before"""
+    period = (period or '').strip().lower()
+    if period in ('mtd', 'ytd'):
+        shift = (lambda day: shift_months(day, -1)) if period == 'mtd' else (lambda day: shift_months(day, -12))
+        return shift(start_date), shift(end_date)
+
+    length = (end_date - start_date).days + 1
+    return start_date - timedelta(days=length), start_date - timedelta(days=1)
+
+
+def shift_months(day: date, months: int) -> date:
+    """Same day ``months`` away, clamped to the end of shorter months"""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    next_month = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    return date(year, month + 1, min(day.day, (next_month - timedelta(days=1)).day))
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
@@ -0,0 +1,39 @@
+from celery import Celery
+from .core.config import settings
+from .core.database import SessionLocal
+from .services.ingestion_jobs import run_ingestion_job
+from .services.partitioning import TransactionPartitionService
+
+# Start with: celery -A app.worker worker --loglevel=info
+# Periodic tasks need beat as well: celery -A app.worker beat --loglevel=info
+celery_app = Celery(
+    "finance_coach",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        "create-transaction-partitions": {
+            "task": "partitions.ensure_ahead",
+            "schedule": 24 * 60 * 60
+        }
+    }
+)
+
+
+@celery_app.task(name="ingestion.ingest_file")
+def ingest_file(job_id: str):
+    """Celery entry point for a queued ingestion job"""
+    return run_ingestion_job(job_id)
+
+
+@celery_app.task(name="partitions.ensure_ahead")
+def ensure_transaction_partitions():
+    """Create the coming months' transaction partitions before any row needs them"""
+    db = SessionLocal()
+    try:
+        return TransactionPartitionService(db).ensure_ahead()
+    finally:
+        db.close()
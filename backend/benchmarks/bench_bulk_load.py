@@ -0,0 +1,95 @@
+"""Throughput benchmark for the transaction bulk loaders
+
+Compares the Postgres COPY path against the batched INSERT ... ON CONFLICT
+fallback. Requires DATABASE_URL to point at a Postgres database that has
+been migrated to head.
+
+    cd backend
+    python -m benchmarks.bench_bulk_load --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+from app.core.database import SessionLocal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.bulk_loader import LOAD_COLUMNS, PostgresCopyLoader
+from app.services.lookup_service import LookupService
+from app.services.transaction_service import TransactionService, INSERT_BATCH_SIZE
+from app.utils.fingerprint import transaction_fingerprints
+from app.utils.money import DEFAULT_CURRENCY, amount_to_cents
+
+
+def make_rows(size: int, user_id: str, seed: int = 42) -> pd.DataFrame:
+    """Build rows shaped like TransactionService output, before their names are encoded to lookup ids"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, size), unit='D'),
+        'amount': np.round(rng.normal(-40, 120, size), 2),
+        'description': [f"MERCHANT {i} PURCHASE" for i in rng.integers(0, size, size)],
+    })
+    rows = pd.DataFrame({
+        'id': [str(uuid.uuid4()) for _ in range(size)],
+        'user_id': user_id,
+        'amount_cents': amount_to_cents(df['amount']),
+        'currency': DEFAULT_CURRENCY,
+        'amount': df['amount'],
+        'description': df['description'],
+        'category': 'other',
+        'merchant': '',
+        'account_type': '',
+        'date': df['date'].dt.date,
+        'fingerprint': transaction_fingerprints(df, user_id),
+    })
+    return rows.drop_duplicates(subset='fingerprint')
+
+
+def time_copy(db, rows: pd.DataFrame) -> float:
+    started = time.perf_counter()
+    PostgresCopyLoader(db).load(rows)
+    db.commit()
+    return time.perf_counter() - started
+
+
+def time_insert(db, rows: pd.DataFrame) -> float:
+    service = TransactionService(db)
+    records = rows[LOAD_COLUMNS].to_dict('records')
+    started = time.perf_counter()
+    for start in range(0, len(records), INSERT_BATCH_SIZE):
+        service._insert_ignoring_duplicates(records[start:start + INSERT_BATCH_SIZE])
+    db.commit()
+    return time.perf_counter() - started
+
+
+def run(sizes):
+    db = SessionLocal()
+    if not PostgresCopyLoader.is_supported(db):
+        raise SystemExit("COPY benchmark requires a Postgres DATABASE_URL using psycopg2")
+
+    user_id = f"bench-{uuid.uuid4()}"
+    db.add(User(id=user_id, email=f"{user_id}@bench.local", hashed_password="x"))
+    db.commit()
+
+    print(f"{'rows':>10} {'loader':>8} {'seconds':>9} {'rows/s':>12}")
+    try:
+        for size in sizes:
+            rows = LookupService(db).encode(make_rows(size, user_id))
+            for name, loader in (('copy', time_copy), ('insert', time_insert)):
+                elapsed = loader(db, rows)
+                print(f"{len(rows):>10} {name:>8} {elapsed:>9.2f} {len(rows) / elapsed:>12,.0f}")
+                db.query(Transaction).filter(Transaction.user_id == user_id).delete()
+                db.commit()
+    finally:
+        db.query(Transaction).filter(Transaction.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    run(parser.parse_args().sizes)
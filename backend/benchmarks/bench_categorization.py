@@ -0,0 +1,79 @@
+"""Benchmark the compiled keyword categorizer against the row-wise apply path
+
+Checks that both produce identical categories, then times them at several row
+counts. --extra-keywords pads every category with synthetic keywords to show
+how each path scales with the size of the keyword table.
+
+    cd backend
+    python -m benchmarks.bench_categorization --sizes 10000 100000 1000000 --extra-keywords 2000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from app.ml.keyword_categorizer import KeywordCategorizer
+from app.ml.transaction_analyzer import TransactionAnalyzer
+
+DESCRIPTION_WORDS = [
+    'uber', 'trip', 'shell gas', 'starbucks coffee', 'whole foods market', 'netflix.com',
+    'amazon mktp', 'cvs pharmacy', 'payroll deposit', 'state farm insurance', 'transfer',
+    'atm withdrawal', 'comcast internet', 'spotify', 'tuition payment', 'vanguard 401k'
+]
+
+
+def make_frame(size: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    first = rng.choice(DESCRIPTION_WORDS, size)
+    second = rng.choice(DESCRIPTION_WORDS, size)
+    store = rng.integers(0, 5000, size).astype(str)
+    return pd.DataFrame({
+        'description': np.char.add(np.char.add(np.char.add(first, ' '), second), np.char.add(' #', store)),
+        'merchant': rng.choice(['', 'Target', 'Lyft', 'Local Cafe'], size)
+    })
+
+
+def make_analyzer(extra_keywords: int) -> TransactionAnalyzer:
+    analyzer = TransactionAnalyzer()
+    if extra_keywords:
+        per_category = max(extra_keywords // len(analyzer.category_keywords), 1)
+        for index, keywords in enumerate(analyzer.category_keywords.values()):
+            keywords.extend(f"kw{index}x{n}merchant" for n in range(per_category))
+        analyzer.categorizer = KeywordCategorizer(analyzer.category_keywords)
+    return analyzer
+
+
+def run(sizes, extra_keywords: int, skip_apply_above: int):
+    analyzer = make_analyzer(extra_keywords)
+    keyword_count = sum(len(keywords) for keywords in analyzer.category_keywords.values())
+    print(f"keywords: {keyword_count}")
+    print(f"{'rows':>10} {'apply s':>9} {'compiled s':>11} {'speedup':>8}")
+
+    for size in sizes:
+        df = make_frame(size)
+
+        started = time.perf_counter()
+        compiled = analyzer.categorize_transactions(df.copy())['category']
+        compiled_seconds = time.perf_counter() - started
+
+        if size > skip_apply_above:
+            print(f"{size:>10} {'-':>9} {compiled_seconds:>11.3f} {'-':>8}")
+            continue
+
+        started = time.perf_counter()
+        reference = df.apply(analyzer._categorize_single_transaction, axis=1)
+        apply_seconds = time.perf_counter() - started
+
+        if not (reference == compiled).all():
+            raise SystemExit(f"Categorization mismatch at {size} rows")
+        print(f"{size:>10} {apply_seconds:>9.3f} {compiled_seconds:>11.3f} {apply_seconds / compiled_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--extra-keywords', type=int, default=0)
+    parser.add_argument('--skip-apply-above', type=int, default=1_000_000,
+                        help="only time the compiled path above this many rows")
+    args = parser.parse_args()
+    run(args.sizes, args.extra_keywords, args.skip_apply_above)
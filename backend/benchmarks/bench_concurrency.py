@@ -0,0 +1,195 @@
+"""Requests per second for the dashboard endpoint under concurrent clients, sync Session vs AsyncSession
+
+"sync" is the previous handler shape: an ``async def`` route calling AnalyticsService
+on a sync Session, which blocks the event loop for every query. "async" is the
+current route on AsyncSession. Each run gets a fresh single-worker uvicorn process
+with the analytics cache disabled, so every request reaches the database and a
+stalled sync run cannot spill into the next one. Requests that time out or fail
+are reported as errors.
+
+    cd backend
+    python -m benchmarks.bench_concurrency --concurrency 50 100 200 500 --duration 10
+
+Seeds a synthetic user into DATABASE_URL (removed afterwards) unless --user-id is given.
+"""
+import argparse
+import asyncio
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+import httpx
+
+# Measure the database path, not cache hits
+os.environ.setdefault("ANALYTICS_CACHE_BACKEND", "none")
+
+MODES = ('sync', 'async')
+
+
+def create_app():
+    """uvicorn --factory entry point serving both handler shapes side by side"""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.core.database import get_async_db, get_db
+    from app.services.analytics_services import AnalyticsService
+    from app.services.async_services import AsyncAnalyticsService
+
+    app = FastAPI()
+
+    @app.get("/sync/dashboard")
+    async def sync_dashboard(period: str = "90d", user_id: str = None, db: Session = Depends(get_db)):
+        return AnalyticsService(db).get_dashboard_data(period, user_id)
+
+    @app.get("/async/dashboard")
+    async def async_dashboard(period: str = "90d", user_id: str = None, db: AsyncSession = Depends(get_async_db)):
+        return await AsyncAnalyticsService(db).get_dashboard_data(period, user_id)
+
+    return app
+
+
+async def drive(url: str, concurrency: int, duration: float, timeout: float) -> Dict[str, float]:
+    """Run ``concurrency`` clients in closed loops against ``url`` for ``duration`` seconds"""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def client_loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies) or [float('nan')]
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p95_ms': ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0] * 1000,
+        'errors': errors
+    }
+
+
+def seed_user(rows: int, seed: int) -> str:
+    from app.core.database import SessionLocal
+    from app.models.user import User
+    from app.services.file_processor import FileProcessor
+    from app.services.transaction_service import TransactionService
+    from benchmarks.synthetic import generate_statement, write_statement
+
+    user_id = f"bench-{uuid.uuid4()}"
+    db = SessionLocal()
+    try:
+        db.add(User(id=user_id, email=f"{user_id}@bench.local", hashed_password="x"))
+        db.commit()
+        # generate_statement spreads rows over max(rows // 8, 30) days; end the span today
+        start = date.today() - timedelta(days=max(rows // 8, 30) - 1)
+        csv_text = io.StringIO()
+        write_statement(generate_statement(rows, seed=seed, start=start.isoformat()), csv_text, 'csv')
+        standardized = FileProcessor().process_csv(io.StringIO(csv_text.getvalue()))
+        TransactionService(db).bulk_create_transactions(standardized, user_id)
+    finally:
+        db.close()
+    return user_id
+
+
+def remove_user(user_id: str) -> None:
+    from app.core.database import SessionLocal
+    from app.models.anomaly import AnomalyBaseline, TransactionAnomaly
+    from app.models.daily_rollup import DailyUserCategoryRollup
+    from app.models.recurring import RecurringSeries
+    from app.models.transaction import Transaction
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        for model in (Transaction, DailyUserCategoryRollup, AnomalyBaseline, TransactionAnomaly, RecurringSeries):
+            db.query(model).filter(model.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(startup_timeout: float = 30) -> Iterator[str]:
+    """Start the benchmark app in its own uvicorn process and yield its base URL
+
+    A separate process keeps the load generator off the server's event loop and GIL.
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'benchmarks.bench_concurrency:create_app', '--factory',
+         '--port', str(port), '--workers', '1', '--log-level', 'critical'],
+        env=os.environ.copy()
+    )
+    try:
+        deadline = time.time() + startup_timeout
+        while True:
+            try:
+                httpx.get(f"{base_url}/docs", timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline or process.poll() is not None:
+                    raise RuntimeError("benchmark server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 100, 200, 500])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=10, help="per-request timeout in seconds")
+    parser.add_argument('--rows', type=int, default=20_000, help="synthetic transactions to seed")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--user-id', help="benchmark an existing user instead of seeding one")
+    args = parser.parse_args()
+
+    user_id = args.user_id or seed_user(args.rows, args.seed)
+    try:
+        print(f"{'mode':>6} {'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for concurrency in args.concurrency:
+            for mode in MODES:
+                with server() as base_url:
+                    url = f"{base_url}/{mode}/dashboard?user_id={user_id}"
+                    result = asyncio.run(drive(url, concurrency, args.duration, args.timeout))
+                print(
+                    f"{mode:>6} {concurrency:>8} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} "
+                    f"{result['p95_ms']:>9.1f} {result['errors']:>7}"
+                )
+    finally:
+        if not args.user_id:
+            remove_user(user_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare FileProcessor ingest time for the same statement as CSV, Parquet and Arrow IPC
+
+Each file is serialized to memory once; only parsing and standardization are timed.
+
+    cd backend
+    python -m benchmarks.bench_formats --sizes 100000 1000000
+"""
+import argparse
+import io
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.services.file_processor import FileProcessor
+
+
+def make_statement(size: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Transaction Date': (pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 1000, size), unit='D')).date,
+        'Description': rng.choice(['Coffee shop', 'Payroll', 'Grocery market', 'Uber trip', 'Rent'], size),
+        'Amount': np.round(rng.normal(-30, 200, size), 2),
+        'Account': rng.choice(['checking', 'credit'], size),
+    })
+
+
+def serialize(df: pd.DataFrame):
+    csv_buffer = io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    parquet_buffer = io.BytesIO()
+    pq.write_table(table, parquet_buffer)
+
+    arrow_buffer = io.BytesIO()
+    with pa.ipc.new_file(arrow_buffer, table.schema) as writer:
+        writer.write_table(table, max_chunksize=64 * 1024)
+
+    return {'csv': csv_buffer, 'parquet': parquet_buffer, 'arrow': arrow_buffer}
+
+
+def ingest(processor: FileProcessor, fmt: str, buffer: io.BytesIO) -> int:
+    buffer.seek(0)
+    if fmt == 'csv':
+        df = processor.process_csv(io.StringIO(buffer.getvalue().decode('utf-8')))
+    elif fmt == 'parquet':
+        df = processor.process_parquet(buffer)
+    else:
+        df = processor.process_arrow(buffer)
+    return len(df)
+
+
+def run(sizes, repeat: int):
+    processor = FileProcessor()
+    print(f"{'rows':>10} {'format':>8} {'bytes':>12} {'seconds':>9} {'vs csv':>7}")
+    for size in sizes:
+        buffers = serialize(make_statement(size))
+        timings = {}
+        for fmt, buffer in buffers.items():
+            # first call warms the layout cache, as a repeat upload from the same bank would
+            ingest(processor, fmt, buffer)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                rows = ingest(processor, fmt, buffer)
+            timings[fmt] = (time.perf_counter() - started) / repeat
+            assert rows == size, f"{fmt} produced {rows} rows, expected {size}"
+
+        for fmt, seconds in timings.items():
+            size_bytes = len(buffers[fmt].getvalue())
+            print(f"{size:>10} {fmt:>8} {size_bytes:>12,} {seconds:>9.3f} {timings['csv'] / seconds:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
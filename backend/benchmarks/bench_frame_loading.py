@@ -0,0 +1,120 @@
+"""Time and memory to turn one user's transactions into a DataFrame: ORM instances vs Core rows vs load_frame
+
+"orm" is the shape the analytics paths used to have: query(Transaction).all() and a
+list of per-row dicts into pd.DataFrame. "core_rows" selects only the needed columns
+but still builds the frame from Row tuples. "load_frame" is
+app.services.frame_loader: the same select, transposed batch by batch into typed
+NumPy columns (int64 cents, datetime64 dates, categorical categories).
+Each strategy runs on a fresh Session. Times are medians over --repeat runs. Peak
+allocation is measured with tracemalloc in a separate run, because tracing slows
+everything down. Frame bytes is the result's deep memory usage.
+
+    cd backend
+    python -m benchmarks.bench_frame_loading --rows 200000
+
+Seeds a synthetic user into DATABASE_URL (removed afterwards) unless --user-id is given.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import pandas as pd
+
+from benchmarks.bench_concurrency import remove_user, seed_user
+
+COLUMNS = ['amount_cents', 'category', 'date', 'description', 'merchant']
+
+
+def load_orm(db, user_id: str) -> pd.DataFrame:
+    from app.models.transaction import Transaction
+
+    transactions = db.query(Transaction).filter(Transaction.user_id == user_id).all()
+    return pd.DataFrame([{
+        'amount_cents': t.amount_cents,
+        'category': t.category,
+        'date': t.date,
+        'description': t.description,
+        'merchant': t.merchant
+    } for t in transactions])
+
+
+def load_core_rows(db, user_id: str) -> pd.DataFrame:
+    rows = db.execute(statement(user_id)).all()
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def load_typed(db, user_id: str) -> pd.DataFrame:
+    from app.services.frame_loader import load_frame
+
+    return load_frame(db, statement(user_id))
+
+
+STRATEGIES: Dict[str, Callable] = {
+    'orm': load_orm,
+    'core_rows': load_core_rows,
+    'load_frame': load_typed,
+}
+
+
+def statement(user_id: str):
+    from app.models.transaction import Transaction, transaction_select
+
+    return transaction_select(COLUMNS).where(Transaction.user_id == user_id)
+
+
+def measure(load: Callable, user_id: str, repeat: int) -> Dict[str, float]:
+    from app.core.database import SessionLocal
+
+    times = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            frame = load(db, user_id)
+            times.append(time.perf_counter() - started)
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        load(db, user_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+
+    return {
+        'rows': len(frame),
+        'median_ms': statistics.median(times) * 1000,
+        'peak_alloc_mb': peak / 2 ** 20,
+        'frame_mb': frame.memory_usage(deep=True).sum() / 2 ** 20
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000, help="synthetic transactions to seed")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--user-id', help="benchmark an existing user instead of seeding one")
+    args = parser.parse_args()
+
+    user_id = args.user_id or seed_user(args.rows, args.seed)
+    try:
+        print(f"{'strategy':>10} {'rows':>9} {'median ms':>10} {'peak alloc MB':>14} {'frame MB':>9}")
+        for name, load in STRATEGIES.items():
+            result = measure(load, user_id, args.repeat)
+            print(
+                f"{name:>10} {result['rows']:>9} {result['median_ms']:>10.1f} "
+                f"{result['peak_alloc_mb']:>14.1f} {result['frame_mb']:>9.1f}"
+            )
+    finally:
+        if not args.user_id:
+            remove_user(user_id)
+
+
+if __name__ == "__main__":
+    main()
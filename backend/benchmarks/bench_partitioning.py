@@ -0,0 +1,297 @@
+"""Plain vs monthly-partitioned transactions table at tens of millions of rows
+
+Loads the same synthetic rows (generated inside Postgres, 50M by default) into a
+plain copy of ``transactions`` and a copy partitioned by month on date the way
+migration 006 lays it out, optionally hash sub-partitioned by user. It then times
+the query shapes the services issue against both. Timings are EXPLAIN ANALYZE
+execution times, reported with the number of partitions each plan touched after
+pruning and the buffers it read. The last step drops the oldest month from each
+table: a DELETE on the plain table, a DROP TABLE of one partition on the other.
+
+    cd backend
+    python -m benchmarks.bench_partitioning --output partitioning.json
+    python -m benchmarks.bench_partitioning --rows 2000000 --hash-partitions 8
+
+DATABASE_URL must point at Postgres 12 or later. The bench_transactions_* tables
+are dropped afterwards unless --keep is given.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PLAIN = 'bench_transactions_plain'
+PARTITIONED = 'bench_transactions_partitioned'
+
+LOAD_COLUMNS = 'id, user_id, amount_cents, currency, description, category_id, merchant_id, account_type, date, fingerprint'
+
+# Distinct category and merchant ids; the copies have no foreign keys, so no lookup rows are needed
+CATEGORY_COUNT = 8
+MERCHANT_COUNT = 5003
+
+# Deterministic rows from a generate_series counter g, so both tables hold identical data
+GENERATED_ROWS = f"""
+    SELECT
+        'bench-' || g,
+        'user_' || (g * 7919 % :users),
+        CASE WHEN g % 10 = 0 THEN (1000 + g % 4000) * 100 ELSE -(g * 31 % 20000) END,
+        'USD',
+        'merchant ' || (g % {MERCHANT_COUNT}),
+        1 + g % {CATEGORY_COUNT},
+        1 + g % {MERCHANT_COUNT},
+        '',
+        CAST(:start AS date) + CAST(g * 104729 % :days AS integer),
+        md5(g::text) || md5((g + 1)::text)
+    FROM generate_series(CAST(:low AS bigint), CAST(:high AS bigint)) AS g
+"""
+
+# Index layout of the transactions table, created after loading
+INDEXES = [
+    ('uq_fingerprint', 'UNIQUE', 'user_id, date, fingerprint'),
+    ('idx_user_date', '', 'user_id, date'),
+    ('idx_user_category', '', 'user_id, category_id'),
+    ('idx_date_amount', '', 'date, amount_cents'),
+]
+
+# Statements the app runs against transactions: range totals, listing pages,
+# the ingest dedup probe and a rollup rebuild for one month
+QUERIES = {
+    'user_month_totals': (
+        "SELECT count(*), sum(amount_cents) FROM {table} "
+        "WHERE user_id = :user AND date >= :month_start AND date < :month_end"
+    ),
+    'user_listing_page': (
+        "SELECT * FROM {table} WHERE user_id = :user AND date >= :month_start "
+        "ORDER BY user_id, date, id LIMIT 100"
+    ),
+    'ingest_dedup_probe': (
+        "SELECT fingerprint FROM {table} "
+        "WHERE user_id = :user AND date >= :month_start AND date < :month_end"
+    ),
+    'recent_category_totals': (
+        "SELECT category_id, sum(amount_cents) FROM {table} WHERE date >= :recent GROUP BY category_id"
+    ),
+    'month_rollup_rebuild': (
+        "SELECT user_id, date, category_id, sum(amount_cents), count(*) FROM {table} "
+        "WHERE date >= :month_start AND date < :month_end GROUP BY 1, 2, 3"
+    ),
+}
+
+
+def month_starts(first: date, months: int) -> List[date]:
+    """First days of ``months`` consecutive months from ``first``'s month, plus the one after"""
+    starts = []
+    for offset in range(months + 1):
+        month_index = first.year * 12 + first.month - 1 + offset
+        starts.append(date(month_index // 12, month_index % 12 + 1, 1))
+    return starts
+
+
+def create_tables(conn: Connection, months: List[date], hash_partitions: int) -> None:
+    conn.execute(text(f"CREATE TABLE {PLAIN} (LIKE transactions INCLUDING DEFAULTS)"))
+    conn.execute(text(f"ALTER TABLE {PLAIN} ADD PRIMARY KEY (id)"))
+
+    conn.execute(text(f"CREATE TABLE {PARTITIONED} (LIKE transactions INCLUDING DEFAULTS) PARTITION BY RANGE (date)"))
+    primary_key = 'id, date, user_id' if hash_partitions else 'id, date'
+    conn.execute(text(f"ALTER TABLE {PARTITIONED} ADD PRIMARY KEY ({primary_key})"))
+    for start, end in zip(months, months[1:]):
+        partition = f"{PARTITIONED}_{start:%Y_%m}"
+        split = ' PARTITION BY HASH (user_id)' if hash_partitions else ''
+        conn.execute(text(
+            f"CREATE TABLE {partition} PARTITION OF {PARTITIONED} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}'){split}"
+        ))
+        for remainder in range(hash_partitions):
+            conn.execute(text(
+                f"CREATE TABLE {partition}_h{remainder} PARTITION OF {partition} "
+                f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})"
+            ))
+
+
+def load(conn: Connection, rows: int, users: int, start: date, days: int, batch_rows: int) -> Dict[str, float]:
+    """Generate rows into the plain table in batches, then copy them into the partitioned one"""
+    timings = {}
+    started = time.perf_counter()
+    for low in range(1, rows + 1, batch_rows):
+        high = min(low + batch_rows - 1, rows)
+        conn.execute(
+            text(f"INSERT INTO {PLAIN} ({LOAD_COLUMNS}) {GENERATED_ROWS}"),
+            {'users': users, 'start': start, 'days': days, 'low': low, 'high': high}
+        )
+        conn.commit()
+        print(f"generated {high:,} / {rows:,} rows", file=sys.stderr)
+    timings[PLAIN] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conn.execute(text(f"INSERT INTO {PARTITIONED} ({LOAD_COLUMNS}) SELECT {LOAD_COLUMNS} FROM {PLAIN}"))
+    conn.commit()
+    timings[PARTITIONED] = time.perf_counter() - started
+    return timings
+
+
+def build_indexes(conn: Connection) -> Dict[str, float]:
+    timings = {}
+    for table in (PLAIN, PARTITIONED):
+        started = time.perf_counter()
+        for suffix, unique, columns in INDEXES:
+            conn.execute(text(f"CREATE {unique} INDEX {table}_{suffix} ON {table} ({columns})"))
+        conn.commit()
+        timings[table] = time.perf_counter() - started
+        print(f"indexed {table}", file=sys.stderr)
+    return timings
+
+
+def sizes(conn: Connection) -> Dict[str, Dict[str, int]]:
+    """Total bytes per table and the largest single (user_id, date) index each maintains"""
+    # SUM over bigint sizes is numeric; cast back so the JSON output holds plain integers
+    leaf_total = (
+        "SELECT CAST(COALESCE(SUM(pg_total_relation_size(relid)), 0) AS bigint) "
+        "FROM pg_partition_tree(:relation) WHERE isleaf"
+    )
+    leaf_largest = "SELECT COALESCE(MAX(pg_relation_size(relid)), 0) FROM pg_partition_tree(:relation) WHERE isleaf"
+    return {
+        PLAIN: {
+            'total_bytes': conn.execute(text("SELECT pg_total_relation_size(:relation)"), {'relation': PLAIN}).scalar(),
+            'largest_user_date_index_bytes': conn.execute(
+                text("SELECT pg_relation_size(:relation)"), {'relation': f"{PLAIN}_idx_user_date"}
+            ).scalar()
+        },
+        PARTITIONED: {
+            'total_bytes': conn.execute(text(leaf_total), {'relation': PARTITIONED}).scalar(),
+            'largest_user_date_index_bytes': conn.execute(
+                text(leaf_largest), {'relation': f"{PARTITIONED}_idx_user_date"}
+            ).scalar()
+        }
+    }
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def explain(conn: Connection, sql: str, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Median execution time over ``repeat`` EXPLAIN ANALYZE runs, with partitions scanned and buffers"""
+    times = []
+    for _ in range(repeat):
+        document = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        if isinstance(document, str):
+            document = json.loads(document)
+        result = document[0]
+        times.append(result['Execution Time'])
+    plan = result['Plan']
+    relations = {node['Relation Name'] for node in plan_nodes(plan) if 'Relation Name' in node}
+    return {
+        'median_ms': statistics.median(times),
+        'relations_scanned': len(relations),
+        'shared_blocks': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0)
+    }
+
+
+def drop_oldest_month(conn: Connection, months: List[date]) -> Dict[str, float]:
+    """Retention: remove the first month from both tables"""
+    timings = {}
+    started = time.perf_counter()
+    conn.execute(text(f"DELETE FROM {PLAIN} WHERE date < :end"), {'end': months[1]})
+    conn.commit()
+    timings[PLAIN] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conn.execute(text(f"DROP TABLE {PARTITIONED}_{months[0]:%Y_%m}"))
+    conn.commit()
+    timings[PARTITIONED] = time.perf_counter() - started
+    return timings
+
+
+def drop_tables(conn: Connection) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {PLAIN}, {PARTITIONED}"))
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000_000)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--months', type=int, default=36, help="months of history the rows are spread over")
+    parser.add_argument('--hash-partitions', type=int, default=0, help="hash sub-partitions per month by user_id")
+    parser.add_argument('--batch-rows', type=int, default=5_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help="leave the benchmark tables in place")
+    parser.add_argument('--output', help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # Imported lazily: the database module connects at import time
+    from app.core.database import engine
+
+    if engine.dialect.name != 'postgresql':
+        parser.error("DATABASE_URL must point at Postgres")
+
+    today = date.today()
+    first_month = today.year * 12 + today.month - 1 - (args.months - 1)
+    months = month_starts(date(first_month // 12, first_month % 12 + 1, 1), args.months)
+    history_start, history_days = months[0], (min(months[-1], today + timedelta(days=1)) - months[0]).days
+    middle_month = months[len(months) // 2]
+    params = {
+        'user': 'user_42',
+        'month_start': middle_month,
+        'month_end': month_starts(middle_month, 1)[1],
+        'recent': today - timedelta(days=30)
+    }
+
+    with engine.connect() as conn:
+        drop_tables(conn)
+        try:
+            create_tables(conn, months, args.hash_partitions)
+            conn.commit()
+            load_seconds = load(conn, args.rows, args.users, history_start, history_days, args.batch_rows)
+            index_seconds = build_indexes(conn)
+            conn.execute(text(f"ANALYZE {PLAIN}"))
+            conn.execute(text(f"ANALYZE {PARTITIONED}"))
+            conn.commit()
+
+            queries = []
+            for name, sql in QUERIES.items():
+                for table in (PLAIN, PARTITIONED):
+                    result = explain(conn, sql.format(table=table), params, args.repeat)
+                    queries.append({'query': name, 'table': table, **result})
+                    print(
+                        f"{name:>24} {table:>32} {result['median_ms']:>10.2f} ms "
+                        f"{result['relations_scanned']:>4} relations {result['shared_blocks']:>9} blocks",
+                        file=sys.stderr
+                    )
+
+            report = {
+                'server_version': conn.execute(text("SHOW server_version")).scalar(),
+                'rows': args.rows,
+                'users': args.users,
+                'months': args.months,
+                'hash_partitions': args.hash_partitions,
+                'parameters': {key: str(value) for key, value in params.items()},
+                'load_seconds': load_seconds,
+                'index_seconds': index_seconds,
+                'sizes': sizes(conn),
+                'queries': queries,
+                'drop_oldest_month_seconds': drop_oldest_month(conn, months)
+            }
+        finally:
+            conn.rollback()
+            if not args.keep:
+                drop_tables(conn)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Ingestion benchmark suite
+
+Times process_csv, process_excel, process_json, categorize_transactions and
+bulk_create_transactions on seeded synthetic statements at several sizes and
+writes machine-readable results for regression tracking.
+
+    cd backend
+    python -m benchmarks.run_ingestion --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run_ingestion --skip-db          # parsing/categorization only
+
+bulk_create_transactions runs against DATABASE_URL and cleans up after itself.
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+import numpy as np
+import pandas as pd
+
+from app.ml.transaction_analyzer import TransactionAnalyzer
+from app.services.file_layout import layout_cache
+from app.services.file_processor import FileProcessor
+from benchmarks.synthetic import generate_statement, write_statement
+
+# Excel writing/reading is slow enough that large sizes only add noise
+EXCEL_MAX_ROWS = 100_000
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and mean wall time over ``repeat`` runs"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {'best_seconds': min(timings), 'mean_seconds': sum(timings) / len(timings)}
+
+
+def file_benchmarks(size: int, seed: int, repeat: int) -> List[Dict[str, object]]:
+    processor = FileProcessor()
+    statement = generate_statement(size, seed=seed)
+
+    csv_text = io.StringIO()
+    write_statement(statement, csv_text, 'csv')
+    json_text = io.StringIO()
+    write_statement(statement, json_text, 'json')
+
+    cases = {
+        'process_csv': lambda: processor.process_csv(io.StringIO(csv_text.getvalue())),
+        'process_json': lambda: processor.process_json(io.StringIO(json_text.getvalue())),
+    }
+    if size <= EXCEL_MAX_ROWS:
+        excel_bytes = io.BytesIO()
+        write_statement(statement, excel_bytes, 'xlsx')
+        cases['process_excel'] = lambda: processor.process_excel(io.BytesIO(excel_bytes.getvalue()))
+
+    results = []
+    for name, fn in cases.items():
+        layout_cache.clear()
+        cold = measure(fn, 1)['best_seconds']
+        results.append({'benchmark': name, 'rows': size, 'cold_seconds': cold, **measure(fn, repeat)})
+
+    analyzer = TransactionAnalyzer()
+    standardized = processor.process_csv(io.StringIO(csv_text.getvalue()))
+    results.append({
+        'benchmark': 'categorize_transactions',
+        'rows': size,
+        **measure(lambda: analyzer.categorize_transactions(standardized.copy()), repeat)
+    })
+    return results
+
+
+def database_benchmarks(sizes: List[int], seed: int) -> List[Dict[str, object]]:
+    # Imported lazily: the database module connects at import time
+    from app.core.database import SessionLocal
+    from app.models.daily_rollup import DailyUserCategoryRollup
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services.transaction_service import TransactionService
+
+    db = SessionLocal()
+    user_id = f"bench-{uuid.uuid4()}"
+    db.add(User(id=user_id, email=f"{user_id}@bench.local", hashed_password="x"))
+    db.commit()
+
+    processor = FileProcessor()
+    results = []
+    try:
+        for size in sizes:
+            csv_text = io.StringIO()
+            write_statement(generate_statement(size, seed=seed), csv_text, 'csv')
+            standardized = processor.process_csv(io.StringIO(csv_text.getvalue()))
+
+            service = TransactionService(db)
+            # fresh insert, then a full re-upload that is all duplicates
+            for label in ('bulk_create_transactions', 'bulk_create_transactions_duplicates'):
+                started = time.perf_counter()
+                result = service.bulk_create_transactions(standardized.copy(), user_id)
+                elapsed = time.perf_counter() - started
+                results.append({
+                    'benchmark': label,
+                    'rows': size,
+                    'best_seconds': elapsed,
+                    'mean_seconds': elapsed,
+                    'created': result['created'],
+                    'skipped': result['skipped'],
+                    'engine': db.get_bind().dialect.name
+                })
+            db.query(Transaction).filter(Transaction.user_id == user_id).delete()
+            db.query(DailyUserCategoryRollup).filter(DailyUserCategoryRollup.user_id == user_id).delete()
+            db.commit()
+    finally:
+        db.query(Transaction).filter(Transaction.user_id == user_id).delete()
+        db.query(DailyUserCategoryRollup).filter(DailyUserCategoryRollup.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+        db.close()
+    return results
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': commit,
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-db', action='store_true', help="skip bulk_create_transactions")
+    parser.add_argument('--output', help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(file_benchmarks(size, args.seed, args.repeat))
+        print(f"finished file benchmarks at {size} rows", file=sys.stderr)
+    if not args.skip_db:
+        results.extend(database_benchmarks(args.sizes, args.seed))
+
+    for result in results:
+        result['rows_per_second'] = result['rows'] / result['best_seconds'] if result['best_seconds'] else None
+
+    report = json.dumps({'environment': environment(), 'seed': args.seed, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
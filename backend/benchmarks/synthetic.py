@@ -0,0 +1,172 @@
+"""Seeded synthetic bank-statement generator
+
+Produces statements shaped like real bank exports: header names drawn from
+FileProcessor.column_mappings, messy amount formatting ($, thousands separators,
+parenthesised negatives, stray whitespace) and configurable date formats.
+The same seed always yields the same statement.
+
+    from benchmarks.synthetic import generate_statement, write_statement
+    df = generate_statement(10_000, seed=1)
+    write_statement(df, 'statement.csv')
+"""
+import io
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from app.services.file_processor import DATE_FORMATS, FileProcessor
+
+# (description, merchant, typical amount, spread) for everyday spending
+SPENDING_PROFILES = [
+    ('STARBUCKS COFFEE #{n}', 'Starbucks', -5.75, 2.0),
+    ('WHOLE FOODS MARKET {n}', 'Whole Foods', -82.40, 35.0),
+    ('SHELL GAS STATION {n}', 'Shell', -48.10, 15.0),
+    ('UBER TRIP {n}', 'Uber', -21.30, 9.0),
+    ('AMAZON MKTP US*{n}', 'Amazon', -36.99, 30.0),
+    ('CVS PHARMACY {n}', 'CVS', -18.25, 10.0),
+    ('CHIPOTLE RESTAURANT {n}', 'Chipotle', -13.45, 4.0),
+    ('TARGET STORE {n}', 'Target', -64.20, 40.0),
+    ('AMC MOVIE THEATER {n}', 'AMC', -27.00, 8.0),
+    ('ATM WITHDRAWAL {n}', '', -100.00, 60.0),
+]
+
+# (description, merchant, amount, interval in days) for recurring items
+RECURRING_PROFILES = [
+    ('PAYROLL DEPOSIT ACME CORP', 'Acme Corp', 2450.00, 14),
+    ('RENT PAYMENT', 'Property Mgmt', -1650.00, 30),
+    ('NETFLIX.COM', 'Netflix', -15.49, 30),
+    ('SPOTIFY USA', 'Spotify', -10.99, 30),
+    ('COMCAST INTERNET', 'Comcast', -79.99, 30),
+    ('STATE FARM INSURANCE PREMIUM', 'State Farm', -132.00, 30),
+]
+
+ACCOUNTS = ['Checking', 'Credit Card', 'Savings']
+
+
+def header_variants() -> Dict[str, List[str]]:
+    """Source header names per standardized field, from FileProcessor.column_mappings"""
+    variants = defaultdict(list)
+    for source, target in FileProcessor().column_mappings.items():
+        variants[target].append(source)
+    return dict(variants)
+
+
+def generate_statement(
+    rows: int,
+    seed: int = 0,
+    start: str = '2023-01-01',
+    date_format: Optional[str] = None,
+    mixed_date_share: float = 0.0,
+    messy_amounts: bool = True,
+    include_optional: bool = True
+) -> pd.DataFrame:
+    """Generate a statement of ``rows`` transactions with bank-export style headers and values
+
+    ``date_format`` defaults to one drawn from DATE_FORMATS by the seed;
+    ``mixed_date_share`` renders that fraction of rows in a different format.
+    All values are strings, as a CSV reader would see them.
+    """
+    rng = np.random.default_rng(seed)
+    start_date = pd.Timestamp(start)
+
+    # Recurring items first, then random spending fills the rest
+    recurring_rows = []
+    span_days = max(rows // 8, 30)
+    for description, merchant, amount, interval in RECURRING_PROFILES:
+        for day in range(int(rng.integers(0, interval)), span_days, interval):
+            recurring_rows.append((day, description, merchant, amount + rng.normal(0, abs(amount) * 0.002)))
+    recurring_rows = recurring_rows[:rows // 4]
+
+    spending = rows - len(recurring_rows)
+    profile_index = rng.integers(0, len(SPENDING_PROFILES), spending)
+    store_numbers = rng.integers(100, 9999, spending)
+    days = np.concatenate([
+        np.array([row[0] for row in recurring_rows], dtype=int),
+        rng.integers(0, span_days, spending)
+    ])
+    descriptions = [row[1] for row in recurring_rows] + [
+        SPENDING_PROFILES[i][0].format(n=n) for i, n in zip(profile_index, store_numbers)
+    ]
+    merchants = [row[2] for row in recurring_rows] + [SPENDING_PROFILES[i][1] for i in profile_index]
+    amounts = np.concatenate([
+        np.array([row[3] for row in recurring_rows], dtype=float),
+        # spending stays a debit however wide the noise
+        np.minimum(
+            np.array([SPENDING_PROFILES[i][2] for i in profile_index])
+            + rng.normal(0, 1, spending) * np.array([SPENDING_PROFILES[i][3] for i in profile_index]),
+            -0.01
+        )
+    ])
+    # a handful of unusually large purchases
+    outliers = rng.random(rows) < 0.003
+    amounts[outliers] *= rng.uniform(8, 20, outliers.sum())
+    amounts = np.round(amounts, 2)
+
+    order = np.argsort(days, kind='stable')
+    dates = start_date + pd.to_timedelta(days[order], unit='D')
+
+    date_format = date_format or DATE_FORMATS[int(rng.integers(0, len(DATE_FORMATS)))]
+    rendered_dates = pd.Series(dates.strftime(date_format))
+    if mixed_date_share > 0:
+        mixed = rng.random(rows) < mixed_date_share
+        other_format = next(fmt for fmt in DATE_FORMATS if fmt != date_format)
+        rendered_dates[mixed] = pd.Series(dates.strftime(other_format))[mixed]
+
+    variants = header_variants()
+
+    def pick(field: str) -> str:
+        options = variants[field]
+        return options[int(rng.integers(0, len(options)))]
+
+    columns = {
+        pick('date'): rendered_dates.to_numpy(),
+        pick('description'): np.array(descriptions, dtype=object)[order],
+        pick('amount'): render_amounts(amounts[order], rng) if messy_amounts else amounts[order].astype(str),
+    }
+    if include_optional:
+        columns[pick('merchant')] = np.array(merchants, dtype=object)[order]
+        columns[pick('account_type')] = rng.choice(ACCOUNTS, rows)
+    return pd.DataFrame(columns)
+
+
+def render_amounts(amounts: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Format amounts the inconsistent ways bank exports do"""
+    plain = np.char.mod('%.2f', amounts)
+    dollars = np.char.mod('$%s', np.array([f"{value:,.2f}" for value in amounts]))
+    parenthesised = np.char.mod('(%.2f)', np.abs(amounts))
+    padded = np.char.mod(' %.2f ', amounts)
+
+    style = rng.integers(0, 4, len(amounts))
+    rendered = np.where(style == 1, dollars, plain)
+    rendered = np.where((style == 2) & (amounts < 0), parenthesised, rendered)
+    rendered = np.where(style == 3, padded, rendered)
+    return rendered.astype(object)
+
+
+def write_statement(
+    df: pd.DataFrame,
+    target: Union[str, io.IOBase],
+    fmt: str = None,
+    json_shape: str = 'transactions'
+) -> None:
+    """Write a generated statement as CSV, XLSX or JSON (``array``, ``transactions`` or ``data`` shape)"""
+    fmt = fmt or str(target).rsplit('.', 1)[-1]
+    if fmt == 'csv':
+        df.to_csv(target, index=False)
+    elif fmt == 'xlsx':
+        df.to_excel(target, index=False)
+    elif fmt == 'json':
+        records = df.to_dict('records')
+        document = records if json_shape == 'array' else {json_shape: records}
+        payload = json.dumps(document)
+        if isinstance(target, str):
+            with open(target, 'w', encoding='utf-8') as handle:
+                handle.write(payload)
+        elif isinstance(target, io.BytesIO):
+            target.write(payload.encode('utf-8'))
+        else:
+            target.write(payload)
+    else:
+        raise ValueError(f"Unsupported statement format: {fmt}")
@@ -0,0 +1,35 @@
+"""Create monthly transaction partitions ahead of time (Postgres, after migration 006)
+
+The Celery beat schedule runs this daily; use it from cron when beat is not running.
+
+    cd backend
+    python -m scripts.ensure_partitions                  # TRANSACTION_PARTITION_MONTHS_AHEAD
+    python -m scripts.ensure_partitions --months-ahead 12
+"""
+import argparse
+import logging
+
+from app.core.database import SessionLocal
+from app.services.partitioning import TransactionPartitionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--months-ahead', type=int, help="months after the current one to cover")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        service = TransactionPartitionService(db)
+        if not service.is_partitioned():
+            print("transactions is not partitioned; nothing to do")
+            return
+        created = service.ensure_ahead(args.months_ahead)
+    finally:
+        db.close()
+    print(f"Created {created} transaction partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Forecast daily spending for every user from the daily rollup
+
+Runs the predictions endpoint's model over the whole user base in chunks, e.g.
+nightly, and writes one CSV row per user and forecast day (amounts in cents,
+with the prediction interval bounds).
+
+    cd backend
+    python -m scripts.forecast_spending --output forecasts.csv               # every user
+    python -m scripts.forecast_spending --output forecasts.csv --user-id u123  # one user
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.services.forecast_service import FORECAST_CHUNK_USERS, ForecastService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', required=True, help="CSV file to write")
+    parser.add_argument('--horizon', type=int, default=30, help="days to forecast")
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today(), help="last day of history (YYYY-MM-DD)")
+    parser.add_argument('--user-id', help="forecast only this user")
+    parser.add_argument('--chunk-users', type=int, default=FORECAST_CHUNK_USERS, help="users per forecast batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        forecasts = ForecastService(db).forecast_all(args.end, args.horizon, args.user_id, args.chunk_users)
+    finally:
+        db.close()
+    forecasts.to_csv(args.output, index=False)
+    print(f"Wrote {len(forecasts)} forecast rows for {forecasts['user_id'].nunique()} users to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Detect recurring transaction series from full history
+
+Ingest only folds the rows it inserts into the stored series; use this after
+migration 008, after bulk edits made outside TransactionService, or to apply
+changed cadence settings.
+
+    cd backend
+    python -m scripts.rebuild_recurring                 # every user
+    python -m scripts.rebuild_recurring --user-id u123  # one user
+"""
+import argparse
+import logging
+
+from app.core.database import SessionLocal
+from app.services.recurring_service import RecurringService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', help="rebuild only this user's series")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        detected = RecurringService(db).rebuild(args.user_id)
+    finally:
+        db.close()
+    print(f"Detected {detected} recurring series")
+
+
+if __name__ == "__main__":
+    main()
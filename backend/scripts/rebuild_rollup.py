@@ -0,0 +1,31 @@
+"""Rebuild daily_user_category_rollup from the transactions table
+
+Use after bulk edits made outside TransactionService, or to verify drift.
+
+    cd backend
+    python -m scripts.rebuild_rollup                 # every user
+    python -m scripts.rebuild_rollup --user-id u123  # one user
+"""
+import argparse
+import logging
+
+from app.core.database import SessionLocal
+from app.services.rollup_service import RollupService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', help="rebuild only this user's rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        rows = RollupService(db).rebuild(args.user_id)
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} rollup rows")
+
+
+if __name__ == "__main__":
+    main()
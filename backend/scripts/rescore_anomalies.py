@@ -0,0 +1,32 @@
+"""Rebuild anomaly baselines and re-score recent transactions
+
+Ingest only scores the rows it inserts; use this after migration 007, after
+bulk edits made outside TransactionService, or to apply changed thresholds.
+
+    cd backend
+    python -m scripts.rescore_anomalies                 # every user
+    python -m scripts.rescore_anomalies --user-id u123  # one user
+"""
+import argparse
+import logging
+
+from app.core.database import SessionLocal
+from app.services.anomaly_service import AnomalyService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', help="re-score only this user's transactions")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        stored = AnomalyService(db).rescore(args.user_id)
+    finally:
+        db.close()
+    print(f"Stored {stored} anomalies")
+
+
+if __name__ == "__main__":
+    main()
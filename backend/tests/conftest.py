@@ -0,0 +1,102 @@
+"""Shared fixtures: a throwaway SQLite database and, when configured, a Postgres one
+
+The app's engine connects when ``app.core.database`` is imported, so DATABASE_URL
+is pointed at a temporary SQLite file, with uploads spooled next to it, before
+anything from ``app`` is imported.
+Postgres-only tests use TEST_POSTGRES_URL and are skipped when it is unset.
+"""
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='finance-tests-')
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DIR}/test.db")
+os.environ.setdefault("UPLOAD_SPOOL_DIR", os.path.join(TEST_DIR, "uploads"))
+os.environ.setdefault("ANALYTICS_CACHE_BACKEND", "memory")
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.cache import analytics_cache
+from app.core.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.services.columnar_cache import columnar_cache
+from app.services.file_layout import layout_cache
+from app.services.lookup_service import lookup_ids
+from app.services.prefix_index import prefix_indexes
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    """Every test starts with empty in-process caches and a per-process (unshared) version store"""
+    for cache in (analytics_cache.backend, columnar_cache, layout_cache, lookup_ids, prefix_indexes):
+        cache.clear()
+    analytics_cache.reset_stats()
+    yield
+    analytics_cache.backend.shared = False
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def users(db):
+    """Users u1 and u2; transactions reference users, which Postgres enforces"""
+    db.add_all([User(id=user_id, email=f'{user_id}@example.com', hashed_password='x') for user_id in ('u1', 'u2')])
+    db.commit()
+
+
+@pytest.fixture
+def shared_versions():
+    """Treat the memory backend's versions as shared, so prefix indexes are cached"""
+    analytics_cache.backend.shared = True
+
+
+@pytest.fixture
+def pg():
+    """Connection to TEST_POSTGRES_URL inside a transaction that is rolled back afterwards"""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pg_engine = create_engine(url)
+    with pg_engine.connect() as conn:
+        transaction = conn.begin()
+        conn.execute(text("CREATE SCHEMA finance_tests"))
+        conn.execute(text("SET LOCAL search_path TO finance_tests"))
+        try:
+            yield conn
+        finally:
+            transaction.rollback()
+    pg_engine.dispose()
+
+
+@pytest.fixture
+def pg_db(pg):
+    """Session on the ``pg`` connection with every table created in its throwaway schema
+
+    Commits made by the code under test only release savepoints, so ``pg`` still rolls everything back.
+    """
+    Base.metadata.create_all(pg)
+    session = Session(bind=pg, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
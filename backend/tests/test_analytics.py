@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.cache import analytics_cache
+from app.models.lookup import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.analytics_services import AnalyticsService
+from app.services.lookup_service import LookupService
+from app.services.rollup_service import RollupService
+from app.services.transaction_service import TransactionService
+
+USER = 'u1'
+CATEGORIES = ['Food & Dining', 'Transportation', 'Bills & Utilities', '', None]
+
+
+def add_transactions(session, rows: int = 400, seed: int = 3):
+    """Income and spending over the last 120 days, including uncategorized rows"""
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    category_ids = LookupService(session).ids(Category, [name for name in CATEGORIES if name is not None])
+    session.add_all([
+        Transaction(
+            id=f't{row}',
+            user_id=USER,
+            amount_cents=int(rng.integers(100, 50000)) * (1 if row % 9 == 0 else -1),
+            description=f'row {row}',
+            category_id=category_ids.get(CATEGORIES[row % len(CATEGORIES)]),
+            fingerprint=f'f{row}',
+            date=today - timedelta(days=int(rng.integers(0, 120)))
+        )
+        for row in range(rows)
+    ])
+    session.commit()
+    # Rows added through the ORM bypass ingestion, so the rollup is built from them
+    RollupService(session).rebuild(USER)
+
+
+def reference_dashboard(session, period: str) -> dict:
+    """The dashboard computed in pandas from every transaction in the period, as it used to be"""
+    end_date = date.today()
+    start_date = AnalyticsService(session)._get_start_date(period, end_date)
+    transactions = session.query(Transaction).filter(Transaction.date >= start_date, Transaction.date <= end_date).all()
+    df = pd.DataFrame([{'amount': t.amount, 'category': t.category or 'Other', 'date': t.date} for t in transactions])
+
+    income = df[df['amount'] > 0]['amount'].sum()
+    expenses = abs(df[df['amount'] < 0]['amount'].sum())
+    multiplier = 30 / (end_date - start_date).days
+    spending = df[df['amount'] < 0]
+    return {
+        'totalBalance': income - expenses,
+        'monthlyIncome': income * multiplier,
+        'monthlyExpenses': expenses * multiplier,
+        'savingsRate': (income - expenses) / income * 100,
+        'spendingTrend': [
+            {'date': str(day), 'amount': amount} for day, amount in spending.groupby('date')['amount'].sum().abs().items()
+        ],
+        'categoryBreakdown': [
+            {'name': name, 'value': value} for name, value in spending.groupby('category')['amount'].sum().abs().items()
+        ],
+        'totalTransactions': len(transactions),
+        'period': period
+    }
+
+
+def assert_dashboards_match(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, list):
+            assert len(actual[key]) == len(value)
+            for got, want in zip(actual[key], value):
+                assert got == pytest.approx(want)
+        else:
+            assert actual[key] == pytest.approx(value)
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def session(request):
+    if request.param == 'sqlite':
+        session = request.getfixturevalue('db')
+    else:
+        session = request.getfixturevalue('pg_db')
+    session.add(User(id=USER, email=f'{USER}@example.com', hashed_password='x'))
+    session.commit()
+    return session
+
+
+@pytest.mark.parametrize('period', ['7d', '30d', '90d'])
+def test_dashboard_matches_the_dataframe_computation(session, period):
+    add_transactions(session)
+    assert_dashboards_match(AnalyticsService(session).get_dashboard_data(period), reference_dashboard(session, period))
+
+
+def test_dashboard_without_transactions_is_empty(session):
+    assert AnalyticsService(session).get_dashboard_data('30d')['totalTransactions'] == 0
+
+
+def test_bundle_sections_match_the_individual_endpoints(session):
+    add_transactions(session)
+    service = AnalyticsService(session)
+    bundle = service.get_bundle('7d', '90d', '30d', USER)
+
+    assert_dashboards_match(bundle['dashboard'], service.get_dashboard_data('7d', USER))
+    assert bundle['spendingTrends'] == service.get_spending_trends('90d', user_id=USER)
+    assert bundle['insights'] == service.get_insights(USER)
+    assert bundle['summary'] == TransactionService(session).get_summary('30d', USER)
+
+
+@pytest.mark.usefixtures('users')
+def test_cached_dashboard_follows_ingest_and_delete(db):
+    def upload(description: str, amount: float):
+        row = pd.DataFrame({'date': [str(date.today())], 'description': [description], 'amount': [amount]})
+        TransactionService(db).bulk_create_transactions(row, USER)
+
+    def dashboards():
+        return [AnalyticsService(db).get_dashboard_data('30d', user_id) for user_id in (USER, None)]
+
+    upload('Salary', 1000.0)
+    assert [d['totalBalance'] for d in dashboards()] == [1000.0, 1000.0]
+    assert [d['totalBalance'] for d in dashboards()] == [1000.0, 1000.0]
+    assert analytics_cache.stats()['endpoints']['dashboard'] == {'hits': 2, 'misses': 2, 'errors': 0}
+
+    # Another user's upload leaves u1's entry valid but not the all-users one
+    row = pd.DataFrame({'date': [str(date.today())], 'description': ['Coffee'], 'amount': [-4.0]})
+    TransactionService(db).bulk_create_transactions(row, 'u2')
+    assert [d['totalBalance'] for d in dashboards()] == [1000.0, 996.0]
+
+    upload('Rent', -600.0)
+    assert [d['totalBalance'] for d in dashboards()] == [400.0, 396.0]
+
+    rent = db.query(Transaction.id).filter(Transaction.description == 'Rent').scalar()
+    TransactionService(db).delete_transactions([rent], USER)
+    assert [d['totalBalance'] for d in dashboards()] == [1000.0, 996.0]
+
+    # A re-upload that creates nothing keeps the cached results
+    stats = analytics_cache.stats()['endpoints']['dashboard']
+    upload('Salary', 1000.0)
+    dashboards()
+    assert analytics_cache.stats()['endpoints']['dashboard']['hits'] == stats['hits'] + 2
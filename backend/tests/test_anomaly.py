@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.anomaly_detector import ANOMALY_THRESHOLD, RobustAnomalyDetector
+from app.models.anomaly import TransactionAnomaly
+from app.models.transaction import Transaction
+from app.services.analytics_services import AnalyticsService
+from app.services.anomaly_service import AnomalyService
+from app.services.transaction_service import TransactionService
+
+
+def history(days: int = 150, seed: int = 5) -> pd.DataFrame:
+    """Daily coffee around $4.50, a fixed $15.99 subscription and a monthly salary"""
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    rows = []
+    for day in range(1, days + 1):
+        rows.append({'date': today - timedelta(days=day), 'description': 'Blue Bottle Coffee #1042',
+                     'amount': -round(float(rng.normal(4.5, 0.4)), 2), 'category': 'Food & Dining'})
+        if day % 7 == 0:
+            rows.append({'date': today - timedelta(days=day), 'description': 'Streamflix subscription',
+                         'amount': -15.99, 'category': 'Entertainment'})
+        if day % 30 == 0:
+            rows.append({'date': today - timedelta(days=day), 'description': 'ACME payroll',
+                         'amount': 5200.0, 'category': 'Income'})
+    return pd.DataFrame(rows)
+
+
+def scores(rows: list) -> pd.Series:
+    detector = RobustAnomalyDetector()
+    return detector.score(pd.DataFrame(rows), detector.baselines(history()))['score']
+
+
+def test_each_merchant_and_flow_has_its_own_baseline():
+    today = date.today()
+    scored = scores([
+        {'date': today, 'description': 'Blue Bottle Coffee #2211', 'amount': -48.0, 'category': 'Food & Dining'},
+        {'date': today, 'description': 'Blue Bottle Coffee #2212', 'amount': -4.8, 'category': 'Food & Dining'},
+        {'date': today, 'description': 'ACME payroll', 'amount': 5200.0, 'category': 'Income'},
+    ])
+    # The salary credits do not widen the spread coffee is judged against
+    assert scored[0] > 20
+    assert scored[1] < ANOMALY_THRESHOLD
+    assert scored[2] == pytest.approx(0)
+
+
+def test_fixed_prices_need_more_than_cents_to_flag():
+    today = date.today()
+    scored = scores([
+        {'date': today, 'description': 'Streamflix subscription', 'amount': -16.49, 'category': 'Entertainment'},
+        {'date': today, 'description': 'Streamflix subscription', 'amount': -31.98, 'category': 'Entertainment'},
+    ])
+    assert scored[0] < ANOMALY_THRESHOLD <= scored[1]
+
+
+def test_unknown_merchants_fall_back_to_the_category_baseline():
+    detector = RobustAnomalyDetector()
+    baselines = detector.baselines(history())
+    scored = detector.score(pd.DataFrame([
+        {'date': date.today(), 'description': 'Corner cafe', 'amount': -60.0, 'category': 'Food & Dining'},
+        {'date': date.today(), 'description': 'Hardware store', 'amount': -60.0, 'category': 'Shopping'},
+    ]), baselines)
+    assert scored.loc[0, 'baseline_scope'] == 'category'
+    assert scored.loc[0, 'score'] >= ANOMALY_THRESHOLD
+    # No trusted baseline at all: left unscored
+    assert np.isnan(scored.loc[1, 'score'])
+
+
+@pytest.mark.usefixtures('users')
+def test_ingest_stores_anomalies_of_new_rows_until_they_are_deleted(db):
+    TransactionService(db).bulk_create_transactions(history().drop(columns='category'), 'u1')
+    assert db.query(TransactionAnomaly).count() == 0
+
+    upload = pd.DataFrame({
+        'date': [str(date.today())] * 2,
+        'description': ['Blue Bottle Coffee #3001', 'Blue Bottle Coffee #3002'],
+        'amount': [-95.0, -4.6]
+    })
+    TransactionService(db).bulk_create_transactions(upload, 'u1')
+
+    report = AnalyticsService(db).get_anomalies('7d', user_id='u1')
+    assert [row['description'] for row in report['anomalies']] == ['Blue Bottle Coffee #3001']
+    assert report['anomalies'][0]['baseline']['scope'] == 'merchant'
+    assert AnalyticsService(db).get_anomalies('7d', user_id='u2')['anomalies'] == []
+
+    spike = db.query(Transaction.id).filter(Transaction.description == 'Blue Bottle Coffee #3001').scalar()
+    TransactionService(db).delete_transactions([spike], 'u1')
+    assert db.query(TransactionAnomaly).count() == 0
+    assert AnalyticsService(db).get_anomalies('7d', user_id='u1')['anomalies'] == []
+
+
+@pytest.mark.usefixtures('users')
+def test_rescore_matches_scoring_at_ingest(db):
+    TransactionService(db).bulk_create_transactions(history().drop(columns='category'), 'u1')
+    spike = pd.DataFrame({'date': [str(date.today())], 'description': ['Blue Bottle Coffee'], 'amount': [-95.0]})
+    TransactionService(db).bulk_create_transactions(spike, 'u1')
+    stored = {row.transaction_id for row in db.query(TransactionAnomaly)}
+    assert len(stored) == 1
+
+    assert AnomalyService(db).rescore('u1') == len(stored)
+    assert {row.transaction_id for row in db.query(TransactionAnomaly)} == stored
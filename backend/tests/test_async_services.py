@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.api.analytics import router as analytics_router
+from app.api.transactions import router as transactions_router
+from app.core.cache import analytics_cache
+from app.core.config import settings
+from app.models.transaction import Transaction
+from app.services.analytics_services import AnalyticsService
+from app.services.async_services import EXPORT_MEDIA_TYPES
+from app.services.transaction_service import TransactionService
+
+from .test_analytics import USER, add_transactions
+
+# Route, query parameters, and the same call on the sync service
+ANALYTICS_ENDPOINTS = [
+    ('dashboard', {}, lambda service: service.get_dashboard_data('30d', USER)),
+    ('spending-trends', {}, lambda service: service.get_spending_trends('90d', user_id=USER)),
+    ('insights', {}, lambda service: service.get_insights(USER)),
+    ('bundle', {}, lambda service: service.get_bundle(user_id=USER)),
+    ('range', {'period': '45d'}, lambda service: service.get_range_summary('45d', user_id=USER)),
+    ('compare', {}, lambda service: service.compare_periods(user_id=USER)),
+]
+
+
+@pytest.fixture(params=[True, False], ids=['async', 'threadpool'])
+def client(request, db, users, monkeypatch):
+    """The analytics and transaction routes on the async driver, or on the sync fallback"""
+    monkeypatch.setattr(settings, 'ASYNC_DB_ENABLED', request.param)
+    add_transactions(db)
+    app = FastAPI()
+    app.include_router(analytics_router, prefix='/api/analytics')
+    app.include_router(transactions_router, prefix='/api/transactions')
+    return TestClient(app)
+
+
+def test_read_endpoints_match_the_sync_services(client, db):
+    responses = []
+    for route, params, _ in ANALYTICS_ENDPOINTS:
+        response = client.get(f'/api/analytics/{route}', params={'user_id': USER, **params})
+        assert response.status_code == 200, route
+        responses.append(response.json())
+    summary = client.get('/api/transactions/summary', params={'period': '45d', 'user_id': USER}).json()
+    categories = client.get('/api/transactions/categories').json()
+
+    # Recomputed without the cache entries the requests just stored
+    analytics_cache.backend.clear()
+    service = AnalyticsService(db)
+    for response, (route, _, call) in zip(responses, ANALYTICS_ENDPOINTS):
+        assert response == jsonable_encoder(call(service)), route
+    assert summary == jsonable_encoder(TransactionService(db).get_summary('45d', USER))
+    assert sorted(categories) == sorted(TransactionService(db).get_categories())
+
+
+def test_list_and_delete_transactions(client, db):
+    listed = client.get('/api/transactions/', params={'limit': 5, 'category': 'Transportation'}).json()
+    assert len(listed) == 5
+    assert {row['category'] for row in listed} == {'Transportation'}
+
+    deleted = listed[0]['id']
+    assert client.delete(f'/api/transactions/{deleted}', params={'user_id': USER}).json() == {'deleted': deleted}
+    assert client.delete(f'/api/transactions/{deleted}', params={'user_id': USER}).status_code == 404
+    db.expire_all()
+    assert db.get(Transaction, deleted) is None
+
+
+def test_cursor_pages_cover_the_listing_once(client):
+    params = {'limit': 70, 'user_id': USER}
+    ids = []
+    while True:
+        response = client.get('/api/transactions/', params=params)
+        ids += [row['id'] for row in response.json()]
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+
+    assert len(ids) == len(set(ids)) == 400
+    # Offset pages follow the same stable order
+    assert [row['id'] for row in client.get('/api/transactions/', params={'skip': 140, 'limit': 70}).json()] == ids[140:210]
+    assert client.get('/api/transactions/', params={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_export_streams_every_filtered_row(client, fmt):
+    response = client.get('/api/transactions/export', params={'format': fmt, 'category': 'Transportation'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith(EXPORT_MEDIA_TYPES[fmt])
+
+    if fmt == 'csv':
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    else:
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 80
+    assert {row['category'] for row in rows} == {'Transportation'}
+    assert client.get('/api/transactions/export', params={'format': 'xml'}).status_code == 400
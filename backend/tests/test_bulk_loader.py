@@ -0,0 +1,44 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.bulk_loader import PostgresCopyLoader
+from app.services.transaction_service import TransactionService
+
+# Values CSV quoting has to carry through COPY unchanged
+DESCRIPTIONS = ['Coffee, large', 'He said "hi"', 'line\nbreak', 'NULL', '  padded  ', '\\N']
+
+
+def awkward_rows() -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': [date(2026, 2, day + 1) for day in range(len(DESCRIPTIONS))],
+        'amount': [-1.5 * (day + 1) for day in range(len(DESCRIPTIONS))],
+        'description': DESCRIPTIONS,
+        'merchant': ['', 'Shop', '', 'Shop', '', ''],
+        'category': ['Food'] * len(DESCRIPTIONS)
+    })
+
+
+def test_copy_is_only_used_on_postgres_with_psycopg2(db):
+    assert not PostgresCopyLoader.is_supported(db)
+
+
+def test_copy_load_stores_rows_verbatim_and_skips_known_ones(pg_db):
+    assert PostgresCopyLoader.is_supported(pg_db)
+    pg_db.add(User(id='u1', email='u1@example.com', hashed_password='x'))
+    pg_db.commit()
+    df = awkward_rows()
+
+    first = TransactionService(pg_db).bulk_create_transactions(df, 'u1')
+    second = TransactionService(pg_db).bulk_create_transactions(df, 'u1')
+
+    assert (first['created'], first['skipped']) == (len(df), 0)
+    assert (second['created'], second['skipped']) == (0, len(df))
+    rows = pg_db.query(Transaction.description, Transaction.merchant, Transaction.amount).order_by(Transaction.date).all()
+    assert [row.description for row in rows] == DESCRIPTIONS
+    # Empty strings stay empty strings rather than turning into NULL
+    assert [row.merchant for row in rows] == df['merchant'].tolist()
+    assert [row.amount for row in rows] == pytest.approx(df['amount'].tolist())
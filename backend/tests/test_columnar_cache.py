@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.core.cache import analytics_cache
+from app.models.transaction import Transaction
+from app.services.analytics_services import AnalyticsService
+from app.services.columnar_cache import ColumnarCache, SOURCE_COLUMNS, UserColumns, columnar_cache, user_frame
+from app.services.transaction_service import TransactionService
+
+from .test_analytics import USER, add_transactions
+
+WINDOW = (date.today() - timedelta(days=400), date.today())
+
+
+def approx_tree(value):
+    """``value`` with every float wrapped in pytest.approx, for comparing nested responses"""
+    if isinstance(value, dict):
+        return {key: approx_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [approx_tree(item) for item in value]
+    if isinstance(value, float):
+        return pytest.approx(value)
+    return value
+
+
+def analytics(db) -> dict:
+    service = AnalyticsService(db)
+    return {
+        'dashboard': service.get_dashboard_data('30d', USER),
+        'trends': service.get_spending_trends('90d', user_id=USER),
+        'insights': service.get_insights(USER),
+        'predictions': service.get_predictions(30, USER),
+        'summary': TransactionService(db).get_summary('30d', USER),
+    }
+
+
+def stored_frame(db, user_id: str = USER) -> pd.DataFrame:
+    """The user's columns as freshly read from the database"""
+    rows = db.query(*[getattr(Transaction, column) for column in SOURCE_COLUMNS]).filter(Transaction.user_id == user_id)
+    return UserColumns.from_rows(pd.DataFrame(rows.all(), columns=SOURCE_COLUMNS)).frame(*WINDOW)
+
+
+def upload(db, days: int, offset: int = 0, user_id: str = USER):
+    today = date.today()
+    TransactionService(db).bulk_create_transactions(pd.DataFrame({
+        'date': [str(today - timedelta(days=offset + day)) for day in range(days)],
+        'description': [f'PAYROLL ACME {offset + day}' for day in range(days)],
+        'amount': [-10.0 - day for day in range(days)]
+    }), user_id)
+
+
+@pytest.mark.usefixtures('users')
+def test_sections_are_the_same_from_cached_columns(db):
+    add_transactions(db)
+    expected = analytics(db)
+    # Versions are per process, so nothing was cached
+    assert columnar_cache.stats()['users'] == 0
+
+    analytics_cache.backend.shared = True
+    analytics_cache.backend.clear()
+    assert analytics(db) == approx_tree(expected)
+    assert columnar_cache.stats()['users'] == 1
+    assert columnar_cache.stats()['loads'] == 1
+
+
+@pytest.mark.usefixtures('users', 'shared_versions')
+def test_ingest_appends_to_cached_columns_and_delete_drops_them(db):
+    upload(db, 20, offset=10)
+    assert columnar_cache.get(db, USER) is not None
+
+    upload(db, 10)
+    # Backfilled rows, older than every cached one
+    upload(db, 5, offset=40)
+    assert columnar_cache.stats()['appends'] == 2
+    pd.testing.assert_frame_equal(columnar_cache.lookup(USER).frame(*WINDOW), stored_frame(db))
+
+    deleted = db.query(Transaction.id).filter(Transaction.user_id == USER).first()[0]
+    TransactionService(db).delete_transactions([deleted], USER)
+    assert columnar_cache.lookup(USER) is None
+    pd.testing.assert_frame_equal(columnar_cache.get(db, USER).frame(*WINDOW), stored_frame(db))
+
+
+@pytest.mark.usefixtures('users')
+@pytest.mark.parametrize('shared', [True, False], ids=['cached', 'database'])
+def test_user_frame_keeps_raw_descriptions_either_way(db, shared):
+    analytics_cache.backend.shared = shared
+    upload(db, 30)
+    start = date.today() - timedelta(days=9)
+
+    frame = user_frame(db, USER, start, date.today())
+    assert (columnar_cache.lookup(USER) is not None) == shared
+    assert len(frame) == 10
+    assert sorted(frame['description']) == sorted(f'PAYROLL ACME {day}' for day in range(10))
+    stored = stored_frame(db)
+    pd.testing.assert_frame_equal(frame, stored[stored['date'] >= pd.Timestamp(start)].reset_index(drop=True))
+
+
+@pytest.mark.usefixtures('users', 'shared_versions')
+def test_least_recently_used_users_are_evicted_past_the_budget(db):
+    upload(db, 50, user_id='u1')
+    upload(db, 50, user_id='u2')
+    one_user = UserColumns.from_rows(pd.DataFrame(
+        db.query(*[getattr(Transaction, column) for column in SOURCE_COLUMNS]).filter(Transaction.user_id == 'u1').all(),
+        columns=SOURCE_COLUMNS
+    )).nbytes
+
+    cache = ColumnarCache(max_bytes=int(one_user * 1.5))
+    cache.get(db, 'u1')
+    cache.get(db, 'u2')
+    assert cache.lookup('u1') is None
+    assert cache.lookup('u2') is not None
+    assert cache.stats()['evictions'] == 1
+
+    # A user larger than the whole budget is served by the caller's fallback instead
+    tiny = ColumnarCache(max_bytes=one_user // 2)
+    assert tiny.get(db, 'u1') is None
+    assert tiny.stats()['users'] == 0
@@ -0,0 +1,174 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.services.file_layout import infer_layout, layout_cache
+from app.services.file_processor import DATE_FORMATS, FileProcessor
+
+US_FILE = 'Date,Description,Amount\n03/11/2026,Rent,"1,250"\n01/15/2026,Coffee,4.50\n'
+EU_FILE = 'Date,Description,Amount\n11/03/2026,Coffee,"12,50"\n25/03/2026,Lunch,"8,20"\n'
+SPLIT_FILE = 'Date,Description,Debit,Credit\n2026-01-02,Coffee,4.50,\n2026-01-03,Salary,,"2,000.00"\n2026-01-04,Refund,-3.00,\n'
+
+
+TYPED = pd.DataFrame({
+    'Date': pd.to_datetime(['2026-01-02', '2026-01-03', '2026-01-04', '2026-01-05', '2026-01-06']),
+    'Description': ['Coffee', 'Salary', 'Rent', 'Lunch', 'Refund'],
+    'Amount': [-4.5, 2000.0, -1250.0, -8.2, 3.0],
+    'Ignored': [1, 2, 3, 4, 5],
+})
+
+
+def parquet_bytes(df: pd.DataFrame, row_group_size: int = 2) -> io.BytesIO:
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), sink, row_group_size=row_group_size)
+    sink.seek(0)
+    return sink
+
+
+def arrow_bytes(df: pd.DataFrame, stream: bool, batch_rows: int = 2) -> io.BytesIO:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    open_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+    with open_writer(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+    sink.seek(0)
+    return sink
+
+
+def process(content: str) -> pd.DataFrame:
+    return FileProcessor().process_csv(io.StringIO(content))
+
+
+def dates(df: pd.DataFrame) -> list:
+    return [str(day.date()) for day in df['date']]
+
+
+def test_us_and_european_files_parse_the_same_with_and_without_the_cache():
+    us, eu = process(US_FILE), process(EU_FILE)
+    assert dates(us) == ['2026-03-11', '2026-01-15']
+    assert us['amount_cents'].tolist() == [125000, 450]
+    assert dates(eu) == ['2026-03-11', '2026-03-25']
+    assert eu['amount_cents'].tolist() == [1250, 820]
+
+    # Same header and digit-masked first row: a cached layout must not be reused blindly
+    layout_cache.clear()
+    process(EU_FILE)
+    us_after_eu = process(US_FILE)
+    assert dates(us_after_eu) == dates(us)
+    assert us_after_eu['amount_cents'].tolist() == us['amount_cents'].tolist()
+
+
+def test_day_first_file_after_month_first_file():
+    process('Date,Description,Amount\n01/15/2026,A,1.00\n')
+    df = process('Date,Description,Amount\n03/04/2026,A,1.00\n13/04/2026,B,2.00\n')
+    assert dates(df) == ['2026-04-03', '2026-04-13']
+
+
+def test_ambiguous_layouts_are_not_cached():
+    df = process('Date,Description,Amount\n03/04/2026,A,1.00\n05/06/2026,B,2.00\n')
+    # Nothing tells mm/dd from dd/mm, so the earlier candidate format is used for this file only
+    assert dates(df) == ['2026-03-04', '2026-05-06']
+    assert len(layout_cache._entries) == 0
+
+    process('Date,Description,Amount\n03/04/2026,A,1.00\n05/06/2026,B,"2,00"\n07/08/2026,C,3.00\n')
+    assert len(layout_cache._entries) == 0
+
+
+def test_mixed_date_formats_are_chosen_once_per_file():
+    rows = [f'2026-01-{day:02d},a,1' if day % 3 else f'01/{day:02d}/2026,b,2' for day in range(1, 29)]
+    content = 'Date,Description,Amount\n' + '\n'.join(rows) + '\n'
+
+    layout = infer_layout(pd.read_csv(io.StringIO(content), dtype=str), 'sig', FileProcessor().column_mappings, DATE_FORMATS)
+    assert layout.date_formats == ['%Y-%m-%d', '%m/%d/%Y']
+
+    chunks = list(FileProcessor().iter_csv_chunks(io.BytesIO(content.encode()), chunksize=5))
+    parsed = pd.concat(chunks)
+    assert len(parsed) == 28
+    assert dates(parsed) == [f'2026-01-{day:02d}' for day in range(1, 29)]
+
+
+def test_debit_and_credit_columns_fold_into_a_signed_amount():
+    df = process(SPLIT_FILE)
+    # Debits are spending whichever sign the bank writes them with; no row is dropped
+    assert df['amount_cents'].tolist() == [-450, 200000, -300]
+    assert df['amount'].tolist() == [-4.5, 2000.0, -3.0]
+    assert 'debit' not in df.columns and 'credit' not in df.columns
+    # Cached layout gives the same result
+    assert process(SPLIT_FILE)['amount_cents'].tolist() == [-450, 200000, -300]
+
+
+@pytest.mark.parametrize('header', ['Date,Description,Amount,Debit', 'Date,Description,Amount,Transaction Amount'])
+def test_conflicting_amount_columns_are_rejected(header):
+    with pytest.raises(ValueError, match='Conflicting amount columns'):
+        process(f'{header}\n2026-01-02,Coffee,4.50,4.50\n')
+
+
+def assert_typed_rows(df: pd.DataFrame):
+    assert sorted(df.columns) == ['amount', 'amount_cents', 'date', 'description']
+    assert dates(df) == ['2026-01-02', '2026-01-03', '2026-01-04', '2026-01-05', '2026-01-06']
+    assert df['amount'].tolist() == TYPED['Amount'].tolist()
+    assert df['amount_cents'].tolist() == [-450, 200000, -125000, -820, 300]
+    assert df['description'].tolist() == TYPED['Description'].tolist()
+
+
+def test_parquet_whole_file_and_row_batches_match():
+    assert_typed_rows(FileProcessor().process_parquet(parquet_bytes(TYPED)))
+    chunks = list(FileProcessor().iter_parquet_chunks(parquet_bytes(TYPED), chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert_typed_rows(pd.concat(chunks, ignore_index=True))
+
+
+@pytest.mark.parametrize('stream', [False, True], ids=['file', 'stream'])
+def test_arrow_file_and_stream_formats_match(stream):
+    chunks = list(FileProcessor().iter_arrow_chunks(arrow_bytes(TYPED, stream)))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert_typed_rows(pd.concat(chunks, ignore_index=True))
+    assert_typed_rows(FileProcessor().process_arrow(arrow_bytes(TYPED, stream)))
+
+
+def test_typed_debit_and_credit_columns_are_read():
+    split = pd.DataFrame({
+        'Date': TYPED['Date'],
+        'Description': TYPED['Description'],
+        'Debit': [4.5, None, 1250.0, 8.2, None],
+        'Credit': [None, 2000.0, None, None, 3.0],
+    })
+    assert_typed_rows(FileProcessor().process_parquet(parquet_bytes(split)))
+
+
+def test_later_chunks_keep_the_file_date_format():
+    # The first batch settles mm/dd; day-first rows in a later batch are dropped, never re-probed
+    records = [{'date': f'01/{day}/2026', 'description': 'a', 'amount': 1} for day in range(13, 23)]
+    records += [{'date': f'{day}/02/2026', 'description': 'b', 'amount': 1} for day in range(13, 23)]
+    chunks = list(FileProcessor().iter_json_chunks(io.BytesIO(json.dumps(records).encode()), chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 0]
+
+
+@pytest.mark.parametrize('document, rows', [
+    ([{'date': '2026-01-02', 'description': 'a', 'amount': 1.5}], 1),
+    ({'transactions': [{'date': '2026-01-02', 'description': 'a', 'amount': 1.5}] * 2}, 2),
+    ({'data': [{'date': '2026-01-02', 'description': 'a', 'amount': 1.5}] * 3}, 3),
+    ({'data': [{'date': '2026-01-02', 'description': 'a', 'amount': 1.5}], 'transactions': []}, 0),
+    ({'meta': {'data': []}, 'data': [{'date': '2026-01-02', 'description': 'a', 'amount': 1.5}]}, 1),
+])
+def test_json_records_come_from_the_array_process_json_uses(document, rows):
+    raw = json.dumps(document).encode()
+    chunks = list(FileProcessor().iter_json_chunks(io.BytesIO(raw)))
+    assert sum(len(chunk) for chunk in chunks) == rows
+    if rows:
+        assert len(FileProcessor().process_json(io.StringIO(raw.decode()))) == rows
+
+
+def test_ndjson_streams_in_record_batches():
+    records = [{'Date': f'2026-01-{day:02d}', 'Description': f'row {day}', 'Amount': f'-{day}.25'} for day in range(1, 8)]
+    raw = ''.join(json.dumps(record) + '\n\n' for record in records).encode()
+    chunks = list(FileProcessor().iter_file_chunks('statement.ndjson', io.BytesIO(raw), chunksize=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    df = pd.concat(chunks, ignore_index=True)
+    assert dates(df) == [f'2026-01-{day:02d}' for day in range(1, 8)]
+    assert df['amount'].tolist() == [-day - 0.25 for day in range(1, 8)]
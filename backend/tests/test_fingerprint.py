@@ -0,0 +1,54 @@
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.utils.fingerprint import transaction_fingerprints
+
+DESCRIPTIONS = ['Coffee Shop', '  coffee   SHOP ', '\tCoffee\nShop\n', 'Rent', '']
+
+
+def migration(name: str):
+    path = Path(__file__).resolve().parents[1] / 'alembic' / 'versions' / f'{name}.py'
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def frame(descriptions, amounts=None) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': ['2026-01-05'] * len(descriptions),
+        'amount': amounts or [-12.345] * len(descriptions),
+        'description': descriptions
+    })
+
+
+def test_fingerprint_ignores_case_and_whitespace():
+    fingerprints = transaction_fingerprints(frame(DESCRIPTIONS), 'u1')
+    assert fingerprints.iloc[0] == fingerprints.iloc[1] == fingerprints.iloc[2]
+    assert fingerprints.nunique() == 3
+
+
+def test_fingerprint_depends_on_user_date_and_cents():
+    base = transaction_fingerprints(frame(['Rent']), 'u1').iloc[0]
+    assert transaction_fingerprints(frame(['Rent']), 'u2').iloc[0] != base
+    assert transaction_fingerprints(frame(['Rent'], [-12.35]), 'u1').iloc[0] == base
+    assert transaction_fingerprints(frame(['Rent'], [-12.34]), 'u1').iloc[0] != base
+    moved = frame(['Rent']).assign(date=['2026-01-06'])
+    assert transaction_fingerprints(moved, 'u1').iloc[0] != base
+
+
+def test_migration_backfill_matches_python_fingerprints(pg):
+    """Rows fingerprinted by migration 002 must dedup against rows fingerprinted on ingest"""
+    sql = migration('002_transaction_fingerprint').FINGERPRINT_SQL
+    pg.execute(text("CREATE TABLE t (user_id TEXT, date DATE, amount FLOAT8, description TEXT)"))
+    df = frame(DESCRIPTIONS, [-12.345, 1.005, 2.675, 0.125, -1234.565])
+    pg.execute(
+        text("INSERT INTO t VALUES ('u1', :date, :amount, :description)"),
+        df.to_dict('records')
+    )
+    backfilled = [row[0] for row in pg.execute(text(f"SELECT {sql} FROM t ORDER BY amount"))]
+    expected = transaction_fingerprints(df.sort_values('amount').reset_index(drop=True), 'u1').tolist()
+    assert backfilled == expected
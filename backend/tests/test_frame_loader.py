@@ -0,0 +1,73 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.database import async_session
+from app.models.lookup import Category, Merchant
+from app.models.transaction import Transaction, transaction_select
+from app.services import frame_loader
+from app.services.frame_loader import load_frame, load_frame_async
+from app.services.lookup_service import LookupService
+
+STATEMENT = transaction_select(
+    ['id', 'date', 'amount_cents', 'amount', 'category', 'description', 'merchant']
+).where(Transaction.user_id == 'u1').order_by(Transaction.id)
+
+
+@pytest.fixture
+def stored(db, users):
+    """25 rows for u1, some without a category or merchant"""
+    today = date.today()
+    shopping = LookupService(db).ids(Category, ['Shopping'])['Shopping']
+    merchants = LookupService(db).ids(Merchant, [f'shop {row}' for row in range(25)])
+    db.add_all([
+        Transaction(id=f't{row:02d}', user_id='u1', date=today - timedelta(days=row), amount_cents=-125 * row,
+                    description=f'Shop {row}', category_id=None if row % 4 == 0 else shopping,
+                    merchant_id=None if row % 3 == 0 else merchants[f'shop {row}'], fingerprint=f'f{row}')
+        for row in range(25)
+    ])
+    db.commit()
+
+
+def orm_frame(db) -> pd.DataFrame:
+    return pd.DataFrame([
+        {'id': t.id, 'date': t.date, 'amount_cents': t.amount_cents, 'amount': t.amount, 'category': t.category, 'description': t.description,
+         'merchant': t.merchant}
+        for t in db.query(Transaction).filter(Transaction.user_id == 'u1').order_by(Transaction.id)
+    ])
+
+
+@pytest.mark.usefixtures('stored')
+def test_columns_are_typed_from_their_sql_types(db, monkeypatch):
+    # Several batches, the last one partial
+    monkeypatch.setattr(frame_loader, 'FRAME_BATCH_ROWS', 10)
+    frame = load_frame(db, STATEMENT)
+
+    assert frame.dtypes.to_dict() == {
+        'id': object, 'date': np.dtype('datetime64[s]'), 'amount_cents': np.int64, 'amount': np.float64,
+        'category': 'category', 'description': object, 'merchant': object
+    }
+    expected = orm_frame(db)
+    pd.testing.assert_series_equal(frame['date'].dt.date, expected['date'])
+    pd.testing.assert_frame_equal(
+        frame.drop(columns='date').astype({'category': object}), expected.drop(columns='date'), check_dtype=False
+    )
+    assert frame['category'].isna().sum() == 7
+    assert frame['merchant'].isna().sum() == 9
+
+
+@pytest.mark.usefixtures('stored')
+def test_async_and_empty_results(db):
+    async def load():
+        async with async_session() as session:
+            return await load_frame_async(session, STATEMENT, categorical=())
+
+    pd.testing.assert_frame_equal(asyncio.run(load()), load_frame(db, STATEMENT, categorical=()))
+
+    empty = load_frame(db, STATEMENT.where(Transaction.amount > 0))
+    assert empty.empty
+    assert list(empty.columns) == list(orm_frame(db).columns)
+    assert empty['amount'].dtype == np.float64
@@ -0,0 +1,172 @@
+import io
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select
+
+from app.models.daily_rollup import DailyUserCategoryRollup as Rollup
+from app.models.transaction import Transaction, transaction_select
+from app.services.analytics_services import AnalyticsService
+from app.services.file_processor import FileProcessor
+from app.services.prefix_index import prefix_indexes
+from app.services.rollup_service import RollupService
+from app.services.transaction_service import TransactionService
+
+USER = 'u1'
+START = date(2026, 1, 1)
+DAYS = 60
+
+
+def statement_csv(rows: int = 300, seed: int = 7, currency: str = None) -> bytes:
+    """A bank export with income, bills and everyday spending over DAYS days"""
+    rng = np.random.default_rng(seed)
+    descriptions = ['Coffee Shop', 'Grocery Store', 'Uber Ride', 'Netflix', 'Salary', 'Electric Bill', 'Amazon']
+    lines = ['Date,Description,Amount' + (',Currency' if currency else '')]
+    for row in range(rows):
+        day = START + timedelta(days=int(rng.integers(0, DAYS)))
+        description = descriptions[row % len(descriptions)]
+        cents = int(rng.integers(100, 20000)) * (1 if description == 'Salary' else -1)
+        amount = f'{cents / 100:.2f}'
+        lines.append(f'{day:%m/%d/%Y},{description} #{row % 40},{amount}' + (f',{currency}' if currency else ''))
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def statement(rows: int = 300, seed: int = 7) -> pd.DataFrame:
+    return FileProcessor().process_csv(io.StringIO(statement_csv(rows, seed).decode()))
+
+
+def ingest(db, content: bytes, chunksize: int = 100, **options):
+    chunks = FileProcessor().iter_csv_chunks(io.BytesIO(content), chunksize=chunksize)
+    return TransactionService(db).ingest_chunks(chunks, USER, **options)
+
+
+def stored(db) -> pd.DataFrame:
+    columns = ['id', 'date', 'amount_cents', 'fingerprint']
+    rows = db.execute(transaction_select(columns).where(Transaction.user_id == USER))
+    return pd.DataFrame(rows.all(), columns=columns)
+
+
+def rollup_rows(db) -> pd.DataFrame:
+    rows = db.execute(select(
+        Rollup.user_id, Rollup.date, Rollup.category, Rollup.income_cents, Rollup.expense_cents, Rollup.transaction_count
+    ).order_by(Rollup.user_id, Rollup.date, Rollup.category))
+    return pd.DataFrame(rows.all(), columns=['user_id', 'date', 'category', 'income', 'expenses', 'count'])
+
+
+def sql_totals(transactions: pd.DataFrame, start: date, end: date):
+    window = transactions[(transactions['date'] >= start) & (transactions['date'] <= end)]
+    cents = window['amount_cents']
+    return int(cents[cents > 0].sum()), int(-cents[cents < 0].sum()), len(window)
+
+
+def assert_views_match(db, start: date = START, end: date = START + timedelta(days=DAYS)):
+    """The rollup, the prefix index and the dashboard all agree with the transactions table"""
+    incremental = rollup_rows(db)
+    RollupService(db).rebuild(USER)
+    pd.testing.assert_frame_equal(incremental, rollup_rows(db))
+
+    income, expenses, count = sql_totals(stored(db), start, end)
+    totals = prefix_indexes.get(db, USER, start, end).totals(start, end)
+    # Cents sum exactly, so the totals match to the cent
+    assert (totals['income'], totals['expenses'], totals['transactions']) == (income / 100, expenses / 100, count)
+
+    dashboard = AnalyticsService(db).get_dashboard_data(user_id=USER, start=str(start), end=str(end))
+    assert dashboard['totalBalance'] == pytest.approx((income - expenses) / 100)
+    assert dashboard['totalTransactions'] == count
+
+
+@pytest.mark.usefixtures('users')
+def test_bulk_create_skips_rows_already_stored(db):
+    df = statement()
+    first = TransactionService(db).bulk_create_transactions(df, USER)
+    second = TransactionService(db).bulk_create_transactions(df, USER)
+
+    assert first['created'] == len(stored(db)) > 0
+    assert (second['created'], second['skipped']) == (0, len(df))
+    assert stored(db)['fingerprint'].is_unique
+
+
+@pytest.mark.usefixtures('users')
+def test_rows_repeated_within_a_file_are_stored_once(db):
+    df = statement(rows=50)
+    result = TransactionService(db).bulk_create_transactions(pd.concat([df, df.iloc[:10]], ignore_index=True), USER)
+    assert result['created'] == len(stored(db)) == len(df.drop_duplicates(['date', 'amount', 'description']))
+
+
+@pytest.mark.usefixtures('users')
+def test_overlapping_upload_only_adds_new_rows(db):
+    old, new = statement(rows=200, seed=1), statement(rows=50, seed=2)
+    TransactionService(db).bulk_create_transactions(old, USER)
+    before = set(stored(db)['fingerprint'])
+
+    result = TransactionService(db).bulk_create_transactions(pd.concat([old, new], ignore_index=True), USER)
+
+    after = set(stored(db)['fingerprint'])
+    assert before < after
+    assert result['created'] == len(after - before)
+    assert_views_match(db)
+
+
+def test_csv_chunks_parse_like_the_whole_file():
+    content = statement_csv()
+    chunks = list(FileProcessor().iter_csv_chunks(io.BytesIO(content), chunksize=70))
+    assert [len(chunk) for chunk in chunks] == [70, 70, 70, 70, 20]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), statement())
+
+
+@pytest.mark.usefixtures('users')
+def test_chunked_ingest_commits_every_chunk_and_reports_progress(db):
+    progress = []
+    result = ingest(db, statement_csv(), on_progress=progress.append)
+
+    assert result['total'] == 300
+    assert result['created'] == len(stored(db)) > 0
+    assert len(result['chunks']) == len(progress) == 3
+    assert [update['total_rows'] for update in progress] == [100, 200, 300]
+    assert sum(chunk['created'] for chunk in result['chunks']) == result['created']
+    assert_views_match(db)
+    assert_views_match(db, START + timedelta(days=10), START + timedelta(days=20))
+
+
+@pytest.mark.usefixtures('users')
+def test_reupload_is_deduplicated_by_fingerprint(db):
+    first = ingest(db, statement_csv())
+    second = ingest(db, statement_csv())
+
+    assert second['created'] == 0
+    assert second['skipped'] == second['total']
+    assert len(stored(db)) == first['created']
+    assert_views_match(db)
+
+
+@pytest.mark.parametrize('cached', [False, True])
+@pytest.mark.usefixtures('users')
+def test_delete_updates_every_view(db, request, cached):
+    if cached:
+        # Keep the prefix index in memory, so delete refreshes it in place
+        request.getfixturevalue('shared_versions')
+    ingest(db, statement_csv())
+    end = START + timedelta(days=DAYS)
+    AnalyticsService(db).get_dashboard_data(user_id=USER, start=str(START), end=str(end))
+    before = prefix_indexes.get(db, USER, START, end).totals(START, end)
+
+    transactions = stored(db)
+    victims = transactions.sort_values('date').iloc[len(transactions) // 2:][::3]
+    assert TransactionService(db).delete_transactions(victims['id'].tolist(), USER) == len(victims)
+    assert TransactionService(db).delete_transactions(victims['id'].tolist(), USER) == 0
+
+    after = prefix_indexes.get(db, USER, START, end).totals(START, end)
+    assert after['transactions'] == before['transactions'] - len(victims)
+    assert round(before['net'] - after['net'], 2) == round(victims['amount_cents'].sum() / 100, 2)
+    assert_views_match(db)
+
+
+@pytest.mark.usefixtures('users')
+def test_non_default_currency_is_rejected(db):
+    with pytest.raises(ValueError, match='EUR'):
+        ingest(db, statement_csv(rows=20, currency='EUR'))
+    assert stored(db).empty
+    # An explicit USD column is accepted
+    assert ingest(db, statement_csv(rows=20, currency='usd'))['created'] == 20
@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.transactions import router
+from app.core.config import settings
+from app.models.transaction import Transaction
+from app.models.user import User
+
+from .test_ingestion import statement_csv
+
+
+@pytest.fixture
+def client(db):
+    # Uploads are not tied to a login yet, so they belong to the default user
+    db.add(User(id='default_user', email='default@example.com', hashed_password='x'))
+    db.commit()
+    app = FastAPI()
+    app.include_router(router, prefix='/api/transactions')
+    return TestClient(app)
+
+
+def upload(client, content: bytes, filename: str = 'statement.csv', **params):
+    return client.post('/api/transactions/upload', params=params, files={'file': (filename, content)})
+
+
+def test_foreground_upload_returns_the_finished_job(client):
+    response = upload(client, statement_csv(), background=False, chunk_rows=100)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['status'] == 'completed'
+    assert (body['chunks_processed'], body['total_transactions'], body['progress']) == (3, 300, 1.0)
+    assert body['processed_transactions'] + body['skipped_duplicates'] == 300
+    assert client.get(f"/api/transactions/jobs/{body['job_id']}").json() == {
+        key: body[key] for key in body if key != 'message'
+    }
+    # The spooled copy is removed once the job is done
+    assert not os.listdir(settings.UPLOAD_SPOOL_DIR)
+
+
+def test_background_upload_can_be_polled_to_completion(client):
+    response = upload(client, statement_csv(rows=50))
+    assert response.status_code == 202
+    status_url = response.json()['status_url']
+
+    deadline = time.monotonic() + 30
+    job = client.get(status_url).json()
+    while job['status'] in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(status_url).json()
+    assert job['status'] == 'completed'
+    assert job['total_transactions'] == 50
+
+
+def test_failed_job_records_the_error(client):
+    response = upload(client, b'Date,Memo\n01/02/2026,x\n', background=False)
+    assert response.status_code == 500
+    assert 'Missing required columns' in response.json()['detail']
+
+
+def test_identical_file_is_short_circuited(client):
+    first = upload(client, statement_csv(rows=50), background=False).json()
+    again = upload(client, statement_csv(rows=50), background=False)
+
+    assert again.status_code == 200
+    body = again.json()
+    assert body['message'] == 'File already ingested'
+    assert 'job_id' not in body
+    assert body['processed_transactions'] == 0
+    assert body['skipped_duplicates'] == first['total_transactions'] == 50
+    assert body['skipped_reasons']['duplicate_file'] is not None
+    assert not os.listdir(settings.UPLOAD_SPOOL_DIR)
+
+
+def test_overlapping_file_skips_rows_already_ingested(client):
+    first = upload(client, statement_csv(rows=100, seed=1), background=False).json()
+    new_rows = b'\n'.join(statement_csv(rows=20, seed=2).splitlines()[1:]) + b'\n'
+    body = upload(client, statement_csv(rows=100, seed=1) + new_rows, background=False).json()
+
+    assert body['status'] == 'completed'
+    assert body['skipped_reasons']['duplicate_file'] is None
+    # Every row of the first file is recognised inside its window without reaching the insert
+    assert body['skipped_reasons']['already_ingested'] >= first['processed_transactions']
+    assert body['processed_transactions'] + body['skipped_duplicates'] == 120
+    assert body['processed_transactions'] > 0
+
+
+def test_deleted_rows_are_restored_by_uploading_the_file_again(client, db):
+    content = statement_csv(rows=30)
+    first = upload(client, content, background=False).json()
+    victim = db.query(Transaction.id).filter(Transaction.user_id == 'default_user').first().id
+
+    assert client.delete(f'/api/transactions/{victim}').status_code == 200
+    # The file no longer counts as ingested, and only the deleted row comes back
+    again = upload(client, content, background=False).json()
+    assert again['skipped_reasons']['duplicate_file'] is None
+    assert again['processed_transactions'] == 1
+    assert db.query(Transaction).filter(Transaction.user_id == 'default_user').count() == first['processed_transactions']
+    # Recorded again, so a third upload is short-circuited
+    assert upload(client, content, background=False).json()['message'] == 'File already ingested'
+
+
+def test_unknown_jobs_and_file_types_are_rejected(client):
+    assert client.get('/api/transactions/jobs/nope').status_code == 404
+    assert upload(client, b'x', filename='statement.pdf').status_code == 400
+
+
+def test_worker_resolves_every_mapper_without_the_api():
+    """The Celery worker imports services only; every relationship() target must still resolve"""
+    code = "import app.worker; from sqlalchemy.orm import configure_mappers; configure_mappers()"
+    backend = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, '-c', code], cwd=backend, env={**os.environ, 'PYTHONPATH': str(backend)}, check=True)
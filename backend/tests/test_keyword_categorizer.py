@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.keyword_categorizer import KeywordCategorizer
+from app.ml.transaction_analyzer import TransactionAnalyzer
+
+WORDS = [
+    'Starbucks Coffee', 'UBER *TRIP', 'Shell Gas', 'Netflix.com', 'Walmart Supercenter', 'Vanguard 401k',
+    'Mutual  Fund', 'mutual fund', 'Rent', 'pub', 'Spotify', '', 'CVS Pharmacy', 'Target', 'Barnes', 'a.b*c',
+]
+
+
+def transactions(rows: int, seed: int, merchant: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'description': rng.choice(WORDS, rows), 'amount': rng.normal(0, 50, rows)})
+    if merchant:
+        merchants = np.array(WORDS + [None, np.nan], dtype=object)
+        df['merchant'] = merchants[rng.integers(0, len(merchants), rows)]
+    return df
+
+
+@pytest.mark.parametrize('merchant', [True, False])
+def test_vectorized_categories_match_the_row_by_row_path(merchant):
+    analyzer = TransactionAnalyzer()
+    df = transactions(2000, 1, merchant)
+    expected = df.apply(analyzer._categorize_single_transaction, axis=1)
+
+    categorized = analyzer.categorize_transactions(df.copy())
+
+    pd.testing.assert_series_equal(categorized['category'], expected, check_names=False)
+
+
+def test_first_category_wins_and_keywords_match_literally():
+    categorizer = KeywordCategorizer({'a': ['gas', 'uber eats'], 'b': ['gas station', 'uber', '.*', '401k']})
+    texts = pd.Series(['gas station', 'uber eats', 'uber', 'x.*y', 'xyz', '401K', '401k'], index=list('abcdefg'))
+    assert categorizer.categorize(texts).to_dict() == {
+        'a': 'a', 'b': 'a', 'c': 'b', 'd': 'b', 'e': 'other', 'f': 'other', 'g': 'b'
+    }
+
+
+def test_empty_frame_gets_an_empty_category_column():
+    df = TransactionAnalyzer().categorize_transactions(transactions(0, 2))
+    assert 'category' in df.columns and df.empty
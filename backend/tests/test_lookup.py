@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from app.models.lookup import Category, Merchant
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.lookup_service import LookupService, lookup_ids
+from app.services.transaction_service import TransactionService
+
+from .test_partitioning import run_migration
+
+
+def statement(days: int = 12, offset: int = 0) -> pd.DataFrame:
+    today = date.today()
+    return pd.DataFrame({
+        'date': [str(today - timedelta(days=offset + day)) for day in range(days)],
+        'description': ['UBER TRIP', 'SHELL OIL 5521', 'NETFLIX.COM'] * (days // 3),
+        'amount': [-12.5 - offset - day for day in range(days)]
+    })
+
+
+def names(db) -> dict:
+    return {t.id: (t.category, t.merchant) for t in db.query(Transaction)}
+
+
+@pytest.mark.usefixtures('users')
+def test_ingest_stores_ids_that_read_back_as_names(db):
+    TransactionService(db).bulk_create_transactions(statement(), 'u1')
+
+    stored = db.query(Transaction).all()
+    assert all(t.category_id is not None for t in stored)
+    categories = {name: id_ for id_, name in db.query(Category.id, Category.name)}
+    assert {t.category_id for t in stored} == {categories[t.category] for t in stored}
+    assert sorted(TransactionService(db).get_categories()) == sorted({t.category for t in stored} - {''})
+
+    category = stored[0].category
+    listed = TransactionService(db).get_filtered_transactions(category=category, user_id='u1')
+    assert listed and {t.category for t in listed} == {category}
+    assert TransactionService(db).get_filtered_transactions(category='No such category') == []
+
+
+@pytest.mark.usefixtures('users')
+def test_known_names_keep_their_ids(db):
+    TransactionService(db).bulk_create_transactions(statement(), 'u1')
+    before = db.query(Category.id, Category.name).all()
+
+    # Served from the process cache, and from the table once the cache is gone
+    TransactionService(db).bulk_create_transactions(statement(offset=20), 'u1')
+    lookup_ids.clear()
+    TransactionService(db).bulk_create_transactions(statement(offset=40), 'u2')
+    assert db.query(Category.id, Category.name).all() == before
+
+    ids = LookupService(db).ids(Merchant, ['new merchant', 'new merchant'])
+    assert list(ids) == ['new merchant']
+    assert db.query(Merchant).filter(Merchant.name == 'new merchant').count() == 1
+
+
+@pytest.mark.usefixtures('users')
+def test_missing_names_get_null_ids(db):
+    encoded = LookupService(db).encode(pd.DataFrame({'category': ['Travel', None], 'merchant': [None, 'acme']}))
+    assert encoded['category_id'][0] is not None and encoded['category_id'][1] is None
+    assert encoded['merchant_id'][0] is None and encoded['merchant_id'][1] is not None
+
+
+def test_migration_round_trip_keeps_every_name(pg_db, pg):
+    pg_db.add(User(id='u1', email='u1@example.com', hashed_password='x'))
+    pg_db.commit()
+    TransactionService(pg_db).bulk_create_transactions(statement(), 'u1')
+    expected = names(pg_db)
+
+    run_migration(pg, '009_category_merchant_lookup', 'downgrade')
+    strings = dict((row[0], (row[1], row[2])) for row in pg.execute(
+        text("SELECT id, category, merchant FROM transactions")
+    ))
+    assert strings == expected
+
+    run_migration(pg, '009_category_merchant_lookup', 'upgrade')
+    lookup_ids.clear()
+    pg_db.expire_all()
+    assert names(pg_db) == expected
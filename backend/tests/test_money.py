@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from app.models.daily_rollup import DailyUserCategoryRollup as Rollup
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.transaction_service import TransactionService
+from app.utils.money import amount_to_cents, cents_to_amount, parse_cents, to_cents
+
+from .test_fingerprint import migration
+from .test_partitioning import run_migration
+
+# Amounts whose cents sit exactly on, or a binary float's width from, a half cent
+HALVES = [1.005, -1.005, 0.125, 2.675, -0.004, 0.0, 1234567.895]
+HALVES_CENTS = [101, -101, 13, 268, 0, 0, 123456790]
+
+
+def test_amounts_round_half_away_from_zero():
+    assert amount_to_cents(pd.Series(HALVES)).tolist() == HALVES_CENTS
+    cents = to_cents(pd.Series([1.005, None, -2.5]))
+    assert cents.tolist() == [101, pd.NA, -250]
+    assert cents_to_amount(cents).tolist()[::2] == [1.01, -2.5]
+
+
+def test_decimal_strings_parse_without_floats():
+    parsed = parse_cents(pd.Series(['-1234.505', '12', '.5', '0.129', '+7.1', '1e3', 'abc', '']))
+    assert parsed.tolist() == [-123451, 1200, 50, 13, 710, 100000, pd.NA, pd.NA]
+    # Past what a float can hold to the cent
+    assert parse_cents(pd.Series(['90071992547409.93'])).tolist() == [9007199254740993]
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def session(request):
+    return request.getfixturevalue('db' if request.param == 'sqlite' else 'pg_db')
+
+
+def test_migration_rounds_like_amount_to_cents(session):
+    to_cents_sql = migration('010_integer_cents').TO_CENTS_SQL[session.get_bind().dialect.name]
+    amounts = np.round(np.random.default_rng(3).uniform(-1000, 1000, 2000), 3).tolist() + HALVES
+    session.execute(text("CREATE TEMP TABLE amounts (position INTEGER, amount DOUBLE PRECISION)"))
+    session.execute(
+        text("INSERT INTO amounts VALUES (:position, :amount)"),
+        [{'position': position, 'amount': amount} for position, amount in enumerate(amounts)]
+    )
+    rows = session.execute(text(
+        f"SELECT {to_cents_sql.format(column='amount')} FROM amounts ORDER BY position"
+    )).scalars().all()
+    session.execute(text("DROP TABLE amounts"))
+    assert [int(cents) for cents in rows] == amount_to_cents(pd.Series(amounts)).tolist()
+
+
+def test_migration_round_trip_keeps_cents_and_rebuilds_the_rollup(pg_db, pg):
+    pg_db.add(User(id='u1', email='u1@example.com', hashed_password='x'))
+    pg_db.commit()
+    today = date.today()
+    TransactionService(pg_db).bulk_create_transactions(pd.DataFrame({
+        'date': [str(today - timedelta(days=day % 9)) for day in range(40)],
+        'description': [f'Shop {day}' for day in range(40)],
+        'amount': [f'{(-1) ** day * (day * 7.13 + 0.01):.2f}' for day in range(40)]
+    }), 'u1')
+    transactions = select(Transaction.id, Transaction.amount_cents).order_by(Transaction.id)
+    rollup = select(Rollup.date, Rollup.category, Rollup.income_cents, Rollup.expense_cents).order_by(
+        Rollup.date, Rollup.category
+    )
+    expected = (pg_db.execute(transactions).all(), pg_db.execute(rollup).all())
+
+    run_migration(pg, '010_integer_cents', 'downgrade')
+    run_migration(pg, '010_integer_cents', 'upgrade')
+    pg_db.expire_all()
+    assert (pg_db.execute(transactions).all(), pg_db.execute(rollup).all()) == expected
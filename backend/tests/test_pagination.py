@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.transaction import Transaction
+from app.services.transaction_service import TransactionService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('user 1', date(2026, 2, 28), 'a/b+c')
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('user 1', date(2026, 2, 28), 'a/b+c')
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', encode_cursor('u', date(2026, 1, 1), 'x')[:-3]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def seed(db):
+    # Several rows per day, so pages break inside a run of equal dates
+    rows = [
+        Transaction(
+            id=f'{user}-t{index:03d}',
+            user_id=user,
+            amount_cents=-100 * index,
+            description=f'row {index}',
+            fingerprint=f'{user}-{index}',
+            date=date(2026, 1, 1) + timedelta(days=index % 7)
+        )
+        for index in range(60)
+        for user in ('u1', 'u2')
+    ]
+    db.add_all(rows)
+    db.commit()
+
+
+def pages(service: TransactionService, limit: int, **filters):
+    cursor, seen = None, []
+    while True:
+        page = service.get_filtered_transactions(limit=limit, cursor=cursor, **filters)
+        seen.extend((row.user_id, row.date, row.id) for row in page)
+        if len(page) < limit:
+            return seen
+        cursor = encode_cursor(page[-1].user_id, page[-1].date, page[-1].id)
+
+
+@pytest.mark.parametrize('limit', [1, 7, 25, 120])
+@pytest.mark.usefixtures('users')
+def test_keyset_pages_cover_every_row_once_in_order(db, limit):
+    seed(db)
+    service = TransactionService(db)
+
+    everything = pages(service, limit)
+    assert len(everything) == 120
+    assert everything == sorted(everything)
+
+    one_user = pages(service, limit, user_id='u2', start_date='2026-01-03')
+    assert one_user == [row for row in everything if row[0] == 'u2' and row[1] >= date(2026, 1, 3)]
+
+
+@pytest.mark.usefixtures('users')
+def test_keyset_and_offset_pages_agree(db):
+    seed(db)
+    service = TransactionService(db)
+    by_offset = [
+        (row.user_id, row.date, row.id)
+        for skip in range(0, 120, 25)
+        for row in service.get_filtered_transactions(skip=skip, limit=25)
+    ]
+    assert pages(service, 25) == by_offset
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.lookup_service import lookup_ids
+from app.services.partitioning import TransactionPartitionService
+from app.services.transaction_service import TransactionService
+
+from .test_fingerprint import migration
+
+# Later migrations that reshape transactions, undone around 006 so it sees the table it was written for
+LATER_MIGRATIONS = ['009_category_merchant_lookup', '010_integer_cents']
+
+
+def statement(day: str, rows: int = 40) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': [day] * rows,
+        'description': [f'Shop {row}' for row in range(rows)],
+        'amount': [-1.0 - row for row in range(rows)]
+    })
+
+
+def partitions(pg) -> list:
+    return sorted(pg.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('transactions')"
+    )).scalars())
+
+
+def run_migration(pg, name: str, direction: str):
+    with Operations.context(MigrationContext.configure(pg)):
+        getattr(migration(name), direction)()
+
+
+def run_partitioning(pg, direction: str):
+    """Migration 006 in ``direction`` on the current schema"""
+    for name in reversed(LATER_MIGRATIONS):
+        run_migration(pg, name, 'downgrade')
+    run_migration(pg, '006_partition_transactions', direction)
+    for name in LATER_MIGRATIONS:
+        run_migration(pg, name, 'upgrade')
+    # The lookup tables were rebuilt with new ids
+    lookup_ids.clear()
+
+
+@pytest.fixture(params=[0, 4], ids=['range', 'range-hash'])
+def partitioned(request, pg_db, pg, monkeypatch):
+    """u1's January and March rows, then migration 006 with or without hash sub-partitions"""
+    monkeypatch.setattr(settings, 'TRANSACTION_HASH_PARTITIONS', request.param)
+    monkeypatch.setattr(settings, 'TRANSACTION_PARTITION_MONTHS_AHEAD', 3)
+    pg_db.add(User(id='u1', email='u1@example.com', hashed_password='x'))
+    pg_db.commit()
+    for day in ('2025-01-10', '2025-03-05'):
+        TransactionService(pg_db).bulk_create_transactions(statement(day), 'u1')
+    run_partitioning(pg, 'upgrade')
+    return request.param
+
+
+def test_upgrade_copies_rows_into_monthly_partitions(partitioned, pg_db, pg):
+    assert TransactionPartitionService(pg_db).is_partitioned()
+    assert pg_db.query(Transaction).count() == 80
+    # Every month from the oldest row through three months ahead
+    months = partitions(pg)
+    assert months[:3] == ['transactions_2025_01', 'transactions_2025_02', 'transactions_2025_03']
+    month_index = date.today().year * 12 + date.today().month - 1 + 3
+    assert months[-1] == f'transactions_{month_index // 12}_{month_index % 12 + 1:02d}'
+    if partitioned:
+        assert len(pg.execute(text("SELECT 1 FROM pg_inherits WHERE inhparent = 'transactions_2025_01'::regclass")).all()) == 4
+
+
+def test_ingest_creates_missing_months_and_still_dedups(partitioned, pg_db, pg):
+    result = TransactionService(pg_db).bulk_create_transactions(statement('2020-06-01'), 'u1')
+    assert result['created'] == 40
+    assert 'transactions_2020_06' in partitions(pg)
+    assert TransactionPartitionService(pg_db).ensure_range(date(2020, 6, 1), date(2020, 6, 30)) == 0
+
+    result = TransactionService(pg_db).bulk_create_transactions(statement('2020-06-01'), 'u1')
+    assert (result['created'], result['skipped']) == (0, 40)
+
+
+def test_downgrade_restores_the_plain_table(partitioned, pg_db, pg):
+    run_partitioning(pg, 'downgrade')
+    assert not TransactionPartitionService(pg_db).is_partitioned()
+    assert pg_db.query(Transaction).count() == 80
+    assert partitions(pg) == []
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.cache import analytics_cache
+from app.services.prefix_index import PrefixSumIndex, prefix_indexes
+from app.services.rollup_service import RollupService
+
+ORIGIN = date(2026, 1, 1)
+
+
+def rollup(count: int, seed: int, first_day: int = 0, days: int = 90, categories=('Food', 'Rent', 'Travel')):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.to_datetime([ORIGIN + timedelta(days=int(day)) for day in rng.integers(first_day, days, count)]),
+        'category': rng.choice(list(categories), count),
+        'income_cents': rng.integers(0, 100000, count),
+        'expense_cents': rng.integers(0, 100000, count),
+        'transaction_count': rng.integers(1, 5, count)
+    }).groupby(['date', 'category'], as_index=False).sum()
+
+
+def brute_force(rows: pd.DataFrame, start: date, end: date, category: str = None):
+    window = rows[(rows['date'].dt.date >= start) & (rows['date'].dt.date <= end)]
+    if category:
+        window = window[window['category'] == category]
+    income, expenses = int(window['income_cents'].sum()), int(window['expense_cents'].sum())
+    return {
+        'income': income / 100,
+        'expenses': expenses / 100,
+        'net': (income - expenses) / 100,
+        'transactions': int(window['transaction_count'].sum())
+    }
+
+
+@pytest.mark.parametrize('start, end', [
+    (ORIGIN, ORIGIN + timedelta(days=89)),
+    (ORIGIN + timedelta(days=10), ORIGIN + timedelta(days=10)),
+    (ORIGIN - timedelta(days=30), ORIGIN + timedelta(days=5)),
+    (ORIGIN + timedelta(days=80), ORIGIN + timedelta(days=400)),
+    (ORIGIN + timedelta(days=20), ORIGIN + timedelta(days=19)),
+])
+def test_totals_match_a_scan_of_the_rollup(start, end):
+    rows = rollup(400, 1)
+    index = PrefixSumIndex.from_rollup(rows)
+
+    assert index.totals(start, end) == brute_force(rows, start, end)
+    for category in ('Food', 'Travel', 'Unknown'):
+        assert index.totals(start, end, category) == brute_force(rows, start, end, category)
+    expected = {
+        category: brute_force(rows, start, end, category)
+        for category in sorted(rows['category'].unique())
+        if brute_force(rows, start, end, category)['transactions'] > 0
+    }
+    assert index.category_totals(start, end) == expected
+
+
+def test_refresh_tail_matches_a_full_rebuild():
+    history = rollup(300, 2, days=60)
+    index = PrefixSumIndex.from_rollup(history)
+
+    # New days past the end, changed days inside the index and a category it has not seen
+    since = ORIGIN + timedelta(days=40)
+    tail = rollup(200, 3, first_day=40, days=75, categories=('Food', 'Gifts'))
+    updated = pd.concat([history[history['date'].dt.date < since], tail], ignore_index=True)
+    assert index.refresh_tail(tail, since)
+
+    rebuilt = PrefixSumIndex.from_rollup(updated)
+    assert index.end == rebuilt.end
+    for start, end in [(ORIGIN, ORIGIN + timedelta(days=74)), (since, since + timedelta(days=3))]:
+        assert index.totals(start, end) == rebuilt.totals(start, end)
+        assert index.category_totals(start, end) == rebuilt.category_totals(start, end)
+
+
+def test_refresh_before_the_origin_asks_for_a_rebuild():
+    index = PrefixSumIndex.from_rollup(rollup(50, 4, first_day=10))
+    assert not index.refresh_tail(rollup(5, 5), ORIGIN)
+    assert not PrefixSumIndex.from_rollup(rollup(0, 6)).refresh_tail(rollup(5, 5), ORIGIN)
+
+
+def transactions(count: int, seed: int, user_id: str = 'u1') -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': user_id,
+        'date': [ORIGIN + timedelta(days=int(day)) for day in rng.integers(0, 90, count)],
+        'category': rng.choice(['Food', 'Rent', ''], count),
+        'amount_cents': rng.integers(-50000, 50000, count)
+    })
+
+
+@pytest.mark.usefixtures('users')
+def test_without_shared_versions_indexes_cover_only_the_requested_window(db):
+    rows = transactions(500, 7)
+    RollupService(db).apply(rows)
+    db.commit()
+    start, end = ORIGIN + timedelta(days=30), ORIGIN + timedelta(days=44)
+
+    windowed = prefix_indexes.get(db, 'u1', start, end)
+    assert windowed.origin >= start and windowed.end <= end
+    assert windowed.totals(start, end) == prefix_indexes.get(db, 'u1').totals(start, end)
+    # Nothing is kept, so the next read sees new rows at once
+    assert prefix_indexes.get(db, 'u1', start, end) is not windowed
+    RollupService(db).apply(transactions(50, 8))
+    db.commit()
+    assert prefix_indexes.get(db, 'u1', start, end).totals(start, end) != windowed.totals(start, end)
+
+
+@pytest.mark.usefixtures('users', 'shared_versions')
+def test_shared_versions_keep_one_full_index_per_user(db):
+    RollupService(db).apply(transactions(500, 7))
+    db.commit()
+    start, end = ORIGIN + timedelta(days=30), ORIGIN + timedelta(days=44)
+
+    index = prefix_indexes.get(db, 'u1', start, end)
+    assert index.origin < start and index.end > end
+    assert prefix_indexes.get(db, 'u1') is index
+
+    # A bump from elsewhere (no refresh in this process) makes the next read rebuild
+    analytics_cache.bump('u1')
+    assert prefix_indexes.get(db, 'u1') is not index
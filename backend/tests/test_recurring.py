@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.recurring_detector import SERIES_COLUMNS, SERIES_KEY, RecurringDetector
+from app.models.recurring import RecurringSeries
+from app.models.transaction import Transaction
+from app.services.analytics_services import AnalyticsService
+from app.services.recurring_service import RecurringService
+from app.services.transaction_service import TransactionService
+from app.utils.periods import shift_months
+
+# State compared between folding batches in and detecting over everything at once
+STATE_COLUMNS = SERIES_KEY + ['occurrences', 'first_date', 'last_date', 'cadence', 'is_recurring',
+                 'next_expected_date']
+
+
+def statement(months: int = 8, seed: int = 11) -> pd.DataFrame:
+    """Up to today: a monthly subscription whose price rises once, a weekly gym charge,
+    a biweekly salary and groceries at irregular times and amounts"""
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    rows = []
+    for month in range(months):
+        rows.append((shift_months(today, -month), 'NETFLIX.COM 8842', -17.99 if month < 3 else -15.99))
+    for week in range(months * 4):
+        rows.append((today - timedelta(days=7 * week + 1), 'Iron Gym', -12.0))
+        if week % 2 == 0:
+            rows.append((today - timedelta(days=7 * week + 3), 'ACME PAYROLL', 2600.0))
+    for day in rng.choice(months * 30, size=25, replace=False):
+        rows.append((today - timedelta(days=int(day)), 'Corner Grocery', -float(rng.integers(8, 140))))
+    return pd.DataFrame(rows, columns=['date', 'description', 'amount']).sort_values('date', ignore_index=True)
+
+
+def state(series: pd.DataFrame) -> pd.DataFrame:
+    return series[STATE_COLUMNS].sort_values(SERIES_KEY, ignore_index=True)
+
+
+def test_detects_each_cadence_and_ignores_irregular_spending():
+    series = RecurringDetector().detect(statement())
+    cadences = dict(zip(series['merchant_key'], series['cadence']))
+    assert cadences == {'netflix com': 'monthly', 'iron gym': 'weekly', 'acme payroll': 'biweekly'}
+    # The price rise stays within one series
+    netflix = series[series['merchant_key'] == 'netflix com'].iloc[0]
+    assert (netflix['occurrences'], netflix['last_amount']) == (8, 17.99)
+
+
+def test_folding_batches_in_matches_detecting_all_at_once():
+    detector = RecurringDetector()
+    rows = statement()
+    first, second = rows.iloc[:60], rows.iloc[60:]
+
+    folded = detector.update(detector.update(pd.DataFrame(columns=SERIES_COLUMNS), first), second)
+    stored = detector.update(pd.DataFrame(columns=SERIES_COLUMNS), first)
+    # Series the second batch did not touch keep their stored state
+    touched = stored.merge(folded[SERIES_KEY], on=SERIES_KEY, how='left', indicator=True)['_merge'] == 'both'
+    combined = pd.concat([folded, stored[~touched.to_numpy()]])
+
+    everything = detector.update(pd.DataFrame(columns=SERIES_COLUMNS), rows)
+    # One-off amounts may snap to other buckets depending on batch order; the recurring series may not
+    recurring = everything.loc[everything['is_recurring'], SERIES_KEY]
+    assert len(recurring) == 3
+    pd.testing.assert_frame_equal(
+        state(combined.merge(recurring, on=SERIES_KEY)), state(everything.merge(recurring, on=SERIES_KEY)),
+        check_dtype=False
+    )
+
+
+def test_removing_rows_matches_never_having_seen_them():
+    detector = RecurringDetector()
+    rows = statement()
+    dropped = rows[rows['description'] == 'NETFLIX.COM 8842'].tail(2)
+
+    series = detector.remove(detector.update(pd.DataFrame(columns=SERIES_COLUMNS), rows), dropped)
+    expected = detector.update(pd.DataFrame(columns=SERIES_COLUMNS), rows.drop(dropped.index))
+    netflix = state(expected[expected['merchant_key'] == 'netflix com'])
+    pd.testing.assert_frame_equal(state(series), netflix, check_dtype=False)
+
+
+@pytest.mark.usefixtures('users')
+def test_series_follow_ingest_and_delete(db):
+    rows = statement()
+    for batch in (rows.iloc[:60], rows.iloc[60:]):
+        TransactionService(db).bulk_create_transactions(batch.assign(date=batch['date'].astype(str)), 'u1')
+
+    report = AnalyticsService(db).get_recurring(user_id='u1')
+    assert sorted(series['merchant'] for series in report['series']) == ['acme payroll', 'iron gym', 'netflix com']
+    assert AnalyticsService(db).get_recurring(user_id='u2')['series'] == []
+    with pytest.raises(ValueError):
+        AnalyticsService(db).get_recurring(status='paused')
+
+    gym = [t.id for t in db.query(Transaction).filter(Transaction.description == 'Iron Gym')]
+    TransactionService(db).delete_transactions(gym, 'u1')
+    report = AnalyticsService(db).get_recurring(user_id='u1')
+    assert sorted(series['merchant'] for series in report['series']) == ['acme payroll', 'netflix com']
+    assert db.query(RecurringSeries).filter(RecurringSeries.merchant_key == 'iron gym').count() == 0
+
+    incremental = AnalyticsService(db).get_recurring(status='all', user_id='u1')
+    RecurringService(db).rebuild('u1')
+    assert AnalyticsService(db).get_recurring(status='all', user_id='u1')['series'] == incremental['series']
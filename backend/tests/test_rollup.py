@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from app.models.daily_rollup import DailyUserCategoryRollup as Rollup
+from app.services.rollup_service import (
+    ROLLUP_KEY_COLUMNS, ROLLUP_VALUE_COLUMNS, RollupService, aggregate_rollup_rows, rollup_merge_sql
+)
+
+
+def transaction_rows(count: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': rng.choice(['u1', 'u2', 'u3'], count),
+        'date': [date(2026, 3, 1) + timedelta(days=int(day)) for day in rng.integers(0, 10, count)],
+        'category': rng.choice(np.array(['Food', 'Rent', '', None], dtype=object), count),
+        'amount_cents': rng.integers(-50000, 50000, count) * rng.integers(0, 2, count)
+    })
+
+
+def expected(*batches: pd.DataFrame) -> pd.DataFrame:
+    return normalized(aggregate_rollup_rows(pd.concat(batches, ignore_index=True)))
+
+
+def normalized(rows: pd.DataFrame) -> pd.DataFrame:
+    rows = rows.assign(date=pd.to_datetime(rows['date']).dt.date)
+    rows[ROLLUP_VALUE_COLUMNS] = rows[ROLLUP_VALUE_COLUMNS].astype(np.int64)
+    return rows[ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS].sort_values(ROLLUP_KEY_COLUMNS).reset_index(drop=True)
+
+
+def stored(conn) -> pd.DataFrame:
+    columns = ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS
+    return normalized(pd.DataFrame(conn.execute(select(*[getattr(Rollup, c) for c in columns])).all(), columns=columns))
+
+
+def test_aggregate_rollup_rows_splits_income_and_expenses():
+    rows = pd.DataFrame({
+        'user_id': ['u1'] * 4,
+        'date': [date(2026, 1, 1)] * 4,
+        'category': ['Food', 'Food', '', None],
+        'amount_cents': [-1250, 300, -5, 0]
+    })
+    assert normalized(aggregate_rollup_rows(rows)).to_dict('records') == [
+        {'user_id': 'u1', 'date': date(2026, 1, 1), 'category': 'Food',
+         'income_cents': 300, 'expense_cents': 1250, 'transaction_count': 2},
+        {'user_id': 'u1', 'date': date(2026, 1, 1), 'category': 'Other',
+         'income_cents': 0, 'expense_cents': 5, 'transaction_count': 2},
+    ]
+
+
+def test_apply_matches_aggregate_and_subtracting_restores_it(db):
+    first, second = transaction_rows(500, 1), transaction_rows(300, 2)
+    service = RollupService(db)
+    service.apply(first)
+    service.apply(second)
+    db.commit()
+    pd.testing.assert_frame_equal(stored(db), expected(first, second))
+
+    service.apply(second, sign=-1)
+    db.commit()
+    # Rows whose count dropped to zero are removed rather than kept as zeros
+    pd.testing.assert_frame_equal(stored(db), expected(first))
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def merge_target(request):
+    """A connection with the rollup table and an empty ``staged`` source table"""
+    if request.param == 'sqlite':
+        conn = request.getfixturevalue('db')
+        conn.execute(text("CREATE TEMP TABLE staged (user_id TEXT, date DATE, category TEXT, amount_cents BIGINT)"))
+        yield conn
+        conn.execute(text("DROP TABLE staged"))
+    else:
+        conn = request.getfixturevalue('pg')
+        Rollup.__table__.create(conn)
+        conn.execute(text("CREATE TABLE staged (user_id TEXT, date DATE, category TEXT, amount_cents BIGINT)"))
+        yield conn
+
+
+def test_merge_sql_matches_aggregate_rollup_rows(merge_target):
+    """The COPY loader's SQL merge and the pandas path used elsewhere build the same rollup"""
+    batches = [transaction_rows(400, 3), transaction_rows(400, 4)]
+    for batch in batches:
+        merge_target.execute(text("DELETE FROM staged"))
+        merge_target.execute(
+            text("INSERT INTO staged VALUES (:user_id, :date, :category, :amount_cents)"),
+            batch.astype({'amount_cents': object}).to_dict('records')
+        )
+        merge_target.execute(text(rollup_merge_sql('staged')))
+
+    pd.testing.assert_frame_equal(stored(merge_target), expected(*batches))
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.ml.spending_forecaster import MIN_HISTORY_DAYS, WARMUP_DAYS, SpendingForecaster, calendar_slots
+
+END = date(2026, 6, 30)
+
+
+def weekly_history(series: int = 3, days: int = 182, seed: int = 0) -> np.ndarray:
+    """Spending that depends on the weekday (weekends cost more) plus noise"""
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64(END, 'D') + np.arange(1 - days, 1)
+    weekday, _ = calendar_slots(dates)
+    pattern = np.array([20, 20, 20, 20, 40, 90, 70], dtype=float)
+    return pattern[weekday] * (1 + np.arange(series))[:, np.newaxis] + rng.normal(0, 2, (series, days))
+
+
+def test_calendar_slots():
+    weekday, monthday = calendar_slots(np.array(['2026-06-01', '2026-06-07', '2026-02-28'], dtype='datetime64[D]'))
+    assert weekday.tolist() == [0, 6, 5]
+    assert monthday.tolist() == [0, 6, 27]
+
+
+@pytest.mark.parametrize('method', ['auto', 'holt_winters', 'seasonal_naive'])
+def test_forecast_follows_the_weekly_pattern(method):
+    history = weekly_history()
+    forecast = SpendingForecaster(method=method).forecast(history, END, 14)
+
+    assert forecast.point.shape == forecast.lower.shape == forecast.upper.shape == (3, 14)
+    assert forecast.start == END + timedelta(days=1)
+    assert forecast.date_at(13) == END + timedelta(days=14)
+    assert np.all(forecast.lower <= forecast.point) and np.all(forecast.point <= forecast.upper)
+    assert np.all(forecast.lower >= 0)
+
+    # 2026-07-04 is a Saturday, the most expensive day, and 2026-07-01 a Wednesday
+    saturday, wednesday = (date(2026, 7, 4) - END).days - 1, (date(2026, 7, 1) - END).days - 1
+    assert np.all(forecast.point[:, saturday] > 3 * forecast.point[:, wednesday])
+    np.testing.assert_allclose(forecast.point[:, saturday], 90 * np.arange(1, 4), rtol=0.15)
+
+
+def test_intervals_cover_held_out_days():
+    history = weekly_history(series=20, days=210, seed=1)
+    forecast = SpendingForecaster().forecast(history[:, :-28], END - timedelta(days=28), 28)
+    actual = history[:, -28:]
+    covered = ((actual >= forecast.lower) & (actual <= forecast.upper)).mean()
+    assert covered >= forecast.level - 0.15
+
+
+def test_spike_in_the_warm_up_does_not_skew_the_starting_state():
+    history = weekly_history(series=1)
+    spiked = history.copy()
+    spiked[0, WARMUP_DAYS // 2] += 5000
+    baseline = SpendingForecaster(method='holt_winters').forecast(history, END, 7).point
+    forecast = SpendingForecaster(method='holt_winters').forecast(spiked, END, 7).point
+    np.testing.assert_allclose(forecast, baseline, rtol=0.1)
+
+
+def test_zero_horizon_and_short_history():
+    history = weekly_history(series=2)
+    assert SpendingForecaster().forecast(history, END, 0).point.shape == (2, 0)
+    with pytest.raises(ValueError, match=str(MIN_HISTORY_DAYS)):
+        SpendingForecaster().forecast(history[:, :MIN_HISTORY_DAYS - 1], END, 7)
+    with pytest.raises(ValueError):
+        SpendingForecaster(method='arima')